@@ -0,0 +1,138 @@
+import json
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+marketplace_cli = AppGroup("marketplace", help="Writer marketplace maintenance.")
+orders_cli = AppGroup("orders", help="Order maintenance.")
+chats_cli = AppGroup("chats", help="Chat and support chat maintenance.")
+notifications_cli = AppGroup("notifications", help="Notification delivery.")
+
+
+@marketplace_cli.command("rebuild")
+def rebuild_marketplace_command():
+    """Backfill marketplace_open and the per-writer exclusion sets."""
+    from app.services.marketplace_service import rebuild_marketplace
+
+    result = rebuild_marketplace()
+    click.echo(
+        f"open={result['open']} closed={result['closed']} "
+        f"exclusions={result['exclusions']}"
+    )
+
+
+@orders_cli.command("backfill-attachments")
+def backfill_attachments_command():
+    """Index attachment files already on disk into order_attachments."""
+    from app.services.order_service import backfill_order_attachments
+
+    root_dir = current_app.config.get("ORDERS_FOLDER", "uploads/orders")
+    scanned, added = backfill_order_attachments(root_dir)
+    click.echo(f"orders={scanned} attachments_added={added}")
+
+
+@chats_cli.command("rebuild-summaries")
+def rebuild_chat_summaries_command():
+    """Backfill the inbox summaries of chats and support chats from their messages."""
+    from app.services.chat_service import rebuild_chat_summaries
+    from app.services.support_chat_service import rebuild_support_chat_summaries
+
+    click.echo(f"chats={rebuild_chat_summaries()} "
+               f"support_chats={rebuild_support_chat_summaries()}")
+
+
+@chats_cli.command("sweep-warnings")
+def sweep_warnings_command():
+    """Clear expired chat and support chat warnings (run periodically, e.g. cron)."""
+    from app.extensions import db
+    from app.services.chat_behavior_analyzer import clear_expired_warnings
+
+    cleared = clear_expired_warnings()
+    db.session.commit()
+    click.echo(" ".join(f"{table}={rows}" for table, rows in cleared.items()))
+
+
+@chats_cli.command("resanitize")
+@click.option("--table", type=click.Choice(["messages", "support_messages"]),
+              default="messages", show_default=True)
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows per transaction.")
+@click.option("--batch-size", default=64, show_default=True, help="Texts per spaCy batch.")
+@click.option("--n-process", default=1, show_default=True, help="spaCy pipe processes.")
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None,
+              help="Progress file (default: instance/resanitize-<table>.json).")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and start over.")
+def resanitize_command(table, chunk_size, batch_size, n_process, checkpoint, restart):
+    """Re-run PII sanitization over stored messages, resumably."""
+    from app.models.message import Message
+    from app.models.support_message import SupportMessage
+    from app.services.chat_service import resanitize_messages
+
+    model = {"messages": Message, "support_messages": SupportMessage}[table]
+    checkpoint = checkpoint or os.path.join(current_app.instance_path, f"resanitize-{table}.json")
+
+    state = {"table": table, "last_id": None, "rows": 0, "changed": 0}
+    if not restart and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            state.update(json.load(f))
+        click.echo(f"resuming after id={state['last_id']} ({state['rows']} rows done)")
+
+    started = time.perf_counter()
+    done_here = 0
+    for last_id, rows, changed in resanitize_messages(
+        model, state["last_id"], chunk_size, batch_size, n_process
+    ):
+        done_here += rows
+        state.update(last_id=last_id, rows=state["rows"] + rows,
+                     changed=state["changed"] + changed)
+        _write_checkpoint(checkpoint, state)
+
+        rate = done_here / max(time.perf_counter() - started, 1e-9)
+        click.echo(f"last_id={last_id} rows={state['rows']} changed={state['changed']} "
+                   f"rate={rate:.0f} rows/s")
+
+    click.echo(f"done: rows={state['rows']} changed={state['changed']}")
+
+
+@notifications_cli.command("fan-out")
+@click.option("--group", help="User role to notify (default: every user).")
+@click.option("--title", required=True)
+@click.option("--message", required=True)
+@click.option("--type", "notif_type", default="info", show_default=True)
+@click.option("--chunk-size", default=5000, show_default=True, help="Users per INSERT.")
+def fan_out_command(group, title, message, notif_type, chunk_size):
+    """Send every recipient their own copy of a notification, in bulk."""
+    from app.services.notification_service import (
+        send_notification_to_all, send_notification_to_group,
+    )
+
+    started = time.perf_counter()
+
+    def progress(sent, total):
+        rate = sent / max(time.perf_counter() - started, 1e-9)
+        click.echo(f"sent={sent}/{total} rate={rate:.0f} rows/s")
+
+    if group:
+        sent = send_notification_to_group(group, title, message, notif_type,
+                                          progress=progress, chunk_size=chunk_size)
+    else:
+        sent = send_notification_to_all(title, message, notif_type,
+                                        progress=progress, chunk_size=chunk_size)
+    click.echo(f"done: sent={sent}")
+
+
+def _write_checkpoint(path, state):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def register_cli(app):
+    app.cli.add_command(marketplace_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(chats_cli)
+    app.cli.add_command(notifications_cli)
@@ -45,8 +45,50 @@ class Config:
 
     EMAIL_VERIFY_EXPIRES = int(os.getenv("EMAIL_VERIFY_EXPIRES", 3600))
 
+    # Load the Presidio/spaCy model in create_app() instead of on the first
+    # chat message (gunicorn.conf.py turns this on together with preload_app)
+    PII_ANALYZER_PRELOAD = os.getenv("PII_ANALYZER_PRELOAD", "0") == "1"
+
+    # Presidio tier: en_core_web_lg / _md / _sm, or "regex" (no spaCy model);
+    # PII_ENTITIES narrows what is reported ("" = everything the tier finds).
+    # See app/services/pii_analyzer.py and benchmarks/nlp_tiers.py
+    PII_NLP_MODEL = os.getenv("PII_NLP_MODEL", "en_core_web_lg")
+    PII_ENTITIES = os.getenv("PII_ENTITIES", "")
+
+    # Fan-out for GET /chats/<id>/stream: "postgres" (LISTEN/NOTIFY), "redis"
+    # (CHAT_EVENTS_REDIS_URL; for databases without NOTIFY) or "local"
+    # (single process). "auto" picks postgres when the database supports
+    # NOTIFY (not CockroachDB), else redis if configured, else local.
+    # See app/services/chat_events.py
+    CHAT_EVENTS_BACKEND = os.getenv("CHAT_EVENTS_BACKEND", "auto")
+    CHAT_EVENTS_REDIS_URL = os.getenv("CHAT_EVENTS_REDIS_URL")
+
+    # Processes running Presidio outside the request (app/services/moderation.py);
+    # 0 keeps it inline
+    MODERATION_WORKERS = int(os.getenv("MODERATION_WORKERS", 0))
+
+    # Prefilter deciding which messages need Presidio at all, see
+    # chat_service.PREFILTER_RULES ("" sends every message through Presidio)
+    PII_PREFILTER_RULES = os.getenv(
+        "PII_PREFILTER_RULES",
+        "digits,at_sign,obfuscation_words,number_words,web,proper_noun"
+    )
+
+    # Presidio results cached by normalized text (app/services/ner_cache.py)
+    NER_CACHE_SIZE = int(os.getenv("NER_CACHE_SIZE", 10000))
+    NER_CACHE_TTL = int(os.getenv("NER_CACHE_TTL", 86400))
+    NER_CACHE_REDIS_URL = os.getenv("NER_CACHE_REDIS_URL")
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
 class ProductionConfig(Config):
     DEBUG = False
+
+class TestingConfig(Config):
+    TESTING = True
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL")
+    QUERY_COUNT_HEADER = True
+    MODERATION_WORKERS = 0
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "testing-secret-key-not-for-production")
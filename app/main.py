@@ -1,11 +1,17 @@
 from flask import Flask, jsonify
-from .config import DevelopmentConfig, ProductionConfig
+from .config import DevelopmentConfig, ProductionConfig, TestingConfig
 from .extensions import db, migrate, jwt, ma, cors, bcrypt
 import os
 from flask_cors import CORS
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+CONFIGS = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "testing": TestingConfig,
+}
+
 def create_app(config_name=None):
     app = Flask(
         __name__,
@@ -13,11 +19,12 @@ def create_app(config_name=None):
         template_folder=os.path.join(BASE_DIR, "templates")
     )
 
-    env = os.getenv("FLASK_ENV", "development")
-    if env == "production":
-        app.config.from_object(ProductionConfig)
-    else:
-        app.config.from_object(DevelopmentConfig)
+    env = config_name or os.getenv("FLASK_ENV", "development")
+    app.config.from_object(CONFIGS.get(env, DevelopmentConfig))
+
+    # orjson-backed JSON with native datetime/Decimal/UUID handling
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
 
     # initialize extensions
     db.init_app(app)
@@ -29,12 +36,17 @@ def create_app(config_name=None):
         app,
         resources={r"/api/*": {"origins": origins}},
         supports_credentials=True,
-        allow_headers=["Content-Type", "Authorization"],
+        allow_headers=["Content-Type", "Authorization", "If-None-Match"],
+        expose_headers=["ETag"],
         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     )
     bcrypt.init_app(app)
     # limiter.init_app(app)
 
+    # per-request SQL statement count (X-Query-Count header in debug)
+    from app.utils.query_counter import init_query_counter
+    init_query_counter(app)
+
     # register blueprints
     from app.routes.auth_routes import bp as auth_bp
     from app.routes.order_routes import bp as order_bp
@@ -75,6 +87,15 @@ def create_app(config_name=None):
     app.register_blueprint(submission_bp)
     app.register_blueprint(support_chat_bp)
 
+    # shared PII analyzer: configured tier, loaded now if forked workers
+    # should inherit it
+    from app.services.pii_analyzer import init_pii_analyzer
+    init_pii_analyzer(app)
+
+    # maintenance commands (flask <group> <command>)
+    from app.cli import register_cli
+    register_cli(app)
+
     # error handlers to match required error format
     from app.utils.response_formatter import error_response
 
@@ -8,9 +8,16 @@ def gen_bid_id():
 class Bid(db.Model):
     __tablename__ = "bids"
 
+    __table_args__ = (
+        # Bids on an order by status (accept/reject flows, client bid lists)
+        db.Index("idx_bids_order_status", "order_id", "status"),
+        # Writer's bid list, newest first (keyset on submitted_at, id)
+        db.Index("idx_bids_user_submitted", "user_id", "submitted_at", "id"),
+    )
+
     id = db.Column(db.String(50), primary_key=True, default=gen_bid_id)
-    order_id = db.Column(db.String(50), db.ForeignKey("orders.id"), nullable=False, index=True)
-    user_id = db.Column(db.String(50), db.ForeignKey("users.id"), nullable=False, index=True)
+    order_id = db.Column(db.String(50), db.ForeignKey("orders.id"), nullable=False)
+    user_id = db.Column(db.String(50), db.ForeignKey("users.id"), nullable=False)
 
     # What writer entered (30% world)
     writer_amount = db.Column(db.Float, nullable=False)
@@ -30,6 +30,31 @@ class Chat(db.Model):
     warning_active = db.Column(db.Boolean, default=False)
     warning_for_user_id = db.Column(db.String(50), nullable=True)
 
+    # Inbox summary, kept current by chat_service on every add/delete
+    # (flask chats rebuild-summaries backfills it). last_message_at starts at
+    # the chat's creation time so empty chats still sort by activity.
+    last_message_id = db.Column(db.String(50), nullable=True)
+    last_message_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.now()
+    )
+
+    # Per-viewer values computed by the inbox query (chat_service.inbox_expressions)
+    unread_count = db.query_expression()
+    other_read_at = db.query_expression()
+
+    last_message = db.relationship(
+        "Message",
+        primaryjoin="foreign(Chat.last_message_id) == Message.id",
+        viewonly=True,
+        lazy=True,
+    )
+
     __table_args__ = (
         db.UniqueConstraint("order_id", "client_id", "writer_id", name="uq_chat_order_client_writer"),
+        # Inbox: a participant's chats, most recent activity first
+        db.Index("idx_chats_client_activity", "client_id", "last_message_at", "id"),
+        db.Index("idx_chats_writer_activity", "writer_id", "last_message_at", "id"),
     )
+
+    def other_participant_id(self, uid):
+        return self.writer_id if uid == self.client_id else self.client_id
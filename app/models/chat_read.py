@@ -0,0 +1,11 @@
+from app.extensions import db
+from datetime import datetime
+
+# Read watermark per participant: messages in the chat created after
+# last_read_at, and not sent by the user, are unread
+class ChatRead(db.Model):
+    __tablename__ = "chat_reads"
+
+    chat_id = db.Column(db.String(50), db.ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True)
+    user_id = db.Column(db.String(50), db.ForeignKey("users.id"), primary_key=True)
+    last_read_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
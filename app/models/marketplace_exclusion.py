@@ -0,0 +1,22 @@
+from app.extensions import db
+from datetime import datetime
+
+class MarketplaceExclusion(db.Model):
+    """
+    Per-writer set of orders hidden from the marketplace.
+
+    A row is written when a writer bids on an order ("bid") or declines it
+    ("declined"), so the marketplace listing is a single anti-join on this
+    table's primary key instead of rebuilding NOT IN subqueries over bids and
+    declined_orders on every request.
+    """
+    __tablename__ = "marketplace_exclusions"
+
+    writer_id = db.Column(db.String(50), db.ForeignKey("users.id"), primary_key=True)
+    order_id = db.Column(
+        db.String(50),
+        db.ForeignKey("orders.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    reason = db.Column(db.String(20), primary_key=True)  # 'bid' | 'declined'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -7,12 +7,25 @@ def gen_msg_id():
 
 class Message(db.Model):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Unread counts (range count past a chat_reads watermark) and
+        # after=/before= history windows
+        db.Index("idx_messages_chat_created", "chat_id", "created_at", "id"),
+    )
+
     id = db.Column(db.String(50), primary_key=True, default=gen_msg_id)
     chat_id = db.Column(db.String(50), db.ForeignKey("chats.id"))
     sender_id = db.Column(db.String(50), db.ForeignKey("users.id"))
     content = db.Column(db.Text)
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    edited = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    edited_at = db.Column(db.DateTime, nullable=True)
+
+    # Written with the sanitized content (chat_service.moderate); NULL on rows
+    # that predate the columns
+    pii_hits = db.Column(db.Integer, nullable=True)
+    pii_entities = db.Column(db.JSON, nullable=True)
 
     chat = db.relationship("Chat", backref="messages", lazy=True)
     sender = db.relationship("User", backref="messages", lazy=True)
@@ -8,6 +8,18 @@ def gen_notif_id():
 class Notification(db.Model):
     __tablename__ = "notifications"
 
+    __table_args__ = (
+        # Feed: created_at >= joined_at ORDER BY created_at DESC, id DESC
+        db.Index("idx_notifications_created", "created_at", "id"),
+        # Direct notifications for one recipient
+        db.Index(
+            "idx_notifications_recipient",
+            "user_email",
+            "created_at",
+            postgresql_where=db.text("target_type = 'individual'")
+        ),
+    )
+
     id = db.Column(db.String(50), primary_key=True, default=gen_notif_id)
     sender_id = db.Column(db.String(50), db.ForeignKey("users.id"), nullable=True)
     # For direct messages (single recipient)
@@ -1,7 +1,8 @@
 from app.extensions import db
 from datetime import datetime
 import uuid
-from sqlalchemy.sql import func
+from sqlalchemy import DDL, event
+from sqlalchemy.sql import func, text
 
 def gen_order_id():
     return f"ORD-{str(uuid.uuid4())[:8]}"
@@ -11,6 +12,23 @@ class Order(db.Model):
 
     __table_args__ = (
         db.Index("idx_orders_payment_status", "payment_status"),
+        # Client order list: WHERE client_id [AND status IN ...] ORDER BY created_at
+        db.Index("idx_orders_client_status_created", "client_id", "status", "created_at"),
+        # Writer "assigned to me" list; most rows have no writer
+        db.Index(
+            "idx_orders_writer_status",
+            "writer_id",
+            "status",
+            postgresql_where=db.text("writer_id IS NOT NULL")
+        ),
+        # Expiry filters (deadline >= now) in the marketplace and bid lists
+        db.Index("idx_orders_deadline", "deadline"),
+        # Marketplace page: newest open orders first, one range scan
+        db.Index(
+            "idx_orders_marketplace_open",
+            "created_at",
+            postgresql_where=db.text("marketplace_open")
+        ),
     )
 
     id = db.Column(db.String(50), primary_key=True, default=gen_order_id)
@@ -63,6 +81,14 @@ class Order(db.Model):
         default="unpaid"
     )
 
+    # False once the order is assigned or cancelled (see marketplace_service)
+    marketplace_open = db.Column(
+        db.Boolean,
+        nullable=False,
+        default=True,
+        server_default=db.true()
+    )
+
     # Relationships
     client = db.relationship(
         "User",
@@ -77,3 +103,49 @@ class Order(db.Model):
         backref="writer_orders",
         lazy=True
     )
+
+
+# ------------------------------------------------------------
+#  Search (PostgreSQL only — see order_service.apply_order_search)
+# ------------------------------------------------------------
+def _search_document():
+    sep = text("' '")
+    parts = [
+        func.coalesce(col, text("''"))
+        for col in (Order.title, Order.subject, Order.description, Order.status)
+    ]
+    doc = parts[0]
+    for part in parts[1:]:
+        doc = doc.op("||")(sep).op("||")(part)
+    return func.to_tsvector(text("'english'"), doc)
+
+
+# The query must use this exact expression for the GIN index to apply
+ORDER_SEARCH_VECTOR = _search_document()
+
+db.Index(
+    "idx_orders_search_vector",
+    ORDER_SEARCH_VECTOR,
+    postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+
+# Trigram indexes serve ILIKE '%id%' and title prefix lookups
+db.Index(
+    "idx_orders_id_trgm",
+    Order.id,
+    postgresql_using="gin",
+    postgresql_ops={"id": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+db.Index(
+    "idx_orders_title_trgm",
+    Order.title,
+    postgresql_using="gin",
+    postgresql_ops={"title": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Order.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
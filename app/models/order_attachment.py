@@ -0,0 +1,55 @@
+from app.extensions import db
+from datetime import datetime
+import uuid
+
+def gen_attachment_id():
+    return f"att-{str(uuid.uuid4())[:8]}"
+
+class OrderAttachment(db.Model):
+    """
+    Manifest entry for a file stored under ORDERS_FOLDER/<client>/<order>/.
+
+    Written alongside the file by save_uploaded_file so order reads can list
+    attachments without touching the uploads volume.
+    """
+    __tablename__ = "order_attachments"
+
+    __table_args__ = (
+        db.UniqueConstraint("order_id", "filename", name="uq_order_attachments_order_filename"),
+    )
+
+    id = db.Column(db.String(50), primary_key=True, default=gen_attachment_id)
+    order_id = db.Column(
+        db.String(50),
+        db.ForeignKey("orders.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    filename = db.Column(db.String(255), nullable=False)  # name on disk
+    original_name = db.Column(db.String(255))
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    mime_type = db.Column(db.String(255))
+    checksum = db.Column(db.String(64))  # sha256 hex
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    order = db.relationship(
+        "Order",
+        backref=db.backref(
+            "attachments",
+            lazy=True,
+            cascade="all, delete-orphan",
+            order_by="OrderAttachment.created_at"
+        )
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "name": self.original_name,
+            "size": self.size,
+            "mime_type": self.mime_type,
+            "checksum": self.checksum,
+        }
@@ -22,8 +22,29 @@ class SupportChat(db.Model):
     warning_active = db.Column(db.Boolean, default=False)
     warning_for_user_id = db.Column(db.String(50))
 
+    # "open" or "resolved"; a new message from the user reopens the chat
+    status = db.Column(db.String(20), nullable=False, default="open", server_default="open")
+
+    # Admin inbox summary, kept current by support_chat_service on every new
+    # message and read (flask chats rebuild-summaries backfills it).
+    # unread_count counts the user's messages support has not read yet.
+    unread_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_message_id = db.Column(db.String(50), nullable=True)
+    last_message_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.now()
+    )
+
     user = db.relationship("User", lazy=True)
+    last_message = db.relationship(
+        "SupportMessage",
+        primaryjoin="foreign(SupportChat.last_message_id) == SupportMessage.id",
+        viewonly=True,
+        lazy=True,
+    )
 
     __table_args__ = (
         db.UniqueConstraint("user_id", name="uq_support_chat_user"),
+        # Admin inbox, most recent activity first: all chats, or by status
+        db.Index("idx_support_chats_activity", "last_message_at", "id"),
+        db.Index("idx_support_chats_status_activity", "status", "last_message_at", "id"),
     )
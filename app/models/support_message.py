@@ -7,6 +7,10 @@ def gen_support_msg_id():
 
 class SupportMessage(db.Model):
     __tablename__ = "support_messages"
+    __table_args__ = (
+        # History in order, and after=/before= windows
+        db.Index("idx_support_messages_chat_created", "support_chat_id", "created_at", "id"),
+    )
 
     id = db.Column(db.String(50), primary_key=True, default=gen_support_msg_id)
 
@@ -23,5 +27,10 @@ class SupportMessage(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Written with the sanitized content (chat_service.moderate); NULL on rows
+    # that predate the columns
+    pii_hits = db.Column(db.Integer, nullable=True)
+    pii_entities = db.Column(db.JSON, nullable=True)
+
     chat = db.relationship("SupportChat", backref="messages", lazy=True)
     sender = db.relationship("User", lazy=True)
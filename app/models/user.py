@@ -20,6 +20,7 @@ class User(db.Model):
     bio = db.Column(db.Text, nullable=True)
     total_earned = db.Column(db.Float, default=0.0)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     application_status = db.Column(db.String(50), default="not_applied")
     is_verified = db.Column(db.Boolean, default=False)
     country = db.Column(db.String(100), nullable=True)
@@ -8,6 +8,8 @@ from app.models.wallet import Wallet
 from app.models.wallet_transaction import WalletTransaction
 from app.models.withdrawal_request import WithdrawalRequest
 from app.utils.response_formatter import success_response, error_response
+from app.utils.pagination import paginate_query
+from app.serializers.payment import admin_withdrawal_list_load, serialize_admin_withdrawal
 from app.services.notification_service import send_notification_to_user
 import uuid
 from datetime import timezone, datetime
@@ -68,38 +70,16 @@ def admin_list_withdrawals():
             )
         )
 
-    total = q.count()
-    items = (
-        q.order_by(WithdrawalRequest.requested_at.desc())
-         .offset((page - 1) * limit)
-         .limit(limit)
-         .all()
+    items, pagination = paginate_query(
+        q.options(*admin_withdrawal_list_load()), page, limit,
+        keyset=(WithdrawalRequest.requested_at, WithdrawalRequest.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
     return success_response({
-        "withdrawals": [
-            {
-                "id": w.id,
-                "amount": float(w.amount),
-                "status": w.status,
-                "method": w.method,
-                "destination": w.destination,
-                "requested_at": w.requested_at.isoformat() + "Z",
-                "writer": {
-                    "id": w.user.id,
-                    "name": w.user.full_name,
-                    "email": w.user.email,
-                    "avatar": w.user.profile_image,
-                }
-            }
-            for w in items
-        ],
-        "pagination": {
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total + limit - 1) // limit
-        }
+        "withdrawals": [serialize_admin_withdrawal(w) for w in items],
+        "pagination": pagination
     })
 
 
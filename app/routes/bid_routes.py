@@ -11,15 +11,22 @@ from app.services.notification_service import send_notification_to_user
 from app.services.chat_service import (
     get_or_create_chat,
     add_message,
-    sanitize_message
 )
 
 from app.extensions import db
 from app.utils.response_formatter import success_response, error_response
+from app.utils.pagination import paginate_query
+from app.serializers.bid import (
+    bid_joined_order_load,
+    bid_joined_order_with_writer_load,
+    bid_with_writer_load,
+    serialize_bids
+)
 
 from datetime import datetime, timezone
 from sqlalchemy import or_, and_
 from app.services.wallet_service import safe_debit_wallet
+from app.services.marketplace_service import close_marketplace_listing
 from app.services.email_service import (
     send_bid_accepted_email
 )
@@ -100,27 +107,16 @@ def list_bids():
                 status=422
             )
 
-    total = q.count()
-    items = (
-        q.order_by(Bid.submitted_at.desc())
-         .offset((page - 1) * limit)
-         .limit(limit)
-         .all()
+    items, pagination = paginate_query(
+        q.options(*bid_joined_order_load()), page, limit,
+        keyset=(Bid.submitted_at, Bid.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
     viewer = User.query.get(user_id)
 
-    bids = [
-        b.serialize(viewer_role=viewer.role)
-        for b in items
-    ]
-
-    pagination = {
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": (total + limit - 1) // limit,
-    }
+    bids = serialize_bids(items, viewer_role=viewer.role)
 
     return success_response({"bids": bids, "pagination": pagination})
 
@@ -226,7 +222,7 @@ def create_bid(order_id):
     chat = get_or_create_chat(order.id, order.client_id, uid)
 
     if data.get("message"):
-        add_message(chat.id, uid, sanitize_message(data["message"]))
+        add_message(chat.id, uid, data["message"])
 
     payload = bid.serialize(viewer_role="writer")
     payload["chat_id"] = chat.id
@@ -334,29 +330,14 @@ def list_bids_for_client():
     if status:
         q = q.filter(Bid.status == status)
 
-    total = q.count()
-    bids = (
-        q.order_by(Bid.submitted_at.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
+    bids, pagination = paginate_query(
+        q.options(*bid_joined_order_with_writer_load()), page, limit,
+        keyset=(Bid.submitted_at, Bid.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
-    serialized = []
-    for b in bids:
-        serialized.append(
-            b.serialize(
-                include_user_info=True,
-                viewer_role="client"
-            )
-        )
-
-    pagination = {
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": (total + limit - 1) // limit,
-    }
+    serialized = serialize_bids(bids, viewer_role="client", include_user_info=True)
 
     return success_response({"bids": serialized, "pagination": pagination})
 
@@ -439,6 +420,7 @@ def client_update_bid_status(bid_id):
         bid.status = "accepted"
         order.writer_id = bid.user_id
         order.status = "in_progress"
+        close_marketplace_listing(order)
 
         send_bid_accepted_email(writer, bid.order)
 
@@ -527,29 +509,14 @@ def list_bids_for_order(order_id):
     if status and status != "all":
         q = q.filter(Bid.status == status)
 
-    total = q.count()
-
-    bids = (
-        q.order_by(Bid.submitted_at.desc())
-         .offset((page - 1) * limit)
-         .limit(limit)
-         .all()
+    bids, pagination = paginate_query(
+        q.options(*bid_with_writer_load()), page, limit,
+        keyset=(Bid.submitted_at, Bid.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
-    serialized = [
-        b.serialize(
-            include_user_info=True,
-            viewer_role="client"
-        )
-        for b in bids
-    ]
-
-    pagination = {
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": (total + limit - 1) // limit,
-    }
+    serialized = serialize_bids(bids, viewer_role="client", include_user_info=True)
 
     return success_response({"bids": serialized, "pagination": pagination})
 
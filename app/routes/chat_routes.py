@@ -1,14 +1,33 @@
-from flask import Blueprint, request
+from flask import Blueprint, Response, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
+from datetime import datetime
+from sqlalchemy import func
 
 from app.services.chat_service import (
     get_or_create_chat,
     add_message,
-    sanitize_message,
+    moderate,
+    mark_chat_read,
+    delete_chat_message,
+    chat_watermarks,
+    is_read,
+    unread_count,
+    publish_message,
+    replay_after,
 )
-from app.services.chat_behavior_analyzer import analyze_chat_behavior
+from app.services.chat_behavior_analyzer import refresh_warning, publish_warning, warning_in_effect
+from app.services import chat_events, moderation
 from app.utils.response_formatter import success_response, error_response
+from app.utils.pagination import paginate_query, paginate_window
+from app.utils.conditional import make_etag, not_modified, with_etag
+from app.serializers.chat import (
+    chat_list_load,
+    message_list_load,
+    serialize_chat_list_item,
+    serialize_last_message,
+    serialize_message,
+    serialize_warning,
+)
 from app.models.chat import Chat
 from app.models.message import Message
 from app.extensions import db
@@ -80,12 +99,6 @@ def create_or_get_chat():
     # Create or fetch existing chat
     chat = get_or_create_chat(order_id, client_id, writer_id)
 
-    last_msg = (
-        Message.query.filter_by(chat_id=chat.id)
-        .order_by(Message.created_at.desc())
-        .first()
-    )
-
     return success_response({
         "chat": {
             "id": chat.id,
@@ -93,16 +106,11 @@ def create_or_get_chat():
             "client_id": chat.client_id,
             "writer_id": chat.writer_id,
             "created_at": chat.created_at.isoformat() + "Z",
-            "last_message": {
-                "content": last_msg.content,
-                "sent_at": last_msg.created_at.isoformat() + "Z",
-                "is_read": last_msg.is_read,
-            } if last_msg else None,
-            "unread_count": Message.query.filter(
-                Message.chat_id == chat.id,
-                Message.sender_id != uid,
-                Message.is_read == False
-            ).count()
+            "last_message": serialize_last_message(
+                chat.last_message,
+                chat.last_message and is_read(chat.last_message, chat, chat_watermarks(chat)),
+            ),
+            "unread_count": unread_count(chat.id, uid),
         }
     })
 
@@ -123,66 +131,23 @@ def list_chats():
         page = 1
         limit = 10
 
-    offset = (page - 1) * limit
-
-    chats_q = Chat.query.filter(
-        (Chat.client_id == uid) | (Chat.writer_id == uid)
-    ).order_by(Chat.created_at.desc()).offset(offset).limit(limit).all()
-
-    out = []
-    for chat in chats_q:
-        if chat.warning_active and chat.warning_expires_at and chat.warning_expires_at < datetime.utcnow():
-            chat.warning_active = False
-            chat.warning_risk = None
-            chat.warning_message = None
-            chat.warning_expires_at = None
-            db.session.commit()
-
-        last_msg = (
-            Message.query.filter_by(chat_id=chat.id)
-            .order_by(Message.created_at.desc())
-            .first()
-        )
-
-        other_user = chat.writer if chat.client_id == uid else chat.client
+    chats_q, pagination = paginate_query(
+        Chat.query
+        .filter((Chat.client_id == uid) | (Chat.writer_id == uid))
+        .options(*chat_list_load(uid)),
+        page, limit,
+        keyset=(Chat.last_message_at, Chat.id),
+        cursor=request.args.get("cursor"),
+        count=False,
+    )
 
-        out.append({
-            "id": chat.id,
-            "order_id": chat.order_id,
-            "order_title": chat.order.title if chat.order else None,
-            "other_user": {
-                "id": other_user.id if other_user else None,
-                "name": other_user.full_name if other_user else None,
-                "avatar": other_user.profile_image if other_user else None,
-                "role": other_user.role if other_user else None,
-            },
-            "warning": (
-                {
-                    "active": chat.warning_active,
-                    "risk": chat.warning_risk,
-                    "message": chat.warning_message,
-                    "expires_at": chat.warning_expires_at.isoformat() + "Z"
-                }
-                if chat.warning_active and chat.warning_for_user_id == uid
-                else None
-            ),
-            "last_message": {
-                "content": last_msg.content,
-                "sent_at": last_msg.created_at.isoformat() + "Z",
-                "is_read": last_msg.is_read,
-            } if last_msg else None,
-            "unread_count": Message.query.filter(
-                Message.chat_id == chat.id,
-                Message.sender_id != uid,
-                Message.is_read == False
-            ).count()
-        })
+    # Expired warnings are hidden by serialize_warning and cleared by
+    # `flask chats sweep-warnings`; listing writes nothing
+    out = [serialize_chat_list_item(chat, uid) for chat in chats_q]
 
     return success_response({
         "chats": out,
-        "page": page,
-        "limit": limit,
-        "has_more": len(chats_q) == limit
+        **pagination
     })
 
 
@@ -200,46 +165,81 @@ def list_messages(chat_id):
     if not chat:
         return error_response("NOT_FOUND", "Chat not found", 404)
 
+    # Polling: one aggregate over the chat's messages plus both read
+    # watermarks decide freshness
+    watermark = db.session.query(
+        func.count(Message.id),
+        func.max(Message.created_at),
+        func.max(Message.edited_at),
+    ).filter(Message.chat_id == chat_id).one()
+    reads = chat_watermarks(chat)
+    etag = make_etag(
+        chat.id, *watermark, *sorted(reads.items()),
+        warning_in_effect(chat), chat.warning_risk, chat.warning_expires_at,
+        chat.warning_for_user_id == uid,
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     page = int(request.args.get("page", 1))
     limit = int(request.args.get("limit", 50))
+    messages_q = Message.query.filter_by(chat_id=chat_id).options(*message_list_load())
+    keyset = (Message.created_at, Message.id)
 
-    msgs_q = Message.query.filter_by(chat_id=chat_id).order_by(Message.created_at.asc())
-    total = msgs_q.count()
-    items = msgs_q.offset((page - 1) * limit).limit(limit).all()
+    after, before = request.args.get("after"), request.args.get("before")
+    if after or before:
+        # A client that has the history asks only for what is newer
+        items, pagination = paginate_window(messages_q, keyset, after, before, limit)
+    else:
+        items, pagination = paginate_query(
+            messages_q, page, limit,
+            keyset=keyset,
+            cursor=request.args.get("cursor"),
+            count=request.args.get("count"),
+            descending=False,
+        )
 
-    messages = [{
-        "id": m.id,
-        "chat_id": m.chat_id,
-        "sender": {
-            "id": m.sender.id,
-            "name": m.sender.full_name,
-            "avatar": m.sender.profile_image,
-        },
-        "content": m.content,
-        "sent_at": m.created_at.isoformat() + "Z",
-        "is_read": m.is_read,
-        "attachments": [],
-    } for m in items]
+    messages = [serialize_message(m, is_read(m, chat, reads)) for m in items]
 
-    return success_response({
+    return with_etag(success_response({
         "messages": messages,
-        "pagination": {
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total + limit - 1) // limit,
-        },
-        "warning": (
-            {
-                "active": chat.warning_active,
-                "risk": chat.warning_risk,
-                "message": chat.warning_message,
-                "expires_at": chat.warning_expires_at.isoformat() + "Z"
-            }
-            if chat.warning_active and chat.warning_for_user_id == uid
-            else None
-        )
-    })
+        "pagination": pagination,
+        "warning": serialize_warning(chat, uid),
+    }), etag)
+
+
+# -----------------------------------------------------------
+# LIVE EVENTS (Server-Sent Events)
+# -----------------------------------------------------------
+# EventSource can't send headers, so the token may also come as ?jwt=...
+@bp.route("/<chat_id>/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_chat(chat_id):
+    uid = get_jwt_identity()
+
+    chat = Chat.query.filter(
+        Chat.id == chat_id,
+        (Chat.client_id == uid) | (Chat.writer_id == uid)
+    ).first()
+    if not chat:
+        return error_response("NOT_FOUND", "Chat not found", 404)
+
+    # Subscribe before replaying, so nothing falls between the two; the
+    # stream skips live duplicates of replayed messages
+    subscription = chat_events.subscribe(chat_id)
+    backlog, complete = [], True
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id:
+        backlog, complete = replay_after(chat, last_event_id)
+
+    # The session is released when the request context pops, before the
+    # body is streamed, so an open stream holds no pooled connection
+    return Response(
+        chat_events.stream(subscription, uid, backlog=backlog, resync=not complete),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # -----------------------------------------------------------
@@ -259,35 +259,20 @@ def post_message(chat_id):
 
     uid = get_jwt_identity()
 
-    sanitized = sanitize_message(content)
-    msg = add_message(chat_id, uid, sanitized)
+    msg = add_message(chat_id, uid, content)
 
     # --- Behavior analysis ---
-    history = Message.query.filter_by(chat_id=chat_id)\
-        .order_by(Message.created_at.desc())\
-        .limit(25).all()[::-1]
-
-    analysis = analyze_chat_behavior(history)
+    analysis = refresh_warning(chat, uid)
     warning = None
 
     if analysis["risk"] in ("medium", "high"):
-        chat.warning_active = True
-        chat.warning_risk = analysis["risk"]
-        chat.warning_message = (
-            "We detected possible attempts to share contact or personal information. "
-            "Continued violations may lead to account suspension."
-        )
-        chat.warning_expires_at = datetime.utcnow() + timedelta(days=7)
-        chat.warning_for_user_id = uid
-
         db.session.commit()
 
-        if chat.warning_active and chat.warning_for_user_id == uid:
-            warning = {
-                "risk": chat.warning_risk,
-                "message": chat.warning_message,
-                "expires_at": chat.warning_expires_at.isoformat() + "Z",
-            }
+        warning = {
+            "risk": chat.warning_risk,
+            "message": chat.warning_message,
+            "expires_at": chat.warning_expires_at.isoformat() + "Z",
+        }
 
     return success_response({
         "id": msg.id,
@@ -299,7 +284,7 @@ def post_message(chat_id):
         },
         "content": msg.content,
         "sent_at": msg.created_at.isoformat() + "Z",
-        "is_read": msg.is_read,
+        "is_read": False,
         "warning": warning,
     })
 
@@ -328,37 +313,26 @@ def edit_message(chat_id, message_id):
     if msg.sender_id != uid:
         return error_response("FORBIDDEN", "You can only edit your own messages", 403)
 
-    msg.content = sanitize_message(new_content)
+    moderate(msg, new_content)
     msg.edited = True
+    msg.edited_at = datetime.utcnow()
+    publish_message(msg)
 
     db.session.commit()
+    moderation.enqueue(msg)
 
     # Behavior analysis again
-    history = Message.query.filter_by(chat_id=chat_id)\
-        .order_by(Message.created_at.desc())\
-        .limit(25).all()[::-1]
-
-    analysis = analyze_chat_behavior(history)
+    analysis = refresh_warning(chat, uid)
     warning = None
 
     if analysis["risk"] in ("medium", "high"):
-        chat.warning_active = True
-        chat.warning_risk = analysis["risk"]
-        chat.warning_message = (
-            "We detected possible attempts to share contact or personal information. "
-            "Continued violations may lead to account suspension."
-        )
-        chat.warning_expires_at = datetime.utcnow() + timedelta(days=7)
-        chat.warning_for_user_id = uid
-
         db.session.commit()
 
-        if chat.warning_active and chat.warning_for_user_id == uid:
-            warning = {
-                "risk": chat.warning_risk,
-                "message": chat.warning_message,
-                "expires_at": chat.warning_expires_at.isoformat() + "Z",
-            }
+        warning = {
+            "risk": chat.warning_risk,
+            "message": chat.warning_message,
+            "expires_at": chat.warning_expires_at.isoformat() + "Z",
+        }
 
     return success_response({
         "message": {
@@ -392,7 +366,7 @@ def delete_message(chat_id, message_id):
     if msg.sender_id != uid:
         return error_response("FORBIDDEN", "You can only delete your own messages", 403)
 
-    db.session.delete(msg)
+    delete_chat_message(chat, msg)
     db.session.commit()
 
     return success_response({"deleted": True})
@@ -406,15 +380,21 @@ def delete_message(chat_id, message_id):
 def mark_read(chat_id):
     uid = get_jwt_identity()
 
-    updated = Message.query.filter(
-        Message.chat_id == chat_id,
-        Message.sender_id != uid,
-        Message.is_read == False
-    ).update({"is_read": True})
+    chat = Chat.query.filter(
+        Chat.id == chat_id,
+        (Chat.client_id == uid) | (Chat.writer_id == uid)
+    ).first()
+    if not chat:
+        return error_response("NOT_FOUND", "Chat not found", 404)
 
+    data = request.get_json(silent=True) or {}
+    read_at = mark_chat_read(chat_id, uid, up_to=data.get("message_id"))
     db.session.commit()
 
-    return success_response({"updated": bool(updated)})
+    return success_response({
+        "updated": read_at is not None,
+        "last_read_at": read_at.isoformat() + "Z" if read_at else None,
+    })
 
 
 # -----------------------------------------------------------
@@ -431,6 +411,7 @@ def clear_chat_warning(chat_id):
     chat.warning_risk = None
     chat.warning_message = None
     chat.warning_expires_at = None
+    publish_warning(chat)
 
     db.session.commit()
 
@@ -466,11 +447,7 @@ def get_chat(chat_id):
                 "active": chat.warning_active,
                 "risk": chat.warning_risk,
                 "message": chat.warning_message,
-            } if chat.warning_active else None,
-            "unread_count": Message.query.filter(
-                Message.chat_id == chat.id,
-                Message.sender_id != uid,
-                Message.is_read == False
-            ).count()
+            } if warning_in_effect(chat) else None,
+            "unread_count": unread_count(chat.id, uid),
         }
     })
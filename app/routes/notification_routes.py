@@ -7,6 +7,7 @@ from app.services.notification_service import (
 )
 from app.utils.response_formatter import success_response, error_response
 from app.utils.pagination import paginate_query
+from app.utils.conditional import make_etag, not_modified, with_etag
 from app.models.notification import Notification
 
 from app.models.user import User
@@ -14,6 +15,7 @@ from app.models.notification_read import NotificationRead
 from app.models.notification import Notification
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy import func
 
 bp = Blueprint("notifications", __name__, url_prefix="/api/v1/notifications")
 
@@ -103,19 +105,26 @@ def get_notifications():
         )
     )
 
+    # Polling: newest visible notification plus the read watermark
+    newest, visible = q.with_entities(
+        func.max(Notification.created_at), func.count(Notification.id)
+    ).one()
+    etag = make_etag(uid, user.role, user.email, newest, visible, notif_read.last_read)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     page = int(request.args.get("page", 1))
     limit = int(request.args.get("limit", 20))
-    offset = (page - 1) * limit
-
-    total_items = q.count()
-    total_pages = (total_items + limit - 1) // limit
 
-    notifications = (
-        q.order_by(Notification.created_at.desc())
-         .offset(offset)
-         .limit(limit)
-         .all()
+    notifications, pagination = paginate_query(
+        q, page, limit,
+        keyset=(Notification.created_at, Notification.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
+    if "total" in pagination:
+        pagination["total_items"] = pagination.pop("total")
 
     # Determine read/unread
     results = [{
@@ -129,15 +138,10 @@ def get_notifications():
         "is_read": n.created_at <= notif_read.last_read
     } for n in notifications]
 
-    return success_response({
+    return with_etag(success_response({
         "notifications": results,
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total_items": total_items,
-            "total_pages": total_pages,
-        }
-    })
+        "pagination": pagination
+    }), etag)
 
 
 @bp.route("/mark-seen", methods=["POST"])
@@ -7,35 +7,39 @@ from app.models.order import Order
 from app.models.user import User
 from app.models.review import Review
 from app.models.declined_order import DeclinedOrder
-from app.services.order_service import create_order, update_order_status
+from app.services.order_service import create_order, update_order_status, apply_order_search
 from app.utils.response_formatter import success_response, error_response
 from app.utils.pagination import paginate_query
+from app.utils.conditional import make_etag, not_modified, with_etag
+from app.serializers.order import (
+    order_list_load,
+    format_money,
+    serialize_order_list_item
+)
 from app.models.order_invitation import OrderInvitation
 from dateutil import parser
-from app.models.bid import Bid
 from app.services.notification_service import send_notification_to_user
-from sqlalchemy import or_, cast
-from sqlalchemy.types import String
+from sqlalchemy import or_
 from app.services.order_service import (
     save_uploaded_file,
-    calculate_minimum_price
+    remove_order_attachment,
+    calculate_minimum_price,
+    calculate_minimum_prices,
+    pricing_table
 )
-from decimal import Decimal, ROUND_HALF_UP
 from app.services.wallet_service import has_sufficient_balance
+from app.services.marketplace_service import (
+    exclude_from_marketplace,
+    close_marketplace_listing,
+    filter_marketplace
+)
 from sqlalchemy import func
+from itertools import product
 
 from app.services.email_service import (
     send_order_cancelled_email
 )
 
-def format_money(value):
-    if value is None:
-        return None
-    return float(
-        Decimal(value).quantize(Decimal("0.00"), rounding=ROUND_HALF_UP)
-    )
-
-
 bp = Blueprint("orders", __name__, url_prefix="/api/v1/orders")
 
 
@@ -120,27 +124,9 @@ def list_orders():
 
         # Otherwise -> writer browsing marketplace
         else:
-            # --------------------------------------------------
-            # Exclude orders the writer has already bid on
-            # --------------------------------------------------
-            if user.role == "writer":
-                writer_bid_order_ids = (
-                    db.session.query(Bid.order_id)
-                    .filter(Bid.user_id == user.id)
-                )
-                q = q.filter(~Order.id.in_(writer_bid_order_ids))
-
-            # Exclude orders they've declined
-            declined_ids = db.session.query(DeclinedOrder.order_id).filter_by(writer_id=user.id)
-            if status == "declined":
-                q = q.filter(Order.id.in_(declined_ids))
-            else:
-                q = q.filter(~Order.id.in_(declined_ids))
-
-            # Exclude orders with accepted bids (assigned orders)
-            accepted_bid_order_ids = db.session.query(Bid.order_id).filter(Bid.status == "accepted")
-            if user.role != "client":
-                q = q.filter(~Order.id.in_(accepted_bid_order_ids))
+            # Open listings minus the orders this writer has bid on or
+            # declined (both maintained by marketplace_service)
+            q = filter_marketplace(q, user.id, status)
 
             # Handle invited orders
             if status == "invited":
@@ -151,18 +137,10 @@ def list_orders():
             if status and status not in ["invited", "declined"]:
                 q = q.filter_by(status=status)
 
-    # Search filter
+    # Search filter (full-text on PostgreSQL, ILIKE elsewhere)
+    rank = None
     if search:
-        search_term = f"%{search}%"
-        q = q.filter(
-            or_(
-                cast(Order.id, String).ilike(search_term),
-                Order.title.ilike(search_term),
-                Order.subject.ilike(search_term),
-                Order.description.ilike(search_term),
-                Order.status.ilike(search_term)
-            )
-        )
+        q, rank = apply_order_search(q, search)
 
     # Budget/date filters
     if min_budget is not None:
@@ -193,34 +171,21 @@ def list_orders():
             pass
 
     # Pagination & serialization
-    items, pagination = paginate_query(q.order_by(Order.created_at.desc()), page, limit)
-    orders = []
-    for o in items:
-        orders.append({
-            "id": o.id,
-            "title": o.title,
-            "subject": o.subject,
-            "type": o.type,
-            "pages": o.pages,
-            "deadline": o.deadline.astimezone(timezone.utc).isoformat() if o.deadline else None,
-            "budget": format_money(
-                o.writer_budget
-                if user.role == "writer"
-                else o.client_budget
-            ),
-            "status": o.status,
-            "client": {
-                "id": o.client.id,
-                "name": o.client.full_name,
-                "country": o.client.country,
-                "avatar": o.client.profile_image
-            } if o.client else None,
-            "created_at": o.created_at.isoformat() + "Z" if o.created_at else None,
-            "writer_assigned": o.writer_id is not None,
-            "citation_style": o.citation_style,
-            "format": o.format,
-            "language": o.language,
-        })
+    q = q.options(*order_list_load())
+    if rank is not None:
+        # Ranked results are paged by offset; cursors only follow created_at
+        items, pagination = paginate_query(
+            q.order_by(rank.desc(), Order.created_at.desc()), page, limit,
+            count=request.args.get("count"),
+        )
+    else:
+        items, pagination = paginate_query(
+            q, page, limit,
+            keyset=(Order.created_at, Order.id),
+            cursor=request.args.get("cursor"),
+            count=request.args.get("count"),
+        )
+    orders = [serialize_order_list_item(o, user) for o in items]
 
     return success_response({"orders": orders, "pagination": pagination})
 
@@ -273,22 +238,16 @@ def serialize_order(order, viewer):
         for inv in order.invitations
     ]
 
-    # Attach file URLs
-    root_dir = current_app.config.get("ORDERS_FOLDER", "uploads/orders")
-    order_dir = os.path.join(root_dir, str(order.client_id), order.id)
-
-    if os.path.exists(order_dir):
-        data["files"] = [
-            url_for(
-                "orders.get_order_file",
-                order_id=order.id,
-                filename=f,
-                _external=True
-            )
-            for f in os.listdir(order_dir)
-        ]
-    else:
-        data["files"] = []
+    # Attach file URLs (from the manifest, not the uploads volume)
+    data["files"] = [
+        url_for(
+            "orders.get_order_file",
+            order_id=order.id,
+            filename=a.filename,
+            _external=True
+        )
+        for a in order.attachments
+    ]
 
     return data
 
@@ -319,7 +278,13 @@ def get_order(order_id):
         else:
             deadline_utc = order.deadline
 
-    return success_response(serialize_order(order, user))
+    # Polling: answer unchanged orders before touching relationships
+    etag = make_etag(order.id, order.updated_at or order.created_at, user.role)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    return with_etag(success_response(serialize_order(order, user)), etag)
 
 
 # ------------------------------------------------------------
@@ -625,29 +590,23 @@ def patch_order(order_id):
     os.makedirs(order_dir, exist_ok=True)
 
     # Remove deleted files
-    for fname in os.listdir(order_dir):
-        if fname not in existing_filenames:
-            try:
-                os.remove(os.path.join(order_dir, fname))
-            except OSError:
-                pass
+    changed = False
+    for attachment in list(order.attachments):
+        if attachment.filename not in existing_filenames:
+            remove_order_attachment(order_dir, attachment)
+            changed = True
 
     # Save new uploads
     for file in files:
         if file and file.filename:
-            save_uploaded_file(file, order_dir)
+            save_uploaded_file(file, order_dir, order=order)
+            changed = True
 
-    attachments = os.listdir(order_dir) if os.path.exists(order_dir) else []
-    base_text = (order.requirements or "").split("\n\n[Attachments:")[0]
+    if changed:
+        order.updated_at = datetime.now(timezone.utc)
 
-    if attachments:
-        order.requirements = (
-            f"{base_text}\n\n"
-            f"[Attachments: {len(attachments)} file(s)]\n"
-            + "\n".join(attachments)
-        )
-    else:
-        order.requirements = base_text
+    # Drop the legacy "[Attachments: ...]" blob; the manifest replaces it
+    order.requirements = (order.requirements or "").split("\n\n[Attachments:")[0]
 
     db.session.commit()
 
@@ -658,10 +617,10 @@ def patch_order(order_id):
         url_for(
             "orders.get_order_file",
             order_id=order.id,
-            filename=f,
+            filename=a.filename,
             _external=True,
         )
-        for f in attachments
+        for a in order.attachments
     ]
 
     return success_response(
@@ -730,6 +689,7 @@ def decline_order(order_id):
 
     declined = DeclinedOrder(order_id=order.id, writer_id=user.id, reason=reason)
     db.session.add(declined)
+    exclude_from_marketplace(order.id, user.id, "declined")
     db.session.commit()
 
     return success_response({
@@ -798,6 +758,7 @@ def cancel_order(order_id):
 
     order.status = "cancelled"
     order.updated_at = datetime.utcnow()
+    close_marketplace_listing(order)
     db.session.commit()
 
     # Notify writer if assigned
@@ -856,6 +817,96 @@ def preview_pricing():
     return success_response({"min_budget": min_budget})
 
 
+# ------------------------------------------------------------
+#  POST /orders/pricing/batch — Many pricing quotes in one call
+#  Body: {"quotes": [{category, orderType, pages, deadline}, ...]}
+#    or  {"grid": {categories, orderTypes, pages, deadlines | hours}}
+#  Grid fields take a value or a list; prices come back flat in
+#  category → orderType → pages → deadline order, with the grid shape.
+# ------------------------------------------------------------
+MAX_PRICING_QUOTES = 5000
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _hours_until(deadline, now):
+    parsed = parser.isoparse(deadline)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - now).total_seconds() / 3600
+
+
+@bp.route("/pricing/batch", methods=["POST"])
+@jwt_required(optional=True)
+def batch_pricing():
+    data = request.get_json(silent=True) or {}
+    now = datetime.now(timezone.utc)
+
+    try:
+        if "grid" in data:
+            grid = data.get("grid") or {}
+            categories = _as_list(grid.get("categories"))
+            order_types = _as_list(grid.get("orderTypes"))
+            pages = [int(p) if p else None for p in _as_list(grid.get("pages"))]
+            if grid.get("hours") is not None:
+                hours = [float(h) for h in _as_list(grid["hours"])]
+            else:
+                hours = [_hours_until(d, now) for d in _as_list(grid.get("deadlines"))]
+
+            shape = [len(categories), len(order_types), len(pages), len(hours)]
+            total = shape[0] * shape[1] * shape[2] * shape[3]
+            if total > MAX_PRICING_QUOTES:
+                return error_response(
+                    "VALIDATION_ERROR",
+                    f"Grid expands to {total} quotes (max {MAX_PRICING_QUOTES})",
+                    status=400
+                )
+
+            columns = list(zip(*product(categories, order_types, pages, hours))) or [[]] * 4
+            prices = calculate_minimum_prices(*columns)
+            return success_response({"prices": prices, "shape": shape, "count": total})
+
+        quotes = data.get("quotes")
+        if not isinstance(quotes, list):
+            return error_response("VALIDATION_ERROR", "Provide quotes or grid", status=400)
+        if len(quotes) > MAX_PRICING_QUOTES:
+            return error_response(
+                "VALIDATION_ERROR",
+                f"Too many quotes (max {MAX_PRICING_QUOTES})",
+                status=400
+            )
+
+        prices = calculate_minimum_prices(
+            [q.get("category") for q in quotes],
+            [q.get("orderType") for q in quotes],
+            [int(q["pages"]) if q.get("pages") else None for q in quotes],
+            [_hours_until(q["deadline"], now) for q in quotes],
+        )
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return error_response(
+            "VALIDATION_ERROR",
+            "Each quote needs a valid deadline and numeric pages",
+            status=400
+        )
+
+    return success_response({"prices": prices, "count": len(prices)})
+
+
+# ------------------------------------------------------------
+#  GET /orders/pricing/table — Versioned price table for local quotes
+# ------------------------------------------------------------
+@bp.route("/pricing/table", methods=["GET"])
+def get_pricing_table():
+    table = pricing_table()
+    resp, status = success_response({"pricing": table})
+    resp.set_etag(table["version"])
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 3600
+    return resp.make_conditional(request)
+
+
 @bp.route("/<order_id>/review", methods=["POST"])
 @jwt_required()
 def review_writer(order_id):
@@ -2,6 +2,7 @@ from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User
 from app.utils.response_formatter import success_response, error_response
+from app.utils.pagination import paginate_query
 from app.models.payment_method import PaymentMethod
 from app.extensions import db
 
@@ -50,12 +51,11 @@ def transactions():
 
     q = WalletTransaction.query.filter_by(wallet_id=wallet.id)
 
-    total = q.count()
-    items = (
-        q.order_by(WalletTransaction.created_at.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
+    items, pagination = paginate_query(
+        q, page, limit,
+        keyset=(WalletTransaction.created_at, WalletTransaction.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
     return success_response({
@@ -67,15 +67,11 @@ def transactions():
                 "reference_type": t.reference_type,
                 "reference_id": t.reference_id,
                 "description": t.description,
-                "created_at": t.created_at.isoformat() + "Z"
+                "created_at": t.created_at
             }
             for t in items
         ],
-        "pagination": {
-            "total": total,
-            "page": page,
-            "limit": limit
-        }
+        "pagination": pagination
     })
 
 
@@ -127,12 +123,11 @@ def list_withdrawals():
 
     q = WithdrawalRequest.query.filter_by(user_id=uid)
 
-    total = q.count()
-    items = (
-        q.order_by(WithdrawalRequest.requested_at.desc())
-         .offset((page - 1) * limit)
-         .limit(limit)
-         .all()
+    items, pagination = paginate_query(
+        q, page, limit,
+        keyset=(WithdrawalRequest.requested_at, WithdrawalRequest.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
     return success_response({
@@ -143,20 +138,12 @@ def list_withdrawals():
                 "status": w.status,
                 "method": w.method,
                 "destination": w.destination,
-                "requested_at": w.requested_at.isoformat() + "Z",
-                "processed_at": (
-                    w.processed_at.isoformat() + "Z"
-                    if w.processed_at else None
-                )
+                "requested_at": w.requested_at,
+                "processed_at": w.processed_at
             }
             for w in items
         ],
-        "pagination": {
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total + limit - 1) // limit
-        }
+        "pagination": pagination
     })
 
 
@@ -382,12 +369,11 @@ def wallet_transactions():
     if tx_type:
         q = q.filter(WalletTransaction.type == tx_type)
 
-    total = q.count()
-    items = (
-        q.order_by(WalletTransaction.created_at.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
+    items, pagination = paginate_query(
+        q, page, limit,
+        keyset=(WalletTransaction.created_at, WalletTransaction.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
     return success_response({
@@ -398,16 +384,11 @@ def wallet_transactions():
                 "amount": float(t.amount),
                 "description": t.description,
                 "reference": t.reference_id,
-                "created_at": t.created_at.isoformat() + "Z"
+                "created_at": t.created_at
             }
             for t in items
         ],
-        "pagination": {
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total + limit - 1) // limit
-        }
+        "pagination": pagination
     })
 
 
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User
 from app.extensions import db
 from app.utils.response_formatter import success_response, error_response
+from app.utils.conditional import make_etag, not_modified, with_etag
 
 from sqlalchemy import func, desc
 from app.models.review import Review
@@ -74,6 +75,23 @@ def get_profile():
 
     profile = WriterProfile.query.filter_by(user_id=uid).first()
 
+    # Polling: the metrics only move when the writer's orders or reviews do
+    order_mark = db.session.query(
+        func.count(Order.id),
+        func.max(func.coalesce(Order.updated_at, Order.created_at)),
+    ).filter(Order.writer_id == uid).one()
+    review_mark = db.session.query(
+        func.count(Review.id),
+        func.max(Review.created_at),
+    ).filter(Review.reviewee_id == uid).one()
+    etag = make_etag(
+        u.id, u.updated_at, profile.updated_at if profile else None,
+        *order_mark, *review_mark
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     # ---- Orders ----
     total_orders = db.session.query(func.count(Order.id))\
         .filter(Order.writer_id == uid)\
@@ -106,7 +124,7 @@ def get_profile():
 
     is_complete, missing = is_writer_profile_complete(u)
 
-    return success_response({
+    return with_etag(success_response({
         "user": u.to_dict(),
         "writer_profile": profile.to_dict() if profile else None,
         "metrics": {
@@ -120,7 +138,7 @@ def get_profile():
             "is_complete": is_complete,
             "missing_fields": missing
         }
-    })
+    }), etag)
 
 
 @bp.route("", methods=["PATCH"])
@@ -136,7 +154,7 @@ def patch_profile():
     if "bio" in data:
         u.bio = data.get("bio")
     db.session.commit()
-    return success_response({"id": u.id, "full_name": u.full_name, "bio": u.bio, "updated_at": u.joined_at.isoformat() + "Z"})
+    return success_response({"id": u.id, "full_name": u.full_name, "bio": u.bio, "updated_at": (u.updated_at or u.joined_at).isoformat() + "Z"})
 
 @bp.route("/leaderboard", methods=["GET"])
 @jwt_required()
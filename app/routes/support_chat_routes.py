@@ -2,7 +2,6 @@ import uuid
 import os
 from flask import Blueprint, request, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
 
 from app.extensions import db
 from app.models.support_chat import SupportChat
@@ -11,14 +10,20 @@ from app.models.user import User
 from app.services.support_chat_service import (
     get_or_create_support_chat,
     add_support_message,
-    save_support_file
+    save_support_file,
+    mark_support_chat_read,
 )
-from app.services.chat_behavior_analyzer import analyze_chat_behavior
+from app.services.chat_behavior_analyzer import refresh_warning, warning_in_effect
 from app.utils.response_formatter import success_response, error_response
+from app.utils.pagination import paginate_query, paginate_window
+from app.serializers.support_chat import (
+    support_chat_list_load,
+    support_message_list_load,
+    serialize_support_chat_list_item,
+    serialize_support_message
+)
 from app.models.user import User
 from mimetypes import guess_type
-from sqlalchemy import desc
-from sqlalchemy import func
 
 bp = Blueprint("support_chat", __name__, url_prefix="/api/v1/support-chat")
 
@@ -53,26 +58,25 @@ def list_messages(chat_id):
     messages_q = (
         SupportMessage.query
         .filter_by(support_chat_id=chat_id)
-        .order_by(SupportMessage.created_at.asc())
-        .all()
+        .options(*support_message_list_load())
     )
 
-    messages = [{
-        "id": m.id,
-        "sender": {
-            "id": m.sender.id,
-            "name": m.sender.full_name,
-            "avatar": m.sender.profile_image,
-            "role": m.sender.role
-        },
-        "content": m.content,
-        "sent_at": m.created_at.isoformat() + "Z",
-        "is_read": m.is_read,
-        "attachments": m.attachments or []
-    } for m in messages_q]
+    after, before = request.args.get("after"), request.args.get("before")
+    if after or before:
+        items, pagination = paginate_window(
+            messages_q, (SupportMessage.created_at, SupportMessage.id),
+            after, before, request.args.get("limit", 50),
+        )
+    else:
+        # No position: the whole history, as older clients expect
+        items = messages_q.order_by(SupportMessage.created_at.asc(), SupportMessage.id.asc()).all()
+        pagination = None
+
+    messages = [serialize_support_message(m) for m in items]
 
     return success_response({
         "messages": messages,
+        "pagination": pagination,
         "warning": (
             {
                 "active": chat.warning_active,
@@ -80,7 +84,7 @@ def list_messages(chat_id):
                 "message": chat.warning_message,
                 "expires_at": chat.warning_expires_at.isoformat() + "Z"
             }
-            if chat.warning_active and chat.warning_for_user_id == uid
+            if warning_in_effect(chat) and chat.warning_for_user_id == uid
             else None
         )
     })
@@ -125,26 +129,10 @@ def post_message(chat_id):
     db.session.commit()
 
     # ---------- Behavior analysis ----------
-    history = (
-        SupportMessage.query
-        .filter_by(support_chat_id=chat_id)
-        .order_by(SupportMessage.created_at.desc())
-        .limit(25)
-        .all()[::-1]
-    )
-
-    analysis = analyze_chat_behavior(history)
+    analysis = refresh_warning(chat, uid)
     warning = None
 
     if analysis["risk"] in ("medium", "high"):
-        chat.warning_active = True
-        chat.warning_risk = analysis["risk"]
-        chat.warning_message = (
-            "We detected attempts to share personal or contact information. "
-            "Please keep communication within the platform."
-        )
-        chat.warning_expires_at = datetime.utcnow() + timedelta(days=7)
-        chat.warning_for_user_id = uid
         db.session.commit()
 
         warning = {
@@ -208,68 +196,27 @@ def list_support_chats():
     page = max(int(request.args.get("page", 1)), 1)
     limit = min(int(request.args.get("limit", 20)), 100)
 
-    base_query = SupportChat.query.order_by(
-        desc(SupportChat.created_at)
-    )
-
-    pagination = base_query.paginate(
-        page=page,
-        per_page=limit,
-        error_out=False
+    # Filters run on the summary columns, most recent activity first
+    query = SupportChat.query.options(*support_chat_list_load())
+    if request.args.get("unresolved", "").lower() in ("1", "true", "yes"):
+        query = query.filter(SupportChat.status == "open")
+    if request.args.get("unread", "").lower() in ("1", "true", "yes"):
+        query = query.filter(SupportChat.unread_count > 0)
+
+    chats, meta = paginate_query(
+        query, page, limit,
+        keyset=(SupportChat.last_message_at, SupportChat.id),
+        cursor=request.args.get("cursor"),
+        count=request.args.get("count"),
     )
 
-    chats = pagination.items
-
-    results = []
-
-    unread_counts = (
-        db.session.query(
-            SupportMessage.support_chat_id,
-            func.count(SupportMessage.id).label("unread_count")
-        )
-        .filter_by(is_read=False)
-        .group_by(SupportMessage.support_chat_id)
-        .all()
-    )
-    unread_map = {chat_id: count for chat_id, count in unread_counts}
-
-    for chat in chats:
-        unread_count = unread_map.get(chat.id, 0)
-
-        user = User.query.get(chat.user_id)
-
-        last_msg = (
-            SupportMessage.query
-            .filter_by(support_chat_id=chat.id)
-            .order_by(SupportMessage.created_at.desc())
-            .first()
-        )
-
-        results.append({
-            "id": chat.id,
-            "user": {
-                "id": user.id,
-                "name": user.full_name or "User",
-                "role": user.role,
-            },
-            "last_message": last_msg.content if last_msg else "",
-            "last_message_at": (
-                last_msg.created_at.isoformat() + "Z"
-                if last_msg else None
-            ),
-            "unread_count": unread_count
-        })
+    pagination = dict(meta, page=page, has_next=meta["has_more"], has_prev=page > 1)
+    if "total_pages" in meta:
+        pagination["pages"] = meta["total_pages"]
 
     return success_response({
-        "chats": results,
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total": pagination.total,
-            "pages": pagination.pages,
-            "has_next": pagination.has_next,
-            "has_prev": pagination.has_prev
-        }
+        "chats": [serialize_support_chat_list_item(chat) for chat in chats],
+        "pagination": pagination,
     })
 
 
@@ -279,12 +226,7 @@ def mark_chat_read(chat_id):
     uid = get_jwt_identity()
     chat = SupportChat.query.get_or_404(chat_id)
 
-    SupportMessage.query.filter_by(
-        support_chat_id=chat_id,
-        is_read=False
-    ).update({ "is_read": True })
-
-    chat.unread_count = 0
+    mark_support_chat_read(chat, uid)
     db.session.commit()
 
     return success_response({ "status": "ok" })
@@ -0,0 +1,15 @@
+"""
+Response serializers for list endpoints.
+
+Each module pairs a serializer with the loader options (`*_load()`) its list
+query needs, so a page of N rows costs a constant number of queries:
+
+    q = q.options(*order_list_load())
+    items, pagination = paginate_query(q, ...)
+    orders = [serialize_order_list_item(o, user) for o in items]
+
+Anything a serializer reads beyond the row's own columns must be covered by
+its *_load() options or fetched in one batch for the whole page. The options
+are built on call rather than at import, since building them configures the
+mappers and every model has to be imported first.
+"""
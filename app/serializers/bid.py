@@ -0,0 +1,26 @@
+from sqlalchemy.orm import contains_eager, selectinload
+
+from app.models.bid import Bid
+
+# Bid.serialize reads bid.order (derived status) and, with
+# include_user_info, bid.user.
+
+# Writer/client bid lists: the query already joins Order, so reuse that join
+def bid_joined_order_load():
+    return (contains_eager(Bid.order),)
+
+
+def bid_joined_order_with_writer_load():
+    return (contains_eager(Bid.order), selectinload(Bid.user))
+
+
+# Bids on a single order (no join; the order is loaded by the route)
+def bid_with_writer_load():
+    return (selectinload(Bid.order), selectinload(Bid.user))
+
+
+def serialize_bids(bids, viewer_role, include_user_info=False):
+    return [
+        b.serialize(include_user_info=include_user_info, viewer_role=viewer_role)
+        for b in bids
+    ]
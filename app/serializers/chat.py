@@ -0,0 +1,94 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.chat import Chat
+from app.models.message import Message
+from app.services.chat_behavior_analyzer import warning_in_effect
+from app.services.chat_service import inbox_expressions
+
+
+def serialize_warning(chat, uid):
+    if warning_in_effect(chat) and chat.warning_for_user_id == uid:
+        return {
+            "active": chat.warning_active,
+            "risk": chat.warning_risk,
+            "message": chat.warning_message,
+            "expires_at": chat.warning_expires_at.isoformat() + "Z"
+        }
+    return None
+
+
+# ------------------------------------------------------------
+#  GET /chats
+# ------------------------------------------------------------
+def chat_list_load(uid):
+    # All many-to-one plus two scalar subqueries, so the whole inbox page is
+    # one SELECT
+    return (
+        joinedload(Chat.order),
+        joinedload(Chat.client),
+        joinedload(Chat.writer),
+        joinedload(Chat.last_message),
+        *inbox_expressions(uid),
+    )
+
+
+def serialize_last_message(last_msg, is_read):
+    if last_msg is None:
+        return None
+    return {
+        "content": last_msg.content,
+        "sent_at": last_msg.created_at.isoformat() + "Z",
+        "is_read": bool(is_read),
+    }
+
+
+def _last_message_read(chat, uid):
+    last_msg = chat.last_message
+    if last_msg is None:
+        return False
+    if last_msg.sender_id == uid:
+        return last_msg.created_at <= chat.other_read_at
+    return chat.unread_count == 0
+
+
+def serialize_chat_list_item(chat, uid):
+    other_user = chat.writer if chat.client_id == uid else chat.client
+
+    return {
+        "id": chat.id,
+        "order_id": chat.order_id,
+        "order_title": chat.order.title if chat.order else None,
+        "other_user": {
+            "id": other_user.id if other_user else None,
+            "name": other_user.full_name if other_user else None,
+            "avatar": other_user.profile_image if other_user else None,
+            "role": other_user.role if other_user else None,
+        },
+        "warning": serialize_warning(chat, uid),
+        "last_message": serialize_last_message(chat.last_message, _last_message_read(chat, uid)),
+        "last_message_at": chat.last_message_at.isoformat() + "Z",
+        "unread_count": chat.unread_count,
+    }
+
+
+# ------------------------------------------------------------
+#  GET /chats/<chat_id>/messages
+# ------------------------------------------------------------
+def message_list_load():
+    return (selectinload(Message.sender),)
+
+
+def serialize_message(m, is_read):
+    return {
+        "id": m.id,
+        "chat_id": m.chat_id,
+        "sender": {
+            "id": m.sender.id,
+            "name": m.sender.full_name,
+            "avatar": m.sender.profile_image,
+        },
+        "content": m.content,
+        "sent_at": m.created_at.isoformat() + "Z",
+        "is_read": is_read,
+        "attachments": [],
+    }
@@ -0,0 +1,48 @@
+from datetime import timezone
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy.orm import selectinload
+
+from app.models.order import Order
+
+
+def format_money(value):
+    if value is None:
+        return None
+    return float(
+        Decimal(value).quantize(Decimal("0.00"), rounding=ROUND_HALF_UP)
+    )
+
+
+# ------------------------------------------------------------
+#  GET /orders
+# ------------------------------------------------------------
+def order_list_load():
+    return (selectinload(Order.client),)
+
+
+def serialize_order_list_item(o, viewer):
+    return {
+        "id": o.id,
+        "title": o.title,
+        "subject": o.subject,
+        "type": o.type,
+        "pages": o.pages,
+        "deadline": o.deadline.astimezone(timezone.utc).isoformat() if o.deadline else None,
+        "budget": format_money(
+            o.writer_budget
+            if viewer.role == "writer"
+            else o.client_budget
+        ),
+        "status": o.status,
+        "client": {
+            "id": o.client.id,
+            "name": o.client.full_name,
+            "country": o.client.country,
+            "avatar": o.client.profile_image
+        } if o.client else None,
+        "created_at": o.created_at.isoformat() + "Z" if o.created_at else None,
+        "writer_assigned": o.writer_id is not None,
+        "citation_style": o.citation_style,
+        "format": o.format,
+        "language": o.language,
+    }
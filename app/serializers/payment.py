@@ -0,0 +1,26 @@
+from sqlalchemy.orm import contains_eager
+
+from app.models.withdrawal_request import WithdrawalRequest
+
+# ------------------------------------------------------------
+#  GET /admin/withdrawals (query joins User for the search filter)
+# ------------------------------------------------------------
+def admin_withdrawal_list_load():
+    return (contains_eager(WithdrawalRequest.user),)
+
+
+def serialize_admin_withdrawal(w):
+    return {
+        "id": w.id,
+        "amount": float(w.amount),
+        "status": w.status,
+        "method": w.method,
+        "destination": w.destination,
+        "requested_at": w.requested_at,
+        "writer": {
+            "id": w.user.id,
+            "name": w.user.full_name,
+            "email": w.user.email,
+            "avatar": w.user.profile_image,
+        }
+    }
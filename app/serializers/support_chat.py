@@ -0,0 +1,55 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.support_chat import SupportChat
+from app.models.support_message import SupportMessage
+
+
+# ------------------------------------------------------------
+#  GET /support-chat (admin inbox)
+# ------------------------------------------------------------
+def support_chat_list_load():
+    # Summary columns live on the chat; with the two joins a page is one SELECT
+    return (joinedload(SupportChat.user), joinedload(SupportChat.last_message))
+
+
+def serialize_support_chat_list_item(chat):
+    user = chat.user
+    last_msg = chat.last_message
+    return {
+        "id": chat.id,
+        "user": {
+            "id": user.id,
+            "name": user.full_name or "User",
+            "role": user.role,
+        },
+        "status": chat.status,
+        "last_message": last_msg.content if last_msg else "",
+        "last_message_at": (
+            last_msg.created_at.isoformat() + "Z"
+            if last_msg else None
+        ),
+        "unread_count": chat.unread_count
+    }
+
+
+# ------------------------------------------------------------
+#  GET /support-chat/<chat_id>/messages
+# ------------------------------------------------------------
+def support_message_list_load():
+    return (selectinload(SupportMessage.sender),)
+
+
+def serialize_support_message(m):
+    return {
+        "id": m.id,
+        "sender": {
+            "id": m.sender.id,
+            "name": m.sender.full_name,
+            "avatar": m.sender.profile_image,
+            "role": m.sender.role
+        },
+        "content": m.content,
+        "sent_at": m.created_at.isoformat() + "Z",
+        "is_read": m.is_read,
+        "attachments": m.attachments or []
+    }
@@ -1,6 +1,7 @@
 from app.extensions import db
 from app.models.bid import Bid
 from app.models.order import Order
+from app.services.marketplace_service import exclude_from_marketplace
 from datetime import datetime, timedelta
 from app.utils.response_formatter import error_response
 
@@ -28,5 +29,6 @@ def place_bid(order_id, user_id, writer_amount, client_amount, message=None):
     )
 
     db.session.add(bid)
+    exclude_from_marketplace(order_id, user_id, "bid")
     db.session.commit()
     return bid
@@ -1,15 +1,45 @@
 import re
-from presidio_analyzer import AnalyzerEngine
-from app.services.chat_service import normalize_text
-
-analyzer = AnalyzerEngine()
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.extensions import db
+from app.models.chat import Chat
+from app.models.message import Message
+from app.models.support_chat import SupportChat
+from app.models.support_message import SupportMessage
+from app.services import chat_events
+from app.services.chat_service import normalize_text, count_redactions
 
 WINDOW = 25
 
+_PII_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[A-Za-z]{2,}",
+        r"\+?\d{9,15}",
+        r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{3,4}\b",
+        r"[A-Za-z0-9._%+-]+@[A-Za-z]+",  # very loose username@domain
+    )
+]
+_DIGIT = re.compile(r"\d")
+
+CHAT_WARNING = (
+    "We detected possible attempts to share contact or personal information. "
+    "Continued violations may lead to account suspension."
+)
+SUPPORT_WARNING = (
+    "We detected attempts to share personal or contact information. "
+    "Please keep communication within the platform."
+)
+
 def analyze_chat_behavior(messages):
     """
     messages = list of message objects (sorted by ascending time)
-    Returns: { "risk": low|medium|high, "detected": [list of PII] }
+    Returns: { "risk": low|medium|high, "entities": [entity types seen] }
+
+    The NLP pass runs once per message, when it is written
+    (chat_service.moderate stores pii_hits / pii_entities). Here the stored
+    hits are summed and only the regexes run over the joined window, to catch
+    contact details split across several messages.
     """
 
     # 1. Combine all message content
@@ -18,30 +48,26 @@ def analyze_chat_behavior(messages):
     # 2. Normalize obfuscation
     norm = normalize_text(raw_text)
 
-    print(f"chat content = {norm}")
-
-    # 3. Presidio hits
-    presidio_hits = analyzer.analyze(text=norm, language="en")
+    # 3. Stored per-message hits (redactions made at write time)
+    redacted_count = 0
+    entities = set()
+    for m in messages:
+        if m.pii_hits is None:  # written before the analysis was stored
+            redacted_count += count_redactions(m.content)
+        else:
+            redacted_count += m.pii_hits
+            entities.update(m.pii_entities or [])
 
-    # 4. Regex fallback hits
-    regex_hits = []
-    PII_PATTERNS = [
-        r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[A-Za-z]{2,}",
-        r"\+?\d{9,15}",
-        r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{3,4}\b",
-        r"[A-Za-z0-9._%+-]+@[A-Za-z]+"  # very loose username@domain
+    # 4. Regex fallback hits (a pattern needs its "@" or a digit to match)
+    has_at, has_digit = "@" in norm, _DIGIT.search(norm) is not None
+    regex_hits = [
+        regex.pattern
+        for regex in _PII_PATTERNS
+        if (has_at if "@" in regex.pattern else has_digit) and regex.search(norm)
     ]
 
-    for p in PII_PATTERNS:
-        if re.search(p, norm, re.IGNORECASE):
-            regex_hits.append(p)
-
-    # 5. Detect previously redacted PII
-    # redacted_count = norm.count("REDACTED")
-    redacted_count = len(re.findall(r"\[REDACTED\]", norm))
-
-    # 6. Calculate risk score
-    total_hits = len(presidio_hits) + len(regex_hits) + redacted_count
+    # 5. Calculate risk score
+    total_hits = redacted_count + len(regex_hits)
 
     if total_hits >= 2:
         risk = "high"
@@ -52,8 +78,80 @@ def analyze_chat_behavior(messages):
 
     return {
         "risk": risk,
-        "presidio_hits": presidio_hits,
+        "entities": sorted(entities),
         "regex_hits": regex_hits,
         "redacted_count": redacted_count,
         "normalized_text": norm,
     }
+
+
+def recent_messages(chat):
+    """The last WINDOW messages of a Chat or SupportChat, oldest first."""
+    if isinstance(chat, Chat):
+        q = Message.query.filter_by(chat_id=chat.id)
+        created = Message.created_at
+    else:
+        q = SupportMessage.query.filter_by(support_chat_id=chat.id)
+        created = SupportMessage.created_at
+    return q.order_by(created.desc()).limit(WINDOW).all()[::-1]
+
+
+def refresh_warning(chat, sender_id):
+    """
+    Score the chat's recent window and, on medium/high risk, put a 7 day
+    warning on it for `sender_id`. The caller commits. Returns the analysis.
+    """
+    analysis = analyze_chat_behavior(recent_messages(chat))
+
+    if analysis["risk"] in ("medium", "high"):
+        chat.warning_active = True
+        chat.warning_risk = analysis["risk"]
+        chat.warning_message = CHAT_WARNING if isinstance(chat, Chat) else SUPPORT_WARNING
+        chat.warning_expires_at = datetime.utcnow() + timedelta(days=7)
+        chat.warning_for_user_id = sender_id
+        if isinstance(chat, Chat):
+            publish_warning(chat)
+
+    return analysis
+
+
+def warning_in_effect(chat, now=None):
+    """
+    True while the chat's warning is active and not yet expired. Read paths
+    use this instead of clearing expired warnings themselves; the rows are
+    cleared in bulk by clear_expired_warnings().
+    """
+    if not chat.warning_active:
+        return False
+    expires = chat.warning_expires_at
+    return expires is None or expires > (now or datetime.utcnow())
+
+
+def clear_expired_warnings(now=None):
+    """
+    Clear every expired warning on chats and support chats, one UPDATE per
+    table. The caller commits. Returns {table name: rows cleared}.
+    """
+    now = now or datetime.utcnow()
+    cleared = {}
+    for model in (Chat, SupportChat):
+        result = db.session.execute(
+            update(model)
+            .where(model.warning_active == True, model.warning_expires_at < now)
+            .values(warning_active=False, warning_risk=None,
+                    warning_message=None, warning_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        cleared[model.__tablename__] = result.rowcount
+    return cleared
+
+
+def publish_warning(chat):
+    """Push the chat's current warning (or its removal) to live streams."""
+    chat_events.publish(chat.id, "warning", {
+        "for_user_id": chat.warning_for_user_id if chat.warning_active else None,
+        "active": bool(chat.warning_active),
+        "risk": chat.warning_risk,
+        "message": chat.warning_message,
+        "expires_at": chat.warning_expires_at.isoformat() + "Z" if chat.warning_expires_at else None,
+    })
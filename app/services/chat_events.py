@@ -0,0 +1,356 @@
+"""
+Live chat events for GET /chats/<id>/stream (Server-Sent Events).
+
+publish() attaches an event to the current transaction; once it commits,
+every worker process hands it to the streams it serves for that chat. A
+rolled back transaction publishes nothing, and a failure to send is logged
+without affecting the write that produced the event.
+
+Fan-out between gunicorn workers (CHAT_EVENTS_BACKEND):
+
+- "postgres": NOTIFY on the chat_events channel, sent after the commit.
+  Each worker keeps one LISTEN connection on a background thread, outside
+  the SQLAlchemy pool.
+- "redis": Redis pub/sub on CHAT_EVENTS_REDIS_URL, for databases without
+  LISTEN/NOTIFY (CockroachDB).
+- "local": in-process only (single worker, tests).
+- "auto" (default): postgres when the database supports NOTIFY, otherwise
+  redis if CHAT_EVENTS_REDIS_URL is set, otherwise local.
+
+Message events carry an SSE id, "<sent_at>|<message id>". A client that
+reconnects sends it back as Last-Event-ID and the route replays what it
+missed (chat_service.replay_after). When events may have been lost and cannot be
+replayed (the stream was dropped as too slow, or the listener had to
+reconnect), streams get a "resync" event: refetch with ?after=.
+
+A stream holds its connection open for as long as the client is connected,
+so serve it from a worker class built for idle connections (gevent, see
+gunicorn.conf.py): a sync or gthread worker gives each stream a whole
+thread. benchmarks/sse_listeners.py measures how many one node holds.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+
+try:
+    import redis
+except ImportError:  # only needed for the redis backend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "chat_events"
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD = 7900
+# Events buffered per stream before a slow client is dropped (it reconnects)
+QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15
+# How long subscribe() waits for the listener to be LISTENing
+LISTEN_TIMEOUT = 5
+
+_lock = threading.Lock()
+_subscribers = {}  # chat_id -> set of Subscriptions
+_listener = None
+_listening = threading.Event()  # set while the listener is subscribed
+_listened = False  # the listener has been subscribed before (so a restart lost events)
+_redis = None
+
+
+# ---------------------------------------
+# Publishing
+# ---------------------------------------
+
+def _backend():
+    if not has_app_context():
+        return "local"
+    backend = current_app.config.get("CHAT_EVENTS_BACKEND", "auto")
+    if backend != "auto":
+        return backend
+
+    resolved = current_app.extensions.get("chat_events_backend")
+    if resolved is None:
+        resolved = current_app.extensions["chat_events_backend"] = _detect_backend()
+    return resolved
+
+
+def _detect_backend():
+    if db.engine.dialect.name == "postgresql":
+        with db.engine.connect() as conn:
+            version = conn.exec_driver_sql("SELECT version()").scalar()
+        if "CockroachDB" not in version:
+            return "postgres"
+
+    if current_app.config.get("CHAT_EVENTS_REDIS_URL"):
+        return "redis"
+    logger.warning("Chat events: the database has no LISTEN/NOTIFY and "
+                   "CHAT_EVENTS_REDIS_URL is not set; streams only see events "
+                   "from their own worker process")
+    return "local"
+
+
+def publish(chat_id, kind, data):
+    """Send an event to the chat's streams when the current transaction commits."""
+    payload = json.dumps({"chat_id": chat_id, "event": kind, "data": data}, default=str)
+    if len(payload.encode()) > MAX_PAYLOAD:
+        # e.g. a very long message: tell clients to fetch it instead
+        payload = json.dumps({
+            "chat_id": chat_id, "event": kind,
+            "data": {"id": data.get("id"), "truncated": True},
+        })
+
+    db.session.connection()  # join a real transaction, so a rollback drops the event
+    db.session.info.setdefault("chat_events", []).append(payload)
+
+
+@event.listens_for(Session, "after_commit")
+def _send_pending(session):
+    pending = session.info.pop("chat_events", None)
+    if not pending:
+        return
+    # The write is already committed: a lost event must not fail the request
+    try:
+        backend = _backend()
+        if backend == "postgres":
+            with db.engine.begin() as conn:
+                for payload in pending:
+                    conn.execute(func.pg_notify(CHANNEL, payload).select())
+        elif backend == "redis":
+            client = _redis_client()
+            for payload in pending:
+                client.publish(CHANNEL, payload)
+        else:
+            for payload in pending:
+                _dispatch(payload)
+    except Exception:
+        logger.exception("Could not publish %d chat event(s)", len(pending))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    if not session.in_transaction():  # the outermost transaction ended
+        session.info.pop("chat_events", None)
+
+
+# ---------------------------------------
+# Subscribing
+# ---------------------------------------
+
+class Subscription:
+    """One stream's buffer of events for a chat."""
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+
+def subscribe(chat_id):
+    """A Subscription receiving the chat's events; pass it to stream()."""
+    _ensure_listener()
+    sub = Subscription(chat_id)
+    with _lock:
+        _subscribers.setdefault(chat_id, set()).add(sub)
+    return sub
+
+
+def unsubscribe(sub):
+    with _lock:
+        subs = _subscribers.get(sub.chat_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[sub.chat_id]
+
+
+def listener_count():
+    with _lock:
+        return sum(len(subs) for subs in _subscribers.values())
+
+
+def _dispatch(payload):
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed chat event: %r", payload[:200])
+        return
+
+    with _lock:
+        subs = list(_subscribers.get(message["chat_id"], ()))
+    for sub in subs:
+        _deliver(sub, message)
+
+
+def _deliver(sub, message):
+    try:
+        sub.queue.put_nowait(message)
+    except queue.Full:
+        unsubscribe(sub)
+        _close(sub)
+
+
+def _resync_all():
+    """Tell every stream that events may have been missed."""
+    with _lock:
+        subs = [sub for subs in _subscribers.values() for sub in subs]
+    for sub in subs:
+        _deliver(sub, {"chat_id": sub.chat_id, "event": "resync", "data": {}})
+
+
+def _close(sub):
+    """End a stream: drain its backlog and leave the end marker."""
+    while True:
+        try:
+            sub.queue.get_nowait()
+        except queue.Empty:
+            break
+    sub.queue.put_nowait(None)
+
+
+def event_id(data):
+    """SSE id of a message event: its (created_at, id) position."""
+    return f"{data['sent_at']}|{data['id']}"
+
+
+def _format(kind, data):
+    head = f"id: {event_id(data)}\n" if kind == "message" else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream(sub, uid, heartbeat=None, backlog=(), resync=False):
+    """
+    SSE body for one subscriber. `backlog` is the serialized messages to
+    replay first (see replay_after); `resync` starts the stream with a
+    resync event. Unsubscribes when the client goes away.
+    """
+    heartbeat = heartbeat or HEARTBEAT_SECONDS
+    try:
+        yield "retry: 3000\n\n"
+        if resync:
+            yield _format("resync", {})
+        replayed = set()
+        for data in backlog:
+            replayed.add(data["id"])
+            yield _format("message", data)
+
+        while True:
+            try:
+                message = sub.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                # dropped as too slow: refetch, then reconnect
+                yield _format("resync", {})
+                return
+
+            kind, data = message["event"], message["data"]
+            if kind == "message" and data.get("id") in replayed:
+                continue  # committed between subscribe() and the replay query
+            if kind == "warning":
+                # a warning is shown only to the participant it is for
+                if data.get("for_user_id") not in (None, uid):
+                    continue
+                data = {k: v for k, v in data.items() if k != "for_user_id"}
+            yield _format(kind, data)
+    finally:
+        unsubscribe(sub)
+
+
+# ---------------------------------------
+# Per-process listener
+# ---------------------------------------
+
+def _ensure_listener():
+    global _listener
+
+    backend = _backend()
+    if backend == "local":
+        return
+    with _lock:
+        if _listener is None or not _listener.is_alive():
+            _listening.clear()
+            target = _listen_postgres if backend == "postgres" else _listen_redis
+            app = current_app._get_current_object()
+            _listener = threading.Thread(
+                target=_run_forever, args=(target, app), name="chat-events", daemon=True
+            )
+            _listener.start()
+
+    # Events committed before the listener subscribes would never arrive
+    if not _listening.wait(LISTEN_TIMEOUT):
+        logger.warning("Chat event listener not ready after %ss", LISTEN_TIMEOUT)
+
+
+def _listening_started():
+    """Called by a listener once subscribed to the channel."""
+    global _listened
+
+    if _listened:
+        # Whatever was published while reconnecting is gone
+        _resync_all()
+    _listened = True
+    _listening.set()
+
+
+def _run_forever(target, app):
+    while True:
+        try:
+            target(app)
+        except Exception:
+            logger.exception("Chat event listener failed; reconnecting")
+        _listening.clear()
+        time.sleep(1)
+
+
+def _listen_postgres(app):
+    # A dedicated DBAPI connection: detached from the pool, in autocommit
+    with app.app_context():
+        raw = db.engine.raw_connection()
+    raw.detach()
+    conn = raw.dbapi_connection
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        logger.info("Listening for chat events on %s", CHANNEL)
+        _listening_started()
+
+        while True:
+            if select.select([conn], [], [], 5)[0]:
+                conn.poll()
+                while conn.notifies:
+                    _dispatch(conn.notifies.pop(0).payload)
+    finally:
+        conn.close()
+
+
+def _redis_client():
+    global _redis
+
+    if _redis is None:
+        if redis is None:
+            raise RuntimeError("CHAT_EVENTS_BACKEND=redis needs the redis package")
+        _redis = redis.Redis.from_url(current_app.config["CHAT_EVENTS_REDIS_URL"])
+    return _redis
+
+
+def _listen_redis(app):
+    with app.app_context():
+        pubsub = _redis_client().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CHANNEL)
+    _listening_started()
+    try:
+        while True:
+            message = pubsub.get_message(timeout=5)
+            if message is not None:
+                _dispatch(message["data"].decode())
+    finally:
+        pubsub.close()
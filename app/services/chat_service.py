@@ -1,41 +1,65 @@
 import re
+from functools import lru_cache
+from itertools import islice
+from flask import current_app, has_app_context
+from datetime import datetime
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import with_expression
+from werkzeug.exceptions import BadRequest
 from app.extensions import db
 from app.models.chat import Chat
+from app.models.chat_read import ChatRead
 from app.models.message import Message
+from app.services.pii_analyzer import analyze, analyze_batch
+from app.services import chat_events, moderation, ner_cache
+from app.utils.pagination import paginate_window
 
 # ---------------------------------------
 # 1. TEXT NORMALIZATION (obfuscation fixing)
 # ---------------------------------------
 
+# Each step is one precompiled pass over the text; the steps run in this order
+# and tests/test_text_scanner.py pins the output to the original
+# one-re.sub-per-pattern implementation.
+
+# Remove strange separators like []{}() inside emails
+_INNER_BRACKETS = re.compile(r"(?<=\w)[\[\]\(\)\{\}](?=\w)")
+
+# Obfuscated email words -> symbols. The spaced forms used to be replaced
+# " at " first, then " dot ": a " dot " whose trailing space belongs to a
+# following " at " is left alone, as that pass order did.
+_OBFUSCATED = re.compile(
+    r"(?P<at>\s+at\s+)"
+    r"|(?P<dot>\s+dot(?!\s+at\s)\s+)"
+    r"|(?P<pat>\(at\))"
+    r"|(?P<pdot>\(dot\))",
+    re.IGNORECASE,
+)
+_OBFUSCATED_SYMBOL = {"at": "@", "dot": ".", "pat": "@", "pdot": "."}
+
+# Written numbers -> digits (for phone obfuscation)
+_NUMBER_WORDS = re.compile(
+    r"\b(?:(?P<d0>zero)|(?P<d1>one)|(?P<d2>two)|(?P<d3>three)|(?P<d4>four)"
+    r"|(?P<d5>five)|(?P<d6>six)|(?P<d7>seven)|(?P<d8>eight)|(?P<d9>nine))\b",
+    re.IGNORECASE,
+)
+
+# Separators between phone digits (spaces, commas, periods)
+_DIGIT_SEPARATORS = re.compile(r"(?<=\d)[ ,.-]+(?=\d)")
+
+_DIGIT = re.compile(r"\d")
+
+
 def normalize_text(t: str):
     if not t:
         return t
 
-    # Remove strange separators like []{}()/\ inside emails
-    # t = re.sub(r"[\[\]\(\)\{\}\/\\]+", "", t)
-    t = re.sub(r"(?<=\w)[\[\]\(\)\{\}](?=\w)", "", t)
-
-    # Convert obfuscated email words -> symbols
-    replacements = {
-        r"\s+at\s+": "@",
-        r"\s+dot\s+": ".",
-        r"\(at\)": "@",
-        r"\(dot\)": ".",
-    }
-    for pat, repl in replacements.items():
-        t = re.sub(pat, repl, t, flags=re.IGNORECASE)
-
-    # Convert written numbers to digits (for phone obfuscation)
-    words_to_nums = {
-        "zero": "0", "one": "1", "two": "2", "three": "3",
-        "four": "4", "five": "5", "six": "6",
-        "seven": "7", "eight": "8", "nine": "9"
-    }
-    for word, digit in words_to_nums.items():
-        t = re.sub(rf"\b{word}\b", digit, t, flags=re.IGNORECASE)
-
-    # Remove separators between phone digits (spaces, commas, periods)
-    t = re.sub(r"(?<=\d)[ ,.-]+(?=\d)", "", t)
+    t = _INNER_BRACKETS.sub("", t)
+    t = _OBFUSCATED.sub(lambda m: _OBFUSCATED_SYMBOL[m.lastgroup], t)
+    t = _NUMBER_WORDS.sub(lambda m: m.lastgroup[1], t)
+    if _DIGIT.search(t):
+        t = _DIGIT_SEPARATORS.sub("", t)
 
     return t
 
@@ -44,70 +68,277 @@ def normalize_text(t: str):
 # 2. REGEX PII DETECTION (catches obfuscated data)
 # ---------------------------------------
 
+REDACTED = "[REDACTED]"
+
 PII_REGEX_PATTERNS = [
     # Full emails
-    r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    ("EMAIL_ADDRESS", r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
 
     # Kenyan-like phones and international phones
-    r"\+?\d{9,15}",
+    ("PHONE_NUMBER", r"\+?\d{9,15}"),
 
     # Slightly broken emails (muteti@gma, muteti@gmail without .com)
-    r"[A-Za-z0-9._%+-]+@[A-Za-z]+",
+    ("EMAIL_ADDRESS", r"[A-Za-z0-9._%+-]+@[A-Za-z]+"),
 
     # Things like: muteti@gm, muteti@gnai, etc
-    r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+",
+    ("EMAIL_ADDRESS", r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+"),
 
     # Separated digits sequences 3-3-4
-    r"\b\d{3}[-\s.]?\d{3}[-\s.]?\d{3,4}\b",
+    ("PHONE_NUMBER", r"\b\d{3}[-\s.]?\d{3}[-\s.]?\d{3,4}\b"),
+]
+
+# Every email pattern needs an "@", every phone pattern a digit; a pattern
+# whose anchor character is gone can't match, so its pass is skipped
+_PII_REGEXES = [
+    (entity, re.compile(pat, re.IGNORECASE), "@" in pat)
+    for entity, pat in PII_REGEX_PATTERNS
 ]
 
-def regex_mask(t: str):
-    for pat in PII_REGEX_PATTERNS:
-        t = re.sub(pat, "[REDACTED]", t, flags=re.IGNORECASE)
+
+def regex_mask(t: str, found=None):
+    """Redact regex matches; entity types hit are appended to `found`."""
+    for entity, regex, needs_at in _PII_REGEXES:
+        if not ("@" in t if needs_at else _DIGIT.search(t)):
+            continue
+        t, n = regex.subn(REDACTED, t)
+        if n and found is not None:
+            found.extend([entity] * n)
     return t
 
 
 # ---------------------------------------
-# 3. PRESIDIO (OPTIONAL) — add if installed
+# 2b. PREFILTER (is Presidio worth running?)
 # ---------------------------------------
 
-try:
-    from presidio_analyzer import AnalyzerEngine
-    analyzer = AnalyzerEngine()
+# Cheap signs that a message may carry PII. If none matches, NER is skipped.
+# Rules are picked with PII_PREFILTER_RULES (comma separated names; empty
+# disables the prefilter so every message goes through Presidio).
+# tests/test_pii_prefilter.py holds the recall corpus: extend it when tuning.
+PREFILTER_RULES = {
+    "digits": r"\d",
+    "at_sign": r"@",
+    "obfuscation_words": r"(?i:\b(?:at|dot)\b|\((?:at|dot)\))",
+    "number_words": r"(?i:\b(?:zero|one|two|three|four|five|six|seven|eight|nine)\b)",
+    "web": r"(?i:www\.|https?:|\.(?:com|net|org|co|ke|me|io)\b)",
+    # Capitalised word mid-sentence: names, places, organisations
+    "proper_noun": r"(?<=[a-z0-9,;:] )[A-Z][a-z]+",
+}
+
+DEFAULT_PREFILTER_RULES = ",".join(PREFILTER_RULES)
+
+
+@lru_cache(maxsize=8)
+def compile_prefilter(rules: str):
+    """One compiled alternation for a comma separated rule list (None = no prefilter)."""
+    names = [r.strip() for r in rules.split(",") if r.strip()]
+    if not names:
+        return None
+    unknown = set(names) - set(PREFILTER_RULES)
+    if unknown:
+        raise ValueError(f"Unknown PII prefilter rules: {sorted(unknown)}")
+    return re.compile("|".join(PREFILTER_RULES[n] for n in names))
+
+
+def needs_ner(t: str, rules: str = None) -> bool:
+    """False when the prefilter rules out PII, so Presidio can be skipped."""
+    if not t:
+        return False
+    if rules is None:
+        rules = (
+            current_app.config.get("PII_PREFILTER_RULES", DEFAULT_PREFILTER_RULES)
+            if has_app_context() else DEFAULT_PREFILTER_RULES
+        )
+    prefilter = compile_prefilter(rules)
+    return prefilter is None or prefilter.search(t) is not None
 
-    def presidio_mask(t: str):
-        results = analyzer.analyze(text=t, language="en")
-        for r in sorted(results, key=lambda x: x.start, reverse=True):
-            t = t[:r.start] + "[REDACTED]" + t[r.end:]
-        return t
 
-except Exception:
-    analyzer = None
+# ---------------------------------------
+# 3. PRESIDIO (OPTIONAL) — shared analyzer, see pii_analyzer
+# ---------------------------------------
 
-    def presidio_mask(t: str):
-        return t  # fallback if Presidio not available
+def presidio_mask(t: str, found=None):
+    return redact_spans(t, ner_spans(t), found)
+
+
+def ner_spans(t: str, rules: str = None):
+    """
+    [(start, end, entity_type)] found by Presidio ([] if not available, or
+    if the prefilter rules the text out).
+    """
+    if not needs_ner(t, rules):
+        return []
+
+    spans = ner_cache.lookup(t)
+    if spans is None:
+        spans = [(r.start, r.end, r.entity_type) for r in analyze(t)]
+        ner_cache.store(t, spans)
+    return spans
+
+
+def redact_spans(t: str, spans, found=None):
+    """
+    Replace each span with [REDACTED]. Overlapping spans (Presidio reports
+    an email and the URL inside it separately) are merged first.
+    """
+    merged = []
+    for start, end, entity in sorted(spans):
+        if merged and start < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+            merged[-1][2].append(entity)
+        else:
+            merged.append([start, end, [entity]])
+
+    for start, end, entities in reversed(merged):
+        t = t[:start] + REDACTED + t[end:]
+        if found is not None:
+            found.extend(entities)
+    return t
 
 
 # ---------------------------------------
 # 4. MAIN SANITIZER PIPELINE (call everywhere)
 # ---------------------------------------
 
-def sanitize_message(content: str) -> str:
-    """Runs normalization → presidio → regex in that order."""
-
+def scan_message(content: str, ner=True):
+    """
+    Sanitize `content` and report what was removed.
+    Returns (clean_text, entity_types) with one entity type per redaction.
+    ner=False skips Presidio (the moderation pool runs it later).
+    """
     if not content:
-        return content
+        return content, []
+
+    found = []
 
     # STEP 1: normalize obfuscations
     clean = normalize_text(content)
 
     # STEP 2: presidio (if installed)
-    clean = presidio_mask(clean)
+    if ner:
+        clean = presidio_mask(clean, found)
 
     # STEP 3: regex fallback & extended matching
-    clean = regex_mask(clean)
+    clean = regex_mask(clean, found)
+
+    return clean, found
+
+
+def sanitize_message(content: str) -> str:
+    """Runs normalization → presidio → regex in that order."""
+    return scan_message(content)[0]
+
+
+def scan_messages(contents, batch_size=64, n_process=1):
+    """
+    scan_message() for many texts, yielding (clean_text, entity_types) in
+    order. Texts the prefilter lets through go to Presidio in batches via
+    spaCy's nlp.pipe; n_process > 1 runs the pipe on several processes.
+    """
+    contents = iter(contents)
+    # Read ahead a few pipe batches at a time so output stays in order
+    chunk_size = batch_size * max(n_process, 1) * 4
+
+    while True:
+        chunk = list(islice(contents, chunk_size))
+        if not chunk:
+            return
+
+        normalized = [normalize_text(c) if c else c for c in chunk]
+        spans = {}
+        need = []
+        for i, t in enumerate(normalized):
+            if needs_ner(t):
+                cached = ner_cache.lookup(t)
+                if cached is None:
+                    need.append(i)
+                else:
+                    spans[i] = cached
+        for i, results in zip(
+            need,
+            analyze_batch([normalized[i] for i in need],
+                          batch_size=batch_size, n_process=n_process),
+        ):
+            spans[i] = [(r.start, r.end, r.entity_type) for r in results]
+            ner_cache.store(normalized[i], spans[i])
+
+        for i, (content, clean) in enumerate(zip(chunk, normalized)):
+            if not content:
+                yield content, []
+                continue
+            found = []
+            clean = redact_spans(clean, spans.get(i, ()), found)
+            clean = regex_mask(clean, found)
+            yield clean, found
+
+
+def sanitize_messages(contents, batch_size=64, n_process=1):
+    """sanitize_message() for many texts, batched (see scan_messages)."""
+    for clean, _ in scan_messages(contents, batch_size, n_process):
+        yield clean
+
+
+def moderate(msg, content, ner=None):
+    """
+    Sanitize `content` into a Message/SupportMessage and store the analysis
+    the window risk score is built from (see chat_behavior_analyzer).
+
+    Presidio runs inline only when the moderation pool is off; otherwise
+    call moderation.enqueue(msg) once the row is committed.
+    """
+    if ner is None:
+        ner = moderation.runs_inline()
+    msg.content, found = scan_message(content, ner=ner)
+    msg.pii_hits = count_redactions(msg.content)
+    msg.pii_entities = sorted(set(found))
+    return msg
+
+
+def apply_ner(msg, spans):
+    """Redact Presidio spans (found on msg.content) and update the analysis."""
+    found = []
+    msg.content = redact_spans(msg.content, spans, found)
+    msg.pii_hits = count_redactions(msg.content)
+    msg.pii_entities = sorted(set(msg.pii_entities or []) | set(found))
+    return msg
 
-    return clean
+
+def count_redactions(text):
+    return text.count(REDACTED) if text else 0
+
+
+def resanitize_messages(model, after_id=None, chunk_size=1000, batch_size=64, n_process=1):
+    """
+    Re-run the sanitizer over every Message/SupportMessage row after
+    `after_id`, in id order. Rows are streamed through a server-side cursor
+    on a separate connection; changes are written back one chunk per
+    transaction. Yields (last_id, rows, changed) after each committed chunk
+    so the caller can checkpoint and resume.
+    """
+    stmt = select(model.id, model.content, model.pii_hits, model.pii_entities).order_by(model.id)
+    if after_id:
+        stmt = stmt.where(model.id > after_id)
+
+    with db.engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        for rows in result.partitions():
+            updates = []
+            for row, (clean, found) in zip(
+                rows, scan_messages([r.content for r in rows], batch_size, n_process)
+            ):
+                entities = sorted(set(row.pii_entities or []) | set(found))
+                hits = count_redactions(clean)
+                if clean != row.content or hits != row.pii_hits or entities != row.pii_entities:
+                    updates.append({
+                        "id": row.id,
+                        "content": clean,
+                        "pii_hits": hits,
+                        "pii_entities": entities,
+                    })
+
+            if updates:
+                db.session.execute(update(model), updates)
+            db.session.commit()
+            yield rows[-1].id, len(rows), len(updates)
 
 
 # ---------------------------------------
@@ -130,10 +361,216 @@ def get_or_create_chat(order_id, client_id, writer_id):
 
 
 def add_message(chat_id, sender_id, content):
-    """All new messages are automatically sanitized."""
-    sanitized = sanitize_message(content)
-
-    msg = Message(chat_id=chat_id, sender_id=sender_id, content=sanitized)
+    """All new messages are automatically sanitized (pass the raw content)."""
+    msg = moderate(Message(chat_id=chat_id, sender_id=sender_id), content)
     db.session.add(msg)
+    db.session.flush()
+    _record_message(msg)
+    publish_message(msg, "message")
     db.session.commit()
+    moderation.enqueue(msg)
     return msg
+
+
+# ---------------------------------------
+# 6. Inbox summary (Chat.last_message_*) and read watermarks (chat_reads)
+# ---------------------------------------
+
+# Watermark for a participant who has never marked the chat read
+NEVER_READ = datetime(1970, 1, 1)
+
+
+def _record_message(msg):
+    """New message: it becomes the chat's last one."""
+    db.session.execute(
+        update(Chat)
+        .where(Chat.id == msg.chat_id)
+        .values(last_message_id=msg.id, last_message_at=msg.created_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_chat_read(chat_id, uid, up_to=None):
+    """
+    Move uid's watermark for the chat up to the newest message from the other
+    side (or only up to message up_to, the last one the client rendered):
+    one-row upsert, never moves it backwards. The watermark is a message's
+    created_at, not this server's clock, so a message committed later with
+    an earlier timestamp is not marked read unseen. The caller commits.
+    Returns the watermark, or None if there was nothing to read.
+    """
+    newest = select(func.max(Message.created_at)).where(
+        Message.chat_id == chat_id, Message.sender_id != uid
+    )
+    if up_to:
+        newest = newest.where(Message.created_at <= (
+            select(Message.created_at)
+            .where(Message.id == up_to, Message.chat_id == chat_id)
+            .scalar_subquery()
+        ))
+    read_at = db.session.scalar(newest)
+    if read_at is None:
+        return None
+
+    chat_events.publish(chat_id, "read", {"user_id": uid, "last_read_at": read_at.isoformat() + "Z"})
+    stmt = pg_insert(ChatRead).values(chat_id=chat_id, user_id=uid, last_read_at=read_at)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[ChatRead.chat_id, ChatRead.user_id],
+        set_={"last_read_at": func.greatest(ChatRead.last_read_at, stmt.excluded.last_read_at)},
+    ))
+    return read_at
+
+
+def chat_watermarks(chat):
+    """{user_id: last_read_at} for both participants of the chat."""
+    rows = db.session.query(ChatRead.user_id, ChatRead.last_read_at).filter(
+        ChatRead.chat_id == chat.id
+    ).all()
+    marks = dict.fromkeys((chat.client_id, chat.writer_id), NEVER_READ)
+    marks.update(rows)
+    return marks
+
+
+def is_read(msg, chat, watermarks):
+    """Whether the message's recipient has read it."""
+    return msg.created_at <= watermarks[chat.other_participant_id(msg.sender_id)]
+
+
+def _read_at(chat_id_col, user_id):
+    return func.coalesce(
+        select(ChatRead.last_read_at)
+        .where(ChatRead.chat_id == chat_id_col, ChatRead.user_id == user_id)
+        .scalar_subquery(),
+        NEVER_READ,
+    )
+
+
+def unread_count_expr(uid, chat_id_col=Chat.id):
+    """Messages from the other side past uid's watermark: an index range count."""
+    return (
+        select(func.count(Message.id))
+        .where(
+            Message.chat_id == chat_id_col,
+            Message.created_at > _read_at(chat_id_col, uid),
+            Message.sender_id != uid,
+        )
+        .scalar_subquery()
+    )
+
+
+def inbox_expressions(uid):
+    """Loader options filling Chat.unread_count / Chat.other_read_at for uid."""
+    other = case((Chat.client_id == uid, Chat.writer_id), else_=Chat.client_id)
+    return (
+        with_expression(Chat.unread_count, unread_count_expr(uid)),
+        with_expression(Chat.other_read_at, _read_at(Chat.id, other)),
+    )
+
+
+def publish_message(msg, kind="message_edited"):
+    """Push a new ("message") or changed message to the chat's live streams."""
+    from app.serializers.chat import serialize_message
+
+    read = False
+    if kind != "message":
+        read = is_read(msg, msg.chat, chat_watermarks(msg.chat))
+    chat_events.publish(msg.chat_id, kind, serialize_message(msg, read))
+
+
+REPLAY_LIMIT = 100
+
+
+def replay_after(chat, last_event_id, limit=REPLAY_LIMIT):
+    """
+    The chat's messages after an SSE Last-Event-ID ("<sent_at>|<message id>",
+    see chat_events.event_id), serialized for the stream. Returns
+    (messages, complete); complete is False when more than `limit` were
+    missed or the id is unusable, and the client should refetch instead.
+    """
+    from app.serializers.chat import message_list_load, serialize_message
+
+    sent_at, _, message_id = last_event_id.rpartition("|")
+    if not sent_at or not message_id:
+        return [], False
+
+    query = Message.query.filter_by(chat_id=chat.id).options(*message_list_load())
+    keyset = (Message.created_at, Message.id)
+    try:
+        items, page = paginate_window(query, keyset, after=message_id, limit=limit)
+    except BadRequest:
+        # The message was deleted since; its timestamp still marks the spot
+        try:
+            items, page = paginate_window(query, keyset, after=sent_at, limit=limit)
+        except BadRequest:
+            return [], False
+
+    reads = chat_watermarks(chat)
+    return [serialize_message(m, is_read(m, chat, reads)) for m in items], not page["has_more"]
+
+
+def unread_count(chat_id, uid):
+    return db.session.scalar(select(unread_count_expr(uid, chat_id)))
+
+
+def delete_chat_message(chat, msg):
+    """Delete a message and fix the chat's summary. The caller commits."""
+    was_last = chat.last_message_id == msg.id
+    chat_events.publish(chat.id, "message_deleted", {"id": msg.id})
+    db.session.delete(msg)
+    db.session.flush()
+
+    if was_last:
+        latest = (
+            Message.query.filter_by(chat_id=chat.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .first()
+        )
+        chat.last_message_id = latest.id if latest else None
+        chat.last_message_at = latest.created_at if latest else chat.created_at
+
+
+def rebuild_chat_summaries():
+    """
+    Recompute last_message_* of every chat from messages, and seed missing
+    chat_reads watermarks from the legacy messages.is_read flags. Used to
+    backfill existing data; safe to re-run.
+    """
+    latest = (
+        select(Message.id)
+        .where(Message.chat_id == Chat.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    latest_at = (
+        select(func.max(Message.created_at))
+        .where(Message.chat_id == Chat.id)
+        .scalar_subquery()
+    )
+
+    result = db.session.execute(
+        update(Chat)
+        .values(
+            last_message_id=latest,
+            last_message_at=func.coalesce(latest_at, Chat.created_at, func.now()),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    # A participant has read up to the newest message they received that is
+    # flagged read
+    for participant, sender in ((Chat.client_id, Chat.writer_id), (Chat.writer_id, Chat.client_id)):
+        read_up_to = (
+            select(Chat.id, participant, func.max(Message.created_at))
+            .join(Message, Message.chat_id == Chat.id)
+            .where(Message.sender_id == sender, Message.is_read == True)
+            .group_by(Chat.id, participant)
+        )
+        db.session.execute(
+            pg_insert(ChatRead)
+            .from_select(["chat_id", "user_id", "last_read_at"], read_up_to)
+            .on_conflict_do_nothing()
+        )
+
+    db.session.commit()
+    return result.rowcount
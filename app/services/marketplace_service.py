@@ -0,0 +1,93 @@
+from app.extensions import db
+from app.models.bid import Bid
+from app.models.declined_order import DeclinedOrder
+from app.models.marketplace_exclusion import MarketplaceExclusion
+from app.models.order import Order
+from sqlalchemy import exists, select, literal, or_
+
+
+def exclude_from_marketplace(order_id, writer_id, reason):
+    """Hide an order from one writer's marketplace. The caller commits."""
+    key = (writer_id, order_id, reason)
+    if db.session.get(MarketplaceExclusion, key) is None:
+        db.session.add(MarketplaceExclusion(
+            writer_id=writer_id,
+            order_id=order_id,
+            reason=reason
+        ))
+
+
+def close_marketplace_listing(order):
+    """Remove an order from every writer's marketplace (assigned or cancelled)."""
+    order.marketplace_open = False
+
+
+def filter_marketplace(q, writer_id, status=None):
+    """
+    Restrict an Order query to the writer's open marketplace.
+
+    status="declined" lists the orders the writer declined (and never bid on);
+    anything else hides every order the writer has bid on or declined.
+    """
+    def excluded(reason=None):
+        cond = exists().where(
+            MarketplaceExclusion.order_id == Order.id,
+            MarketplaceExclusion.writer_id == writer_id,
+        )
+        if reason:
+            cond = cond.where(MarketplaceExclusion.reason == reason)
+        return cond
+
+    q = q.filter(Order.marketplace_open)
+
+    if status == "declined":
+        return q.filter(excluded("declined"), ~excluded("bid"))
+
+    return q.filter(~excluded())
+
+
+def rebuild_marketplace():
+    """
+    Recompute marketplace_open and the exclusion sets from bids and
+    declined_orders. Used to backfill existing data; safe to re-run.
+    """
+    accepted = exists().where(Bid.order_id == Order.id, Bid.status == "accepted")
+
+    # Only rows whose flag changes, and updated_at is kept: it is the
+    # order's last edit (bids submitted before it show as "unconfirmed")
+    opened = (
+        Order.query
+        .filter(Order.writer_id.is_(None), Order.status != "cancelled", ~accepted,
+                Order.marketplace_open.is_not(True))
+        .update({Order.marketplace_open: True, Order.updated_at: Order.updated_at},
+                synchronize_session=False)
+    )
+    closed = (
+        Order.query
+        .filter(or_(Order.writer_id.isnot(None), Order.status == "cancelled", accepted),
+                Order.marketplace_open.is_not(False))
+        .update({Order.marketplace_open: False, Order.updated_at: Order.updated_at},
+                synchronize_session=False)
+    )
+
+    MarketplaceExclusion.query.delete(synchronize_session=False)
+
+    cols = ["writer_id", "order_id", "reason"]
+    exclusions_table = MarketplaceExclusion.__table__
+
+    db.session.execute(exclusions_table.insert().from_select(
+        cols,
+        select(Bid.user_id, Bid.order_id, literal("bid")).distinct()
+    ))
+    db.session.execute(exclusions_table.insert().from_select(
+        cols,
+        select(DeclinedOrder.writer_id, DeclinedOrder.order_id, literal("declined")).distinct()
+    ))
+
+    db.session.commit()
+
+    return {
+        "open": opened,
+        "closed": closed,
+        "exclusions": MarketplaceExclusion.query.count(),
+    }
@@ -0,0 +1,172 @@
+"""
+Out-of-request PII moderation.
+
+Posting a message only does the cheap part inline: normalisation and regex
+redaction (chat_service.moderate). The Presidio/spaCy pass runs on a process
+pool. When it completes, the stored message is redacted again, its
+pii_hits/pii_entities are updated, and the chat warning is re-scored.
+
+MODERATION_WORKERS sets the pool size per app process; 0 (the default) keeps
+Presidio inline in the request, as before.
+
+The pool forks from the app process, so its workers inherit the analyzer
+loaded by pii_analyzer.warm_up(). gunicorn.conf.py starts the pool in
+post_fork, while the worker is still single-threaded and not yet patched by
+gevent. Finished results arrive on the pool's own (native) thread; by
+default they are applied on a one-thread executor, and under a gevent
+worker (apply_results_on_hub) as a greenlet on the worker's hub, since
+psycopg2's gevent wait callback only works there.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, has_app_context
+
+from app.extensions import db
+from app.services import ner_cache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pool = None
+_applier = None
+_hub = None
+
+
+def runs_inline():
+    """True when Presidio should run in the request (no pool configured)."""
+    return not (has_app_context() and current_app.config.get("MODERATION_WORKERS"))
+
+
+def start_pool(workers):
+    """
+    The process pool, created on first use. With the fork start method every
+    worker process is launched on the first submit, so this also submits a
+    warm-up job to fork them right away.
+    """
+    global _pool, _applier
+
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+            )
+            # Results are written back one at a time, off the pool's own thread
+            _applier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="moderation")
+            _pool.submit(int)
+        return _pool
+
+
+def apply_results_on_hub(hub):
+    """Apply finished results as greenlets on `hub` (gevent workers)."""
+    global _hub
+    _hub = hub
+
+
+def shutdown(wait=True):
+    global _pool, _applier
+
+    with _lock:
+        pool, applier = _pool, _applier
+        _pool = _applier = None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+        applier.shutdown(wait=wait)
+
+
+def _init_worker():
+    from app.services.pii_analyzer import warm_up
+    warm_up()
+
+
+def enqueue(msg):
+    """
+    Queue the Presidio pass for a committed Message/SupportMessage.
+    No-op when moderation runs inline. Returns the future (or None).
+    """
+    if runs_inline():
+        return None
+
+    from app.services.chat_service import needs_ner, ner_spans
+
+    app = current_app._get_current_object()
+    rules = app.config.get("PII_PREFILTER_RULES")
+    if not needs_ner(msg.content, rules):
+        return None
+
+    job = (type(msg), msg.id, msg.content)
+    try:
+        pool = start_pool(app.config["MODERATION_WORKERS"])
+        spans = ner_cache.lookup(msg.content)
+        if spans is None:
+            future = pool.submit(ner_spans, msg.content, rules)
+        else:
+            # Seen this text before: skip the round trip to the pool
+            future = Future()
+            future.set_result(spans)
+    except (BrokenProcessPool, RuntimeError):
+        # Pool died or is shutting down; the message keeps its regex redaction
+        logger.exception("Moderation pool unavailable; skipped NER for %s", msg.id)
+        shutdown(wait=False)
+        return None
+
+    applier = _applier
+    future.add_done_callback(lambda f: _hand_off(applier, app, job, f))
+    return future
+
+
+def _hand_off(applier, app, job, future):
+    # Runs on whichever thread completed the future
+    hub = _hub
+    if hub is not None:
+        import gevent
+        hub.loop.run_callback_threadsafe(gevent.spawn, _finish, app, job, future)
+    else:
+        applier.submit(_finish, app, job, future)
+
+
+def _finish(app, job, future):
+    model, message_id, scanned = job
+
+    try:
+        spans = future.result()
+    except BrokenProcessPool:
+        logger.exception("Moderation pool crashed; restarting on next message")
+        shutdown(wait=False)
+        return
+    except Exception:
+        logger.exception("NER failed for message %s", message_id)
+        return
+
+    with app.app_context():
+        # The pool process cached it too, but that cache is its own
+        ner_cache.store(scanned, spans)
+        try:
+            apply_result(model, message_id, scanned, spans)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Could not store NER result for message %s", message_id)
+
+
+def apply_result(model, message_id, scanned, spans):
+    """Write a finished NER pass back to the message and re-score its chat."""
+    from app.models.message import Message
+    from app.services.chat_service import apply_ner, publish_message
+    from app.services.chat_behavior_analyzer import refresh_warning
+
+    msg = db.session.get(model, message_id)
+    # Deleted, or edited since: the edit queued its own pass
+    if msg is None or msg.content != scanned:
+        return
+
+    if spans:
+        apply_ner(msg, spans)
+        if model is Message and msg.content != scanned:
+            publish_message(msg)
+    refresh_warning(msg.chat, msg.sender_id)
+    db.session.commit()
@@ -0,0 +1,170 @@
+"""
+Cache of Presidio results, keyed by a hash of the normalized text.
+
+Writers paste the same boilerplate into many bids and chats; with the cache
+each distinct text goes through NER once. Entries live in a bounded
+in-process LRU and, when NER_CACHE_REDIS_URL is set (and redis is installed),
+in a shared Redis tier. Keys include pii_analyzer.model_version(), so
+upgrading presidio or the spaCy model starts a fresh cache; NER_CACHE_TTL
+bounds how long any entry is trusted.
+
+Config: NER_CACHE_SIZE (entries, 0 disables), NER_CACHE_TTL (seconds),
+NER_CACHE_REDIS_URL.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+from app.services.pii_analyzer import model_version
+
+try:
+    import redis
+except ImportError:  # the shared tier is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+STATS_LOG_EVERY = 1000
+
+
+class NERCache:
+    def __init__(self, maxsize=10_000, ttl=86_400, redis_url=None, prefix="ner:"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.prefix = prefix
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0}
+
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                logger.warning("NER_CACHE_REDIS_URL is set but redis is not installed")
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+
+    def key(self, text):
+        raw = f"{model_version()}\0{text}".encode("utf-8", "surrogatepass")
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, text):
+        """Cached [(start, end, entity_type)] for `text`, or None."""
+        key = self.key(text)
+        now = time.monotonic()
+
+        spans = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, spans = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    spans = None
+        if spans is not None:
+            self._count("hits")
+            return spans
+
+        spans = self._shared_get(key)
+        if spans is not None:
+            self._local_put(key, spans)
+            self._count("shared_hits")
+            return spans
+
+        self._count("misses")
+        return None
+
+    def put(self, text, spans):
+        key = self.key(text)
+        spans = [tuple(s) for s in spans]
+        self._local_put(key, spans)
+        self._shared_put(key, spans)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _local_put(self, key, spans):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, spans)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+            lookups = self._stats["hits"] + self._stats["shared_hits"] + self._stats["misses"]
+        if lookups % STATS_LOG_EVERY == 0:
+            logger.info("NER cache %s", self.stats())
+
+    # Redis errors only cost a cache miss; moderation must keep working
+    def _shared_get(self, key):
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(self.prefix + key)
+        except redis.RedisError:
+            logger.warning("NER cache: Redis get failed", exc_info=True)
+            return None
+        return [tuple(s) for s in json.loads(raw)] if raw is not None else None
+
+    def _shared_put(self, key, spans):
+        if self._redis is None:
+            return
+        try:
+            self._redis.setex(self.prefix + key, self.ttl, json.dumps(spans))
+        except redis.RedisError:
+            logger.warning("NER cache: Redis set failed", exc_info=True)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide cache, configured from the app on first use (None if disabled)."""
+    global _cache
+
+    if _cache is None:
+        config = current_app.config if has_app_context() else {}
+        with _cache_lock:
+            if _cache is None:
+                _cache = NERCache(
+                    maxsize=config.get("NER_CACHE_SIZE", 10_000),
+                    ttl=config.get("NER_CACHE_TTL", 86_400),
+                    redis_url=config.get("NER_CACHE_REDIS_URL"),
+                )
+    return _cache if _cache.maxsize > 0 else None
+
+
+def lookup(text):
+    cache = get_cache()
+    return cache.get(text) if cache is not None else None
+
+
+def store(text, spans):
+    cache = get_cache()
+    if cache is not None:
+        cache.put(text, spans)
+
+
+def reset():
+    """Drop the process-wide cache (tests / benchmarks only)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
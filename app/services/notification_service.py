@@ -2,6 +2,9 @@ from app.extensions import db
 from app.models.notification import Notification
 from app.models.user import User
 from datetime import datetime
+from sqlalchemy import String, cast, func, insert, literal, null, select
+
+FAN_OUT_CHUNK = 5000
 
 def get_user_notifications(user_id, is_read=None):
     q = Notification.query.filter_by(user_id=user_id)
@@ -42,39 +45,83 @@ def send_notification_to_user(
     return notif
 
 
-def send_notification_to_group(group, title, message, notif_type="info", details=None, sender_id=None):
-    users = User.query.filter_by(role=group).all()
-    for u in users:
-        notif = Notification(
-            sender_id=sender_id,
-            user_id=u.id,
-            target_type="group",
-            target_group=group,
-            type=notif_type,
-            title=title,
-            message=message,
-            details=details,
-            created_at=datetime.utcnow(),
-        )
-        db.session.add(notif)
-    db.session.commit()
-    return len(users)
-
-
-def send_notification_to_all(title, message, notif_type="info", details=None, sender_id=None):
-    users = User.query.all()
-    for u in users:
-        notif = Notification(
-            sender_id=sender_id,
-            user_id=u.id,
-            target_type="all",
-            target_group="all",
-            type=notif_type,
-            title=title,
-            message=message,
-            details=details,
-            created_at=datetime.utcnow(),
+def fan_out_notifications(where, target_group, title, message, notif_type="info",
+                          details=None, sender_id=None, chunk_size=FAN_OUT_CHUNK):
+    """
+    One individual notification per user matching `where` (User filters),
+    addressed by email. Users are taken in id order, chunk_size at a time;
+    each chunk is a single INSERT ... SELECT from users, committed on its
+    own, so no User or Notification objects are built. Yields the number
+    inserted after each chunk.
+    """
+    json_type = Notification.details.type
+    rows = select(
+        literal("notif-") + cast(func.gen_random_uuid(), String),
+        literal(sender_id, String),
+        User.email,
+        literal("individual"),
+        literal(target_group, String),
+        literal(notif_type),
+        literal(title),
+        literal(message),
+        cast(literal(details, json_type) if details is not None else null(), json_type),
+        literal(datetime.utcnow()),
+    ).where(*where)
+    columns = ["id", "sender_id", "user_email", "target_type", "target_group",
+               "type", "title", "message", "details", "created_at"]
+
+    last_id = None
+    while True:
+        chunk = [User.id > last_id] if last_id is not None else []
+        # Last user of this chunk; None once fewer than chunk_size remain
+        upper = db.session.execute(
+            select(User.id).where(*where, *chunk)
+            .order_by(User.id).offset(chunk_size - 1).limit(1)
+        ).scalar()
+        if upper is not None:
+            chunk.append(User.id <= upper)
+
+        result = db.session.execute(
+            insert(Notification).from_select(columns, rows.where(*chunk))
         )
-        db.session.add(notif)
-    db.session.commit()
-    return len(users)
+        db.session.commit()
+        yield result.rowcount
+
+        if upper is None:
+            return
+        last_id = upper
+
+
+def _send_to_users(where, target_group, title, message, notif_type, details, sender_id,
+                   progress=None, chunk_size=FAN_OUT_CHUNK):
+    total = db.session.query(func.count(User.id)).filter(*where).scalar()
+    sent = 0
+    for inserted in fan_out_notifications(
+        where, target_group, title, message, notif_type, details, sender_id,
+        chunk_size=chunk_size,
+    ):
+        sent += inserted
+        if progress is not None:
+            progress(sent, total)
+    return sent
+
+
+def send_notification_to_group(group, title, message, notif_type="info", details=None,
+                               sender_id=None, progress=None, chunk_size=FAN_OUT_CHUNK):
+    """
+    A copy of the notification for every user with role `group`. progress,
+    if given, is called as progress(sent, total) after each chunk. Returns
+    the number sent.
+    """
+    return _send_to_users(
+        [User.role == group], group, title, message, notif_type, details, sender_id,
+        progress, chunk_size,
+    )
+
+
+def send_notification_to_all(title, message, notif_type="info", details=None,
+                             sender_id=None, progress=None, chunk_size=FAN_OUT_CHUNK):
+    """Like send_notification_to_group, for every user."""
+    return _send_to_users(
+        [], "all", title, message, notif_type, details, sender_id, progress, chunk_size,
+    )
@@ -1,21 +1,117 @@
 from app.extensions import db
-from app.models.order import Order
+from app.models.order import Order, ORDER_SEARCH_VECTOR
+from app.models.order_attachment import OrderAttachment
+from sqlalchemy import or_, cast, func, text
+from sqlalchemy.types import String
 from datetime import timezone, datetime
 from flask import current_app, url_for, send_file, jsonify
 from werkzeug.utils import secure_filename
-import os, uuid
+import os, uuid, hashlib, mimetypes, json
+import numpy as np
+from functools import lru_cache
 
+CHUNK_SIZE = 64 * 1024
 
-def save_uploaded_file(file, upload_dir):
-    """Helper to securely save an uploaded file and return filename + path."""
+
+def _copy_and_hash(src, dst=None):
+    """Read a binary stream (copying it to dst if given), returning (size, sha256 hex)."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+        if dst is not None:
+            dst.write(chunk)
+    return size, digest.hexdigest()
+
+
+def save_uploaded_file(file, upload_dir, order=None):
+    """
+    Helper to securely save an uploaded file and return filename + path.
+
+    When `order` is given the file is also recorded in the order's attachment
+    manifest (size, mime type, sha256). The caller commits.
+    """
     os.makedirs(upload_dir, exist_ok=True)
     filename = secure_filename(file.filename)
     unique_name = f"{uuid.uuid4().hex}_{filename}"
     file_path = os.path.join(upload_dir, unique_name)
-    file.save(file_path)
+
+    with open(file_path, "wb") as out:
+        size, checksum = _copy_and_hash(file.stream, out)
+
+    if order is not None:
+        db.session.add(OrderAttachment(
+            order=order,
+            filename=unique_name,
+            original_name=file.filename,
+            size=size,
+            mime_type=file.mimetype or mimetypes.guess_type(filename)[0],
+            checksum=checksum,
+        ))
+
     return unique_name, file_path
 
 
+def remove_order_attachment(order_dir, attachment):
+    """Delete an attachment's file and its manifest row. The caller commits."""
+    try:
+        os.remove(os.path.join(order_dir, attachment.filename))
+    except OSError:
+        pass
+    db.session.delete(attachment)
+
+
+def backfill_order_attachments(root_dir):
+    """
+    Index files already on disk under root_dir/<client>/<order>/ that have no
+    manifest row yet. Returns (orders_scanned, attachments_added).
+    """
+    scanned = added = 0
+    if not os.path.isdir(root_dir):
+        return scanned, added
+
+    for client_id in sorted(os.listdir(root_dir)):
+        client_dir = os.path.join(root_dir, client_id)
+        if not os.path.isdir(client_dir):
+            continue
+
+        for order_id in sorted(os.listdir(client_dir)):
+            order_dir = os.path.join(client_dir, order_id)
+            order = db.session.get(Order, order_id)
+            if not order or not os.path.isdir(order_dir):
+                continue
+            scanned += 1
+
+            known = {a.filename for a in order.attachments}
+            for fname in sorted(os.listdir(order_dir)):
+                path = os.path.join(order_dir, fname)
+                if fname in known or not os.path.isfile(path):
+                    continue
+
+                with open(path, "rb") as src:
+                    size, checksum = _copy_and_hash(src)
+
+                # stored as "<32 hex>_<secure name>"
+                prefix, _, original = fname.partition("_")
+                if len(prefix) != 32 or not original:
+                    original = fname
+
+                db.session.add(OrderAttachment(
+                    order=order,
+                    filename=fname,
+                    original_name=original,
+                    size=size,
+                    mime_type=mimetypes.guess_type(fname)[0],
+                    checksum=checksum,
+                ))
+                added += 1
+
+            db.session.commit()
+
+    return scanned, added
+
+
 def create_order(user, form_data, files=None):
     order_id = f"ORD-{uuid.uuid4().hex[:8]}"
     order = Order(
@@ -44,25 +140,55 @@ def create_order(user, form_data, files=None):
     db.session.commit()
 
     # --- Handle file uploads ---
-    saved_files = []
     if files:
         root_dir = current_app.config.get("ORDERS_FOLDER", "uploads/orders")
         order_dir = os.path.join(root_dir, str(user.id), order.id)
 
+        saved = False
         for file in files.getlist("attachedFiles"):
             if not file or not file.filename:
                 continue
-            fname, fpath = save_uploaded_file(file, order_dir)
-            saved_files.append(fname)
+            save_uploaded_file(file, order_dir, order=order)
+            saved = True
 
-    if saved_files:
-        existing = order.requirements or ""
-        file_list = "\n".join(saved_files)
-        order.requirements = f"{existing}\n\n[Attachments: {len(saved_files)} file(s)]\n{file_list}"
-        db.session.commit()
+        if saved:
+            db.session.commit()
 
     return order
 
+def apply_order_search(q, search):
+    """
+    Filter an Order query by a free-text search term.
+
+    On PostgreSQL this matches the GIN-indexed tsvector over title, subject,
+    description and status, plus trigram-indexed ID substring and title
+    prefix lookups, and returns a rank expression to order by. Other
+    databases (SQLite in tests) fall back to ILIKE and get rank=None.
+    """
+    if db.session.get_bind().dialect.name != "postgresql":
+        search_term = f"%{search}%"
+        q = q.filter(
+            or_(
+                cast(Order.id, String).ilike(search_term),
+                Order.title.ilike(search_term),
+                Order.subject.ilike(search_term),
+                Order.description.ilike(search_term),
+                Order.status.ilike(search_term)
+            )
+        )
+        return q, None
+
+    ts_query = func.websearch_to_tsquery(text("'english'"), search)
+    q = q.filter(
+        or_(
+            ORDER_SEARCH_VECTOR.op("@@")(ts_query),
+            Order.id.ilike(f"%{search}%"),
+            Order.title.ilike(f"{search}%")
+        )
+    )
+    return q, func.ts_rank(ORDER_SEARCH_VECTOR, ts_query)
+
+
 def update_order_status(order, **kwargs):
     for k, v in kwargs.items():
         if hasattr(order, k):
@@ -170,3 +296,70 @@ def calculate_minimum_price(category, order_type, pages, deadline, now):
         effective_units = pages if pages else 1
 
     return round(base * effective_units * type_mult * urgency_mult, 2)
+
+
+# ------------------------------------------------------------
+#  Batch pricing (same rules as calculate_minimum_price)
+# ------------------------------------------------------------
+DEFAULT_BASE_PRICE = 5
+DEFAULT_TYPE_MULTIPLIER = 1
+
+_DEADLINE_HOURS = np.array([h for h, _ in DEADLINE_MULTIPLIER], dtype=float)
+_DEADLINE_MULTS = np.array([m for _, m in DEADLINE_MULTIPLIER] + [1.0])
+
+
+def _lookup(values, mapping):
+    """Map a sequence of keys through a dict, one dict lookup per distinct key."""
+    keys, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.array([mapping(k) for k in keys], dtype=float)[inverse]
+
+
+def calculate_minimum_prices(categories, order_types, pages, hours):
+    """
+    Vectorized calculate_minimum_price.
+
+    Takes equal-length sequences of category, order type, page count and
+    hours until the deadline; returns a list of prices identical to calling
+    calculate_minimum_price once per quote.
+    """
+    order_types = ["" if t is None else t for t in order_types]
+    categories = ["" if c is None else c for c in categories]
+
+    category_base = _lookup(categories, lambda c: BASE_PRICES.get(c, DEFAULT_BASE_PRICE))
+    flat_base = _lookup(order_types, lambda t: NON_PAGE_BASE_PRICE.get(t, np.nan))
+    base = np.where(np.isnan(flat_base), category_base, flat_base)
+    type_mult = _lookup(order_types, lambda t: ORDER_TYPE_MULTIPLIER.get(t, DEFAULT_TYPE_MULTIPLIER))
+    non_page = _lookup(order_types, lambda t: t in NON_PAGE_ORDER_TYPES).astype(bool)
+
+    units = np.array([p or 1 for p in pages], dtype=float)
+    units[non_page] = 1
+
+    # first threshold with hours <= max_hours, else 1.0
+    urgency = _DEADLINE_MULTS[np.searchsorted(_DEADLINE_HOURS, np.asarray(hours, dtype=float), side="left")]
+
+    prices = base * units * type_mult * urgency
+    # Python's round() so results match the scalar path to the cent
+    return [round(p, 2) for p in prices.tolist()]
+
+
+@lru_cache(maxsize=1)
+def pricing_table():
+    """
+    Everything a client needs to reproduce calculate_minimum_price locally,
+    plus a version hash that changes whenever any of the tables change.
+    """
+    table = {
+        "base_prices": BASE_PRICES,
+        "default_base_price": DEFAULT_BASE_PRICE,
+        "non_page_base_prices": NON_PAGE_BASE_PRICE,
+        "non_page_order_types": sorted(NON_PAGE_ORDER_TYPES),
+        "order_type_multipliers": ORDER_TYPE_MULTIPLIER,
+        "default_type_multiplier": DEFAULT_TYPE_MULTIPLIER,
+        "deadline_multipliers": [
+            {"max_hours": h, "multiplier": m} for h, m in DEADLINE_MULTIPLIER
+        ],
+        "rounding": 2,
+    }
+    raw = json.dumps(table, sort_keys=True).encode()
+    table["version"] = hashlib.sha256(raw).hexdigest()[:16]
+    return table
@@ -0,0 +1,214 @@
+"""
+Process-wide Presidio analyzer.
+
+Building an AnalyzerEngine loads the spaCy model (hundreds of MB, several
+seconds), so every caller shares the one instance from get_analyzer(). It is
+built on first use, or up front by warm_up() — call that before gunicorn
+forks (preload_app, see gunicorn.conf.py) and the workers share the loaded
+model copy-on-write instead of each loading their own.
+
+When presidio isn't installed get_analyzer() returns None and callers fall
+back to regex-only detection.
+
+The tier is configurable (init_pii_analyzer reads the app config):
+
+- PII_NLP_MODEL: the spaCy pipeline behind Presidio, "en_core_web_lg"
+  (default), "en_core_web_md" or "en_core_web_sm" (install the model package
+  first), or "regex" for Presidio's pattern recognizers (email, phone, URL)
+  without any spaCy model
+- PII_ENTITIES: comma separated entity types to report (default: all the
+  tier supports), e.g. "EMAIL_ADDRESS,PHONE_NUMBER,URL"
+
+benchmarks/nlp_tiers.py compares the tiers on latency, memory and recall.
+"""
+import logging
+import threading
+import time
+from functools import lru_cache
+from importlib import metadata
+
+logger = logging.getLogger(__name__)
+
+# AnalyzerEngine's default spaCy pipeline
+SPACY_MODEL = "en_core_web_lg"
+REGEX_TIER = "regex"
+
+# Phone regions tried by the regex tier (Presidio's default list lacks Kenya)
+PHONE_REGIONS = ("KE", "US", "GB", "IN", "CA")
+
+_lock = threading.Lock()
+_analyzer = None
+_loaded = False
+_settings = {"model": SPACY_MODEL, "entities": None}
+
+
+def init_pii_analyzer(app):
+    """Pick the tier from the app config; optionally load it right away."""
+    entities = [e.strip() for e in app.config.get("PII_ENTITIES", "").split(",") if e.strip()]
+    configure(app.config.get("PII_NLP_MODEL", SPACY_MODEL), entities or None)
+
+    if app.config.get("PII_ANALYZER_PRELOAD"):
+        warm_up()
+
+
+def configure(model=SPACY_MODEL, entities=None):
+    """Set the tier used by the next build (drops an already built analyzer)."""
+    with _lock:
+        if _settings == {"model": model, "entities": entities}:
+            return
+        _settings.update(model=model, entities=entities)
+    reset()
+    model_version.cache_clear()
+
+
+def get_analyzer():
+    """The shared AnalyzerEngine (None if presidio is unavailable)."""
+    global _analyzer, _loaded
+
+    if _loaded:
+        return _analyzer
+
+    with _lock:
+        if not _loaded:
+            _analyzer = _build_analyzer()
+            _loaded = True
+    return _analyzer
+
+
+def _build_analyzer():
+    try:
+        from presidio_analyzer import AnalyzerEngine
+        from presidio_analyzer.nlp_engine import NlpEngineProvider
+    except ImportError:
+        logger.warning("presidio_analyzer not installed; PII detection is regex-only")
+        return None
+
+    model = _settings["model"]
+    started = time.perf_counter()
+    try:
+        if model == REGEX_TIER:
+            engine = RegexAnalyzer()
+        elif not _model_installed(model):
+            # Presidio would otherwise try to download it at request time
+            logger.error("spaCy model %s is not installed; PII detection is regex-only", model)
+            return None
+        else:
+            nlp_engine = NlpEngineProvider(nlp_configuration={
+                "nlp_engine_name": "spacy",
+                "models": [{"lang_code": "en", "model_name": model}],
+            }).create_engine()
+            engine = AnalyzerEngine(nlp_engine=nlp_engine, supported_languages=["en"])
+    except Exception:  # e.g. the spaCy model isn't downloaded
+        logger.exception("Could not build the PII analyzer (%s); PII detection is regex-only", model)
+        return None
+    logger.info("PII analyzer (%s) loaded in %.1fs", model, time.perf_counter() - started)
+    return engine
+
+
+def _model_installed(model):
+    import spacy.util
+    return spacy.util.is_package(model)
+
+
+class RegexAnalyzer:
+    """
+    The "regex" tier: Presidio's pattern/phonenumbers recognizers for the
+    contact entities, with AnalyzerEngine.analyze's signature and no NLP model.
+    """
+
+    def __init__(self):
+        from presidio_analyzer.predefined_recognizers import (
+            EmailRecognizer,
+            PhoneRecognizer,
+            UrlRecognizer,
+        )
+
+        self.recognizers = [
+            EmailRecognizer(),
+            PhoneRecognizer(supported_regions=PHONE_REGIONS),
+            UrlRecognizer(),
+        ]
+
+    def analyze(self, text, language="en", entities=None, **kwargs):
+        from presidio_analyzer import EntityRecognizer
+
+        results = []
+        for recognizer in self.recognizers:
+            wanted = [e for e in recognizer.supported_entities if not entities or e in entities]
+            if wanted:
+                results.extend(recognizer.analyze(text, wanted, nlp_artifacts=None))
+        return EntityRecognizer.remove_duplicates(results)
+
+
+@lru_cache(maxsize=1)
+def model_version():
+    """
+    Installed presidio + spaCy model versions and the entity subset, read
+    without loading the model. Used to key cached analysis results.
+    """
+    model = _settings["model"]
+    parts = []
+    for package in ("presidio_analyzer", model):
+        if package == REGEX_TIER:
+            parts.append(REGEX_TIER)
+            continue
+        try:
+            parts.append(f"{package}-{metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            parts.append(f"{package}-missing")
+    parts.append(",".join(sorted(_settings["entities"] or ["all"])))
+    return "/".join(parts)
+
+
+def warm_up():
+    """
+    Build the analyzer and run it once so the spaCy pipeline and recognizers
+    are fully initialised before the first request (or before forking).
+    """
+    engine = get_analyzer()
+    if engine is not None:
+        engine.analyze(text="Warm up call to 0700 000 000 or a@b.co", language="en")
+    return engine
+
+
+def analyze(text, language="en"):
+    """Presidio results for `text`; [] when presidio is unavailable."""
+    engine = get_analyzer()
+    if engine is None or not text:
+        return []
+    return engine.analyze(text=text, language=language, entities=_settings["entities"])
+
+
+def analyze_batch(texts, language="en", batch_size=64, n_process=1):
+    """
+    Presidio results for each of `texts`, in order. The texts are streamed
+    through spaCy's nlp.pipe in batches, which is much faster than one
+    analyze() call per text for backfills.
+    """
+    engine = get_analyzer()
+    if engine is None:
+        for _ in texts:
+            yield []
+        return
+
+    entities = _settings["entities"]
+    if isinstance(engine, RegexAnalyzer):  # nothing to batch without a pipeline
+        for text in texts:
+            yield engine.analyze(text=text, language=language, entities=entities)
+        return
+
+    artifacts = engine.nlp_engine.process_batch(
+        texts, language, batch_size=batch_size, n_process=n_process
+    )
+    for text, nlp_artifacts in artifacts:
+        yield engine.analyze(
+            text=text, language=language, entities=entities, nlp_artifacts=nlp_artifacts
+        )
+
+
+def reset():
+    """Drop the shared instance (tests / benchmarks only)."""
+    global _analyzer, _loaded
+    with _lock:
+        _analyzer = None
+        _loaded = False
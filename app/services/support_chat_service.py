@@ -1,7 +1,9 @@
 from app.extensions import db
+from sqlalchemy import case, func, select, update
 from app.models.support_chat import SupportChat
 from app.models.support_message import SupportMessage
-from app.services.chat_service import sanitize_message
+from app.services.chat_service import moderate
+from app.services import moderation
 from flask import current_app
 import os
 import uuid
@@ -34,14 +36,97 @@ def get_or_create_support_chat(user_id):
 
 
 def add_support_message(chat_id, sender_id, content):
-    sanitized = sanitize_message(content)
-
-    msg = SupportMessage(
-        support_chat_id=chat_id,
-        sender_id=sender_id,
-        content=sanitized
+    msg = moderate(
+        SupportMessage(support_chat_id=chat_id, sender_id=sender_id),
+        content
     )
 
     db.session.add(msg)
+    db.session.flush()
+    _record_support_message(msg)
     db.session.commit()
+    moderation.enqueue(msg)
     return msg
+
+
+# ---------------------------------------
+# Admin inbox summary (SupportChat.status / unread_count / last_message_*)
+# ---------------------------------------
+
+def _record_support_message(msg):
+    """
+    New message: it becomes the chat's last one. One from the chat's user
+    also counts as unread for support and reopens a resolved chat.
+    """
+    from_user = SupportChat.user_id == msg.sender_id
+    db.session.execute(
+        update(SupportChat)
+        .where(SupportChat.id == msg.support_chat_id)
+        .values(
+            last_message_id=msg.id,
+            last_message_at=msg.created_at,
+            unread_count=SupportChat.unread_count + case((from_user, 1), else_=0),
+            status=case((from_user, "open"), else_=SupportChat.status),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_support_chat_read(chat, uid):
+    """
+    uid has read the chat: flag the other side's messages read and, when
+    support reads it, take exactly those off the inbox unread count (a
+    message committed meanwhile stays counted). Support reading flags only
+    the user's messages, the ones _record_support_message counted; another
+    agent's reply stays unread for the user. The caller commits.
+    """
+    by_support = uid != chat.user_id
+    other_side = (SupportMessage.sender_id == chat.user_id if by_support
+                  else SupportMessage.sender_id != uid)
+    read = SupportMessage.query.filter(
+        SupportMessage.support_chat_id == chat.id,
+        other_side,
+        SupportMessage.is_read == False
+    ).update({"is_read": True}, synchronize_session=False)
+
+    if read and by_support:
+        db.session.execute(
+            update(SupportChat)
+            .where(SupportChat.id == chat.id)
+            .values(unread_count=func.greatest(SupportChat.unread_count - read, 0))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def rebuild_support_chat_summaries():
+    """
+    Recompute last_message_* and unread_count of every support chat from
+    support_messages. Used to backfill existing data; safe to re-run.
+    """
+    messages = select(SupportMessage).where(
+        SupportMessage.support_chat_id == SupportChat.id
+    )
+    latest = (
+        messages.with_only_columns(SupportMessage.id)
+        .order_by(SupportMessage.created_at.desc(), SupportMessage.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    latest_at = messages.with_only_columns(func.max(SupportMessage.created_at)).scalar_subquery()
+    unread = (
+        messages.with_only_columns(func.count())
+        .where(SupportMessage.sender_id == SupportChat.user_id, SupportMessage.is_read == False)
+        .scalar_subquery()
+    )
+
+    result = db.session.execute(
+        update(SupportChat)
+        .values(
+            last_message_id=latest,
+            last_message_at=func.coalesce(latest_at, SupportChat.created_at, func.now()),
+            unread_count=unread,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
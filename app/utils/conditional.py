@@ -0,0 +1,35 @@
+import hashlib
+
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    """Weak validator from the values a response depends on (watermarks, ids)."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def not_modified(etag):
+    """
+    A 304 response if the request's If-None-Match already has `etag`,
+    else None. Call it before building the payload.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+
+    resp = current_app.response_class(status=304)
+    return _tag(resp, etag)
+
+
+def with_etag(result, etag):
+    """Attach the ETag to a success_response() result."""
+    resp, status = result
+    return _tag(resp, etag), status
+
+
+def _tag(resp, etag):
+    resp.set_etag(etag, weak=True)
+    # Browsers keep the body but revalidate on every poll
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
@@ -0,0 +1,78 @@
+"""
+JSON provider for API responses.
+
+Routes can hand datetimes, Decimals and UUIDs straight to success_response():
+
+- naive datetimes are treated as UTC and rendered like `dt.isoformat() + "Z"`;
+  aware ones keep their offset, with UTC written as "Z"
+- Decimal becomes its string form, as Flask's default provider renders it,
+  so money columns (Numeric(10, 2)) keep their exact value
+- UUID becomes its string form
+
+orjson does the encoding when it is installed; otherwise the stdlib encoder
+is used with the same conversions.
+"""
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is in requirements.txt; keep working without it
+    orjson = None
+
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.isoformat() + "Z"
+        return value.isoformat().replace("+00:00", "Z")
+    return value.isoformat()
+
+
+def _default(value):
+    """Types orjson (or the stdlib encoder) doesn't handle natively."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return _isoformat(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider with the API's datetime/Decimal handling."""
+
+    default = staticmethod(_default)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """orjson-backed provider; same output conventions as StdlibJSONProvider."""
+
+    option = (
+        orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if orjson else 0
+    )
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=option) + b"\n",
+            mimetype=self.mimetype,
+        )
+
+
+def init_json_provider(app):
+    app.json = ORJSONProvider(app) if orjson else StdlibJSONProvider(app)
@@ -1,7 +1,171 @@
-def paginate_query(query, page, limit):
+import base64
+import json
+from datetime import datetime, timezone
+from sqlalchemy import tuple_
+from werkzeug.exceptions import BadRequest
+
+
+def encode_cursor(created_at, row_id):
+    """
+    Opaque cursor for the (created_at, id) position of a row. A NULL in
+    either has no place in the keyset order, so it is refused; cursor pages
+    leave such rows out (see paginate_query).
+    """
+    if created_at is None or row_id is None:
+        raise ValueError("Cannot encode a cursor for a NULL keyset value")
+    raw = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if created_at is None or row_id is None:
+            raise ValueError("NULL keyset value")
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError):
+        raise BadRequest("Invalid pagination cursor")
+
+
+def _count_mode(count, cursor_mode):
+    """count arg/query param -> True, False or "estimate"."""
+    if count is None:
+        return not cursor_mode
+    if isinstance(count, str):
+        count = count.lower()
+        if count == "estimate":
+            return "estimate"
+        return count not in ("0", "false", "no", "none")
+    return count
+
+
+def _estimated_count(query):
+    """Planner row estimate on PostgreSQL; exact count elsewhere."""
+    query = query.order_by(None)
+    conn = query.session.connection()
+    if conn.dialect.name != "postgresql":
+        return query.count()
+
+    compiled = query.statement.compile(dialect=conn.dialect)
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate_query(query, page, limit, keyset=None, cursor=None, count=None, descending=True):
+    """
+    Paginate a query by OFFSET (default) or by keyset.
+
+    keyset: (created_at_column, id_column). The query is ordered by these
+    columns (newest first unless descending=False). When `cursor` is not None
+    the page starts after that cursor ("" = first page) instead of at
+    (page-1)*limit, and the response carries `next_cursor`. Rows whose
+    created_at is NULL are skipped in cursor mode: they would never compare
+    past a cursor, and have no position to encode.
+
+    count: True = exact count(), False = skip it, "estimate" = planner
+    estimate. Defaults to exact for offset pages and skipped for cursor pages.
+    """
     page = max(int(page) if page else 1, 1)
     limit = max(int(limit) if limit else 10, 1)
-    items = query.offset((page-1)*limit).limit(limit).all()
-    total = query.order_by(None).count()
-    total_pages = (total + limit - 1) // limit
-    return items, {"total": total, "page": page, "limit": limit, "total_pages": total_pages}
+    cursor_mode = keyset is not None and cursor is not None
+    count = _count_mode(count, cursor_mode)
+    if cursor_mode:
+        query = query.filter(keyset[0].isnot(None))
+
+    base = query
+    if keyset is not None:
+        order = [c.desc() if descending else c.asc() for c in keyset]
+        query = query.order_by(None).order_by(*order)
+
+    meta = {"limit": limit}
+
+    if cursor_mode:
+        if cursor:
+            position = tuple_(*keyset)
+            after = tuple_(*decode_cursor(cursor))
+            query = query.filter(position < after if descending else position > after)
+        rows = query.limit(limit + 1).all()
+    else:
+        meta["page"] = page
+        rows = query.offset((page - 1) * limit).limit(limit + 1).all()
+
+    items = rows[:limit]
+    meta["has_more"] = len(rows) > limit
+
+    if cursor_mode:
+        last = items[-1] if items and meta["has_more"] else None
+        meta["next_cursor"] = (
+            encode_cursor(*(getattr(last, c.key) for c in keyset)) if last else None
+        )
+
+    if count:
+        total = _estimated_count(base) if count == "estimate" else base.order_by(None).count()
+        meta["total"] = total
+        meta["total_pages"] = (total + limit - 1) // limit
+        if count == "estimate":
+            meta["total_estimated"] = True
+
+    return items, meta
+
+
+def _window_bound(query, keyset, value):
+    """
+    after=/before= value -> (created_at, id). A message id is looked up within
+    `query` (so it must belong to the same chat); an ISO timestamp gives
+    (timestamp, None), which bounds on created_at alone.
+    """
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        created_at = query.order_by(None).with_entities(keyset[0]).filter(keyset[1] == value).scalar()
+        if created_at is None:
+            raise BadRequest(f"Unknown message id: {value}")
+        return created_at, value
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)  # stored as naive UTC
+    return ts, None
+
+
+def paginate_window(query, keyset, after=None, before=None, limit=50):
+    """
+    Page a chat history by position rather than by page number.
+
+    after / before: a message id or an ISO timestamp (exclusive). With
+    `after` the page is the oldest `limit` rows past it, so a client that
+    already has the history fetches only what is new; with only `before` it
+    is the newest `limit` rows older than it (scrolling back). Items are
+    always oldest first. has_more says whether rows remain past the page in
+    that direction; newest_id / oldest_id are the ids to pass as the next
+    after= / before=.
+    """
+    limit = max(int(limit) if limit else 50, 1)
+    created_col, id_col = keyset
+
+    for value, newer in ((after, True), (before, False)):
+        if not value:
+            continue
+        created_at, row_id = _window_bound(query, keyset, value)
+        if row_id is None:
+            bound = created_col > created_at if newer else created_col < created_at
+        else:
+            position, at = tuple_(created_col, id_col), tuple_(created_at, row_id)
+            bound = position > at if newer else position < at
+        query = query.filter(bound)
+
+    backwards = bool(before) and not after
+    order = [c.desc() if backwards else c.asc() for c in keyset]
+    rows = query.order_by(None).order_by(*order).limit(limit + 1).all()
+
+    items = rows[:limit]
+    if backwards:
+        items.reverse()
+
+    return items, {
+        "limit": limit,
+        "has_more": len(rows) > limit,
+        "newest_id": getattr(items[-1], id_col.key) if items else None,
+        "oldest_id": getattr(items[0], id_col.key) if items else None,
+    }
@@ -0,0 +1,34 @@
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and "query_count" in g:
+        g.query_count += 1
+
+
+def query_count():
+    """Statements executed so far in the current request (0 outside one)."""
+    return g.get("query_count", 0) if has_app_context() else 0
+
+
+def init_query_counter(app):
+    """
+    Count SQL statements per request and, when QUERY_COUNT_HEADER is enabled
+    (on by default in debug), return the count in an X-Query-Count header.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _count_statement):
+        event.listen(Engine, "before_cursor_execute", _count_statement)
+
+    @app.before_request
+    def start_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def add_query_count_header(response):
+        if app.config.get("QUERY_COUNT_HEADER", app.debug):
+            response.headers[QUERY_COUNT_HEADER] = str(query_count())
+        return response
@@ -0,0 +1,149 @@
+"""
+PII analyzer startup cost and memory, before and after sharing one instance.
+
+Each scenario runs in a fresh interpreter so RSS numbers don't leak between
+them. Needs presidio_analyzer and the spaCy model; no database. Linux only
+(reads /proc).
+
+    python -m benchmarks.analyzer_startup [--workers 4]
+
+Scenarios:
+  legacy    two AnalyzerEngine() per process, as chat_service and
+            chat_behavior_analyzer used to build at import
+  shared    pii_analyzer.get_analyzer() from both call sites
+  lazy      N forked workers, each loading the model after the fork
+  preload   model loaded once before forking (gunicorn preload_app)
+
+For the fork scenarios, "total PSS" is the whole pool's memory footprint
+(master + workers, shared pages split between the processes using them).
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+SAMPLE = "Call me on zero seven one two 345 678 or write to jane dot doe at gmail dot com"
+
+
+def _kb(path, field):
+    with open(path) as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def rss_mb(pid="self"):
+    return _kb(f"/proc/{pid}/status", "VmRSS") / 1024
+
+
+def pss_mb(pid="self"):
+    return _kb(f"/proc/{pid}/smaps_rollup", "Pss") / 1024
+
+
+def run_legacy():
+    from presidio_analyzer import AnalyzerEngine
+
+    base = rss_mb()
+    started = time.perf_counter()
+    engines = [AnalyzerEngine(), AnalyzerEngine()]
+    for engine in engines:
+        engine.analyze(text=SAMPLE, language="en")
+    return {"seconds": time.perf_counter() - started, "rss_mb": rss_mb() - base}
+
+
+def run_shared():
+    from app.services import pii_analyzer
+
+    base = rss_mb()
+    started = time.perf_counter()
+    for _ in range(2):  # both call sites
+        pii_analyzer.warm_up()
+    return {"seconds": time.perf_counter() - started, "rss_mb": rss_mb() - base}
+
+
+def run_pool(workers, preload):
+    from app.services import pii_analyzer
+
+    started = time.perf_counter()
+    if preload:
+        pii_analyzer.warm_up()
+        gc.freeze()  # what gunicorn.conf.py does before the first fork
+
+    release_r, release_w = os.pipe()
+    children = []
+    for _ in range(workers):
+        report_r, report_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(release_w)
+            os.close(report_r)
+            pii_analyzer.analyze(SAMPLE)  # loads the model here when not preloaded
+            os.write(report_w, b"ready")
+            os.read(release_r, 1)  # stay alive until the parent has measured everyone
+            os._exit(0)
+        os.close(report_w)
+        children.append((pid, report_r))
+
+    for _, report_r in children:
+        os.read(report_r, 5)
+    elapsed = time.perf_counter() - started
+
+    total = pss_mb() + sum(pss_mb(pid) for pid, _ in children)
+    worker_rss = max(rss_mb(pid) for pid, _ in children)
+
+    os.close(release_w)
+    for pid, report_r in children:
+        os.close(report_r)
+        os.waitpid(pid, 0)
+    return {"seconds": elapsed, "total_pss_mb": total, "worker_rss_mb": worker_rss}
+
+
+def scenario(name, workers):
+    """Run one scenario in a fresh interpreter; returns its result dict."""
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.analyzer_startup",
+         "--scenario", name, "--workers", str(workers)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scenario", choices=["legacy", "shared", "lazy", "preload"])
+    args = parser.parse_args()
+
+    if args.scenario:
+        runners = {
+            "legacy": run_legacy,
+            "shared": run_shared,
+            "lazy": lambda: run_pool(args.workers, preload=False),
+            "preload": lambda: run_pool(args.workers, preload=True),
+        }
+        print(json.dumps(runners[args.scenario]()))
+        return
+
+    try:
+        import presidio_analyzer  # noqa: F401
+    except ImportError:
+        sys.exit("presidio_analyzer is not installed")
+
+    for name in ("legacy", "shared"):
+        r = scenario(name, args.workers)
+        print(f"{name:<8} load={r['seconds']:6.2f} s  rss=+{r['rss_mb']:7.1f} MB")
+
+    for name in ("lazy", "preload"):
+        r = scenario(name, args.workers)
+        print(
+            f"{name:<8} workers={args.workers} ready={r['seconds']:6.2f} s  "
+            f"total_pss={r['total_pss_mb']:7.1f} MB  worker_rss={r['worker_rss_mb']:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks seed their own data, so point BENCH_DATABASE_URL at a scratch
+PostgreSQL database, never at production:
+
+    export BENCH_DATABASE_URL=postgresql://localhost/academichub_bench
+    python -m benchmarks.<script>
+"""
+import os
+import sys
+import time
+import json
+import statistics
+
+from flask import Flask
+from app.extensions import db
+
+# register every mapped table before create_all()
+from app.models import (  # noqa: F401
+    user, order, order_attachment, bid, declined_order, order_invitation, marketplace_exclusion,
+    review, chat, chat_read, message, notification, notification_read, wallet,
+    wallet_transaction, withdrawal_request, support_chat, support_message,
+)
+
+
+def bench_app():
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        sys.exit("BENCH_DATABASE_URL is not set (use a scratch database)")
+
+    flask_app = Flask(__name__)
+    flask_app.config["SQLALCHEMY_DATABASE_URI"] = url
+    flask_app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(flask_app)
+    return flask_app
+
+
+def explain(query, analyze=True):
+    """EXPLAIN an ORM query; returns (execution_ms, plan_json)."""
+    conn = db.session.connection()
+    compiled = query.statement.compile(dialect=conn.dialect)
+    opts = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    row = conn.exec_driver_sql(f"EXPLAIN ({opts}) {compiled}", compiled.params).scalar()
+    plan = row[0] if isinstance(row, list) else json.loads(row)[0]
+    return plan.get("Execution Time"), plan["Plan"]
+
+
+def plan_nodes(plan):
+    """Flatten a JSON plan into its node types."""
+    nodes = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def timed(fn, repeat=20):
+    """Run fn `repeat` times; returns (p50_ms, p99_ms)."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.median(samples), p99
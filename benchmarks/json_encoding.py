@@ -0,0 +1,103 @@
+"""
+Response encoding: hand-formatted rows through Flask's stdlib provider vs raw
+values through the orjson provider.
+
+Builds transaction-shaped rows (Decimal amount, naive UTC datetime) and times
+success_response() for a full list, as GET /payments/transactions does (the
+amount stays a float() there: the provider renders a raw Decimal as a string,
+like Flask's). No database needed.
+
+    python -m benchmarks.json_encoding
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.json_provider import ORJSONProvider, StdlibJSONProvider
+from app.utils.response_formatter import success_response
+from benchmarks.common import timed
+
+SIZES = (100, 1_000, 10_000)
+
+
+def make_rows(n):
+    start = datetime(2025, 1, 1)
+    return [
+        SimpleNamespace(
+            id=f"tx_{i:012x}",
+            type="credit" if i % 3 else "debit",
+            amount=Decimal(f"{i % 500}.{i % 100:02d}"),
+            reference_type="order",
+            reference_id=f"ORD-{i:08x}",
+            description="Order payment",
+            created_at=start + timedelta(seconds=i * 37, microseconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+def legacy_payload(rows):
+    return [
+        {
+            "id": t.id,
+            "type": t.type,
+            "amount": float(t.amount),
+            "reference_type": t.reference_type,
+            "reference_id": t.reference_id,
+            "description": t.description,
+            "created_at": t.created_at.isoformat() + "Z"
+        }
+        for t in rows
+    ]
+
+
+def raw_payload(rows):
+    return [
+        {
+            "id": t.id,
+            "type": t.type,
+            "amount": float(t.amount),
+            "reference_type": t.reference_type,
+            "reference_id": t.reference_id,
+            "description": t.description,
+            "created_at": t.created_at
+        }
+        for t in rows
+    ]
+
+
+def app_with(provider_class):
+    flask_app = Flask(__name__)
+    flask_app.json = provider_class(flask_app)
+    return flask_app
+
+
+def main():
+    cases = [
+        ("stdlib + isoformat()", DefaultJSONProvider, legacy_payload),
+        ("stdlib provider, raw", StdlibJSONProvider, raw_payload),
+        ("orjson provider, raw", ORJSONProvider, raw_payload),
+    ]
+
+    for n in SIZES:
+        rows = make_rows(n)
+        bodies = {}
+        for label, provider, build in cases:
+            flask_app = app_with(provider)
+            with flask_app.app_context():
+                def encode():
+                    resp, _ = success_response({"transactions": build(rows)})
+                    return resp.get_data()
+                bodies[label] = flask_app.json.loads(encode())
+                p50, p99 = timed(encode, repeat=30)
+            print(f"rows={n:<6} {label:<22} p50={p50:8.2f} ms  p99={p99:8.2f} ms")
+
+        first, *rest = bodies.values()
+        assert all(body == first for body in rest), "providers disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+List endpoints at limit=100: per-row lazy loads vs the app.serializers shapes.
+
+Each case builds the same page twice, once with relationships left lazy (the
+pre-serializer behaviour) and once with the serializer's *_load() options and
+batched summaries, and reports p50/p99 latency plus statements per page.
+
+    python -m benchmarks.list_serializers
+"""
+from sqlalchemy import event, func, text
+
+from app.extensions import db
+from app.models.bid import Bid
+from app.models.chat import Chat
+from app.models.message import Message
+from app.models.order import Order
+from app.models.user import User
+from app.models.withdrawal_request import WithdrawalRequest
+from app.serializers.bid import bid_joined_order_with_writer_load, serialize_bids
+from app.serializers.chat import (
+    chat_list_load, message_list_load, serialize_chat_list_item, serialize_message,
+)
+from app.services.chat_service import inbox_expressions, rebuild_chat_summaries
+from app.serializers.order import order_list_load, serialize_order_list_item
+from app.serializers.payment import admin_withdrawal_list_load, serialize_admin_withdrawal
+from benchmarks.common import bench_app, timed
+
+LIMIT = 100
+USERS = 2_000
+ORDERS = 20_000
+BIDS = 100_000
+CHATS = 500
+MESSAGES_PER_CHAT = 40
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, password_hash, role, full_name)
+    SELECT 'usr-' || g, 'bench' || g || '@example.com', 'x',
+           CASE WHEN g % 2 = 0 THEN 'client' ELSE 'writer' END, 'User ' || g
+    FROM generate_series(1, {USERS}) g
+    """,
+    f"""
+    INSERT INTO orders (id, title, client_budget, writer_budget, minimum_allowed_budget,
+                        status, client_id, created_at, payment_status, marketplace_open)
+    SELECT 'ORD-' || g, 'Order ' || g, 100, 30, 10, 'in_progress',
+           'usr-' || ((g % ({USERS} / 2)) * 2 + 2),
+           now() - g * interval '1 minute', 'unpaid', true
+    FROM generate_series(1, {ORDERS}) g
+    """,
+    f"""
+    INSERT INTO bids (id, order_id, user_id, writer_amount, client_amount, status, submitted_at)
+    SELECT 'BID-' || g, 'ORD-' || (g % {ORDERS} + 1), 'usr-' || ((g % ({USERS} / 2)) * 2 + 1),
+           30, 100, 'open', now() - g * interval '1 second'
+    FROM generate_series(1, {BIDS}) g
+    """,
+    f"""
+    INSERT INTO chats (id, order_id, client_id, writer_id, created_at, last_message_at,
+                       warning_active)
+    SELECT 'chat-' || g, 'ORD-' || g, 'usr-2', 'usr-' || (g * 2 + 1),
+           now() - g * interval '1 minute', now() - g * interval '1 minute', false
+    FROM generate_series(1, {CHATS}) g
+    """,
+    f"""
+    INSERT INTO messages (id, chat_id, sender_id, content, is_read, created_at)
+    SELECT 'msg-' || c || '-' || m, 'chat-' || c,
+           CASE WHEN m % 2 = 0 THEN 'usr-2' ELSE 'usr-' || (c * 2 + 1) END,
+           'Message ' || m, m % 3 = 0, now() - (c * 100 + m) * interval '1 second'
+    FROM generate_series(1, {CHATS}) c, generate_series(1, {MESSAGES_PER_CHAT}) m
+    """,
+    f"""
+    INSERT INTO withdrawal_requests (id, user_id, amount, status, method, destination, requested_at)
+    SELECT 'WD-' || g, 'usr-' || ((g % ({USERS} / 2)) * 2 + 1), 10, 'pending', 'mpesa',
+           '0700000000', now() - g * interval '1 minute'
+    FROM generate_series(1, 5000) g
+    """,
+]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def run_case(label, before, after):
+    counter = StatementCounter()
+    event.listen(db.engine, "before_cursor_execute", counter)
+    try:
+        results = {}
+        for name, fn in (("lazy", before), ("eager", after)):
+            def page():
+                db.session.expunge_all()
+                fn()
+            counter.count = 0
+            page()
+            statements = counter.count
+            p50, p99 = timed(page)
+            results[name] = (p50, p99, statements)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", counter)
+
+    for name, (p50, p99, statements) in results.items():
+        print(f"{label:<22} {name:<6} p50={p50:8.2f} ms  p99={p99:8.2f} ms  queries={statements}")
+
+
+def main():
+    app = bench_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        print("Seeding...")
+        for sql in SEED_SQL:
+            db.session.execute(text(sql))
+        db.session.commit()
+        rebuild_chat_summaries()
+        db.session.execute(text("ANALYZE"))
+
+        writer = db.session.get(User, "usr-1")
+        client_id = "usr-2"
+
+        def orders_page(q):
+            return q.order_by(Order.created_at.desc()).limit(LIMIT).all()
+
+        run_case(
+            "GET /orders (writer)",
+            lambda: [serialize_order_list_item(o, writer) for o in orders_page(Order.query)],
+            lambda: [serialize_order_list_item(o, writer)
+                     for o in orders_page(Order.query.options(*order_list_load()))],
+        )
+
+        def client_bids(q):
+            return (
+                q.filter(Order.client_id != client_id)
+                .order_by(Bid.submitted_at.desc())
+                .limit(LIMIT).all()
+            )
+
+        run_case(
+            "GET /client/bids",
+            lambda: serialize_bids(client_bids(Bid.query.join(Order)), "client", True),
+            lambda: serialize_bids(
+                client_bids(Bid.query.join(Order).options(*bid_joined_order_with_writer_load())),
+                "client", True,
+            ),
+        )
+
+        def withdrawals(q):
+            return q.order_by(WithdrawalRequest.requested_at.desc()).limit(LIMIT).all()
+
+        run_case(
+            "GET /admin/withdrawals",
+            lambda: [serialize_admin_withdrawal(w)
+                     for w in withdrawals(WithdrawalRequest.query.join(User))],
+            lambda: [serialize_admin_withdrawal(w) for w in withdrawals(
+                WithdrawalRequest.query.join(User).options(*admin_withdrawal_list_load())
+            )],
+        )
+
+        def chats(q):
+            q = q.filter((Chat.client_id == client_id) | (Chat.writer_id == client_id))
+            return q.order_by(Chat.last_message_at.desc(), Chat.id.desc()).limit(LIMIT).all()
+
+        run_case(
+            "GET /chats",
+            lambda: [serialize_chat_list_item(c, client_id)
+                     for c in chats(Chat.query.options(*inbox_expressions(client_id)))],
+            lambda: [serialize_chat_list_item(c, client_id)
+                     for c in chats(Chat.query.options(*chat_list_load(client_id)))],
+        )
+
+        busiest = (
+            db.session.query(Message.chat_id)
+            .group_by(Message.chat_id)
+            .order_by(func.count().desc())
+            .limit(1).scalar()
+        )
+
+        def messages(q):
+            return q.filter_by(chat_id=busiest).order_by(Message.created_at).limit(LIMIT).all()
+
+        run_case(
+            "GET /chats/<id>/messages",
+            lambda: [serialize_message(m, m.is_read) for m in messages(Message.query)],
+            lambda: [serialize_message(m, m.is_read)
+                     for m in messages(Message.query.options(*message_list_load()))],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Marketplace listing: legacy NOT IN plan vs the maintained marketplace index.
+
+Seeds 100k orders, 1M bids and 50k declines, then EXPLAIN ANALYZEs the first
+marketplace page for one writer with both query shapes.
+
+    python -m benchmarks.marketplace_query
+"""
+from datetime import datetime, timezone
+from sqlalchemy import or_, text
+
+from app.extensions import db
+from app.models.bid import Bid
+from app.models.declined_order import DeclinedOrder
+from app.models.order import Order
+from app.services.marketplace_service import filter_marketplace, rebuild_marketplace
+from benchmarks.common import bench_app, explain, plan_nodes
+
+ORDERS = 100_000
+BIDS = 1_000_000
+DECLINES = 50_000
+USERS = 5_000
+WRITER_ID = "usr-1"
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, password_hash, role)
+    SELECT 'usr-' || g, 'bench' || g || '@example.com', 'x',
+           CASE WHEN g % 10 = 0 THEN 'client' ELSE 'writer' END
+    FROM generate_series(1, {USERS}) g
+    """,
+    f"""
+    INSERT INTO orders (id, title, client_budget, writer_budget, minimum_allowed_budget,
+                        status, client_id, writer_id, deadline, created_at,
+                        payment_status, marketplace_open)
+    SELECT 'ORD-' || g, 'Order ' || g, 100, 30, 10,
+           CASE WHEN g % 50 = 0 THEN 'cancelled' ELSE 'in_progress' END,
+           'usr-' || ((g % 500) * 10 + 10),
+           CASE WHEN g % 4 = 0 THEN 'usr-' || (g % {USERS - 1} + 1) END,
+           now() + ((g % 720) - 240) * interval '1 hour',
+           now() - g * interval '1 minute',
+           'unpaid', true
+    FROM generate_series(1, {ORDERS}) g
+    """,
+    f"""
+    INSERT INTO bids (id, order_id, user_id, writer_amount, client_amount, status, submitted_at)
+    SELECT 'BID-' || g, 'ORD-' || (g % {ORDERS} + 1), 'usr-' || (g % {USERS - 1} + 1),
+           30, 100, CASE WHEN g % 40 = 0 THEN 'accepted' ELSE 'open' END, now()
+    FROM generate_series(1, {BIDS}) g
+    """,
+    f"""
+    INSERT INTO declined_orders (order_id, writer_id, reason)
+    SELECT 'ORD-' || (g * 7 % {ORDERS} + 1), 'usr-' || (g % {USERS - 1} + 1), 'bench'
+    FROM generate_series(1, {DECLINES}) g
+    """,
+]
+
+
+def legacy_query(writer_id, now):
+    """The pre-index list_orders marketplace query."""
+    q = Order.query.filter(or_(Order.deadline == None, Order.deadline >= now))  # noqa: E711
+    q = q.filter(~Order.id.in_(db.session.query(Bid.order_id).filter(Bid.user_id == writer_id)))
+    q = q.filter(~Order.id.in_(
+        db.session.query(DeclinedOrder.order_id).filter_by(writer_id=writer_id)
+    ))
+    q = q.filter(~Order.id.in_(db.session.query(Bid.order_id).filter(Bid.status == "accepted")))
+    return q.order_by(Order.created_at.desc()).limit(10)
+
+
+def indexed_query(writer_id, now):
+    q = Order.query.filter(or_(Order.deadline == None, Order.deadline >= now))  # noqa: E711
+    q = filter_marketplace(q, writer_id)
+    return q.order_by(Order.created_at.desc()).limit(10)
+
+
+def main():
+    app = bench_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        print(f"Seeding {ORDERS} orders, {BIDS} bids, {DECLINES} declines...")
+        for sql in SEED_SQL:
+            db.session.execute(text(sql))
+        db.session.commit()
+
+        print("Rebuilding marketplace index:", rebuild_marketplace())
+        db.session.execute(text("ANALYZE"))
+
+        now = datetime.now(timezone.utc)
+        for label, build in (("legacy NOT IN", legacy_query), ("marketplace index", indexed_query)):
+            ms, plan = explain(build(WRITER_ID, now))
+            print(f"{label:<18} {ms:8.2f} ms  nodes={sorted(set(plan_nodes(plan)))}")
+
+
+if __name__ == "__main__":
+    main()
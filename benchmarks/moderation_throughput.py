@@ -0,0 +1,91 @@
+"""
+Chat posting under concurrent posters: Presidio inline in the request vs the
+moderation process pool.
+
+Each poster thread stands in for a gunicorn thread handling POST /messages;
+"latency" is the time the request spends sanitizing, "drained" is when every
+message has also been through NER. No database needed; install presidio and
+the spaCy model for meaningful numbers (without them NER is a no-op).
+
+    python -m benchmarks.moderation_throughput [--posters 8] [--messages 50] [--pool 2]
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from app.services import moderation, pii_analyzer
+from app.services.chat_service import ner_spans, scan_message
+
+SAMPLES = [
+    "Hi, I have uploaded the second draft, please review the conclusion.",
+    "Sure, my WhatsApp is zero seven one two three four five six seven eight",
+    "You can reach John Kamau directly at john dot kamau at gmail dot com",
+    "The references follow APA 7th edition as requested in the brief.",
+    "Can we move the deadline to Friday evening Nairobi time?",
+]
+
+
+def run(posters, messages, post):
+    latencies = []
+    lock = threading.Lock()
+
+    def poster(n):
+        mine = []
+        for i in range(messages):
+            text = SAMPLES[(n + i) % len(SAMPLES)]
+            started = time.perf_counter()
+            post(text)
+            mine.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=poster, args=(n,)) for n in range(posters)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def report(label, answered, drained, latencies):
+    total = len(latencies)
+    p99 = latencies[min(total - 1, int(total * 0.99))]
+    print(
+        f"{label:<8} p50={statistics.median(latencies):8.2f} ms  p99={p99:8.2f} ms  "
+        f"answered={total / answered:8.1f} msg/s  drained={total / drained:8.1f} msg/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posters", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--pool", type=int, default=2)
+    args = parser.parse_args()
+
+    pii_analyzer.warm_up()
+
+    elapsed, latencies = run(args.posters, args.messages, lambda text: scan_message(text))
+    report("inline", elapsed, elapsed, latencies)
+
+    pool = moderation.start_pool(args.pool)
+    futures = []
+
+    def post_async(text):
+        clean, _ = scan_message(text, ner=False)
+        futures.append(pool.submit(ner_spans, clean))
+
+    started = time.perf_counter()
+    elapsed, latencies = run(args.posters, args.messages, post_async)
+    for f in futures:
+        f.result()
+    drained = time.perf_counter() - started
+    report(f"pool={args.pool}", elapsed, drained, latencies)
+
+    moderation.shutdown()
+
+
+if __name__ == "__main__":
+    main()
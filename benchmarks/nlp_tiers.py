@@ -0,0 +1,152 @@
+"""
+PII analyzer tiers side by side: latency, memory and recall.
+
+Each tier (PII_NLP_MODEL value) runs in a fresh interpreter. Contact messages
+are labeled with the contact detail they leak, in normalized form; a tier
+"catches" a message when its NER spans cover all of it. "pipeline" is the
+same check on scan_message's output, i.e. after the regex pass as well.
+"false pos" counts clean messages that came back with a [REDACTED]. No database needed;
+spaCy tiers whose model isn't installed are reported as skipped.
+
+    python -m benchmarks.nlp_tiers [--tiers regex,en_core_web_sm,...] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.analyzer_startup import rss_mb
+
+TIERS = ("regex", "en_core_web_sm", "en_core_web_md", "en_core_web_lg")
+
+# (message, leaked contact detail as it reads after normalize_text)
+CONTACT = [
+    ("my email is jane dot doe at gmail dot com", "jane.doe@gmail.com"),
+    ("reach me: jane (at) gmail (dot) com", "jane @ gmail . com"),
+    ("write to peter.otieno@yahoo.com for the files", "peter.otieno@yahoo.com"),
+    ("mail kamau at outlook dot com when done", "kamau@outlook.com"),
+    ("call me on zero seven one two three four five six seven eight", "0712345678"),
+    ("whatsapp +254 712 345 678 anytime", "+254712345678"),
+    ("my number is 0712-345-678", "0712345678"),
+    ("text 07 12 34 56 78 after 6pm", "0712345678"),
+    ("US clients call (415) 555-0132", "(415) 5550132"),
+    ("my line is seven one two, three four five, six seven eight", "712345678"),
+    ("add me on telegram, number zero seven two two 123 456", "0722123456"),
+    ("find me at www.janeswriting.com", "www.janeswriting.com"),
+    ("portfolio: https://kamau-essays.net/contact", "https://kamau-essays.net/contact"),
+    ("skype id is jane.doe.writer, email jane.doe at proton dot me", "jane.doe@proton.me"),
+    ("my gmail is wanjikuwrites at gmail dot com", "wanjikuwrites@gmail.com"),
+    ("ping 0733 222 111 on signal", "0733222111"),
+]
+
+CLEAN = [
+    "Please see attached",
+    "When will it be done?",
+    "Hello, I have uploaded the revised draft with the changes you asked for.",
+    "Kindly use at least 8 scholarly sources published after 2018.",
+    "The paper should be 1500 words, APA 7, double spaced.",
+    "Can you add a counter-argument paragraph before the conclusion?",
+    "Thanks! Approving now. Great work on the discussion section.",
+    "Section 2.3 needs more detail on the methodology",
+    "Page 4 has a formatting issue with the table of contents.",
+    "Sure, give me two hours and I will send the update.",
+    "Dr. Smith's 2019 study in Nairobi is a good source for chapter three.",
+    "Order 4521 was approved on Monday, thank you John.",
+]
+
+
+def covered(text, spans, secret):
+    """True when the spans cover every character of `secret` in `text`."""
+    start = text.find(secret)
+    if start < 0:
+        return False
+    hit = set()
+    for s, e, _ in spans:
+        hit.update(range(s, e))
+    return all(i in hit for i in range(start, start + len(secret)))
+
+
+def run_tier(model, repeat):
+    from app.services import ner_cache, pii_analyzer
+    from app.services.chat_service import REDACTED, normalize_text, scan_message
+
+    base = rss_mb()
+    pii_analyzer.configure(model)
+    started = time.perf_counter()
+    if pii_analyzer.warm_up() is None:
+        return {"skipped": True}
+    load = time.perf_counter() - started
+    ner_cache.reset()
+
+    messages = [m for m, _ in CONTACT] + CLEAN
+    latencies = []
+    for _ in range(repeat):
+        for m in messages:
+            t = normalize_text(m)
+            started = time.perf_counter()
+            pii_analyzer.analyze(t)
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    ner_hits = pipeline_hits = 0
+    for m, secret in CONTACT:
+        t = normalize_text(m)
+        spans = [(r.start, r.end, r.entity_type) for r in pii_analyzer.analyze(t)]
+        ner_hits += covered(t, spans, secret)
+        clean, _ = scan_message(m)
+        pipeline_hits += secret not in clean
+    false_pos = sum(REDACTED in scan_message(m)[0] for m in CLEAN)
+
+    return {
+        "load_s": load,
+        "rss_mb": rss_mb() - base,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "ner_recall": ner_hits / len(CONTACT),
+        "pipeline_recall": pipeline_hits / len(CONTACT),
+        "false_pos": false_pos,
+    }
+
+
+def tier(model, repeat):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.nlp_tiers", "--tier", model, "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiers", default=",".join(TIERS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tier")
+    args = parser.parse_args()
+
+    if args.tier:
+        print(json.dumps(run_tier(args.tier, args.repeat)))
+        return
+
+    try:
+        import presidio_analyzer  # noqa: F401
+    except ImportError:
+        sys.exit("presidio_analyzer is not installed")
+
+    print(f"{len(CONTACT)} contact messages, {len(CLEAN)} clean")
+    for model in args.tiers.split(","):
+        r = tier(model, args.repeat)
+        if r.get("skipped"):
+            print(f"{model:<15} skipped (model not installed)")
+            continue
+        print(
+            f"{model:<15} load={r['load_s']:5.1f} s  rss=+{r['rss_mb']:6.1f} MB  "
+            f"p50={r['p50_ms']:6.2f} ms  p99={r['p99_ms']:6.2f} ms  "
+            f"ner recall={r['ner_recall']:5.0%}  pipeline recall={r['pipeline_recall']:5.0%}  "
+            f"false pos={r['false_pos']}/{len(CLEAN)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Group notification fan-out at 100k recipients: one ORM Notification per user
+(the old send_notification_to_group) vs the INSERT ... SELECT path at a few
+chunk sizes.
+
+Reports wall time, rows/s, statements and the peak Python allocation
+(tracemalloc) for each run. The notifications table is emptied between runs.
+
+    python -m benchmarks.notification_fanout [--recipients 100000] \\
+        [--chunks 1000,5000,20000] [--skip-orm]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from app.extensions import db
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.notification_service import send_notification_to_group
+from benchmarks.common import bench_app
+
+TITLE = "Platform maintenance"
+MESSAGE = "The platform will be read-only on Sunday between 02:00 and 03:00 UTC."
+
+
+def seed(recipients):
+    db.session.execute(text("""
+        INSERT INTO users (id, email, password_hash, role, full_name)
+        SELECT 'usr-' || lpad(g::text, 7, '0'), 'bench' || g || '@example.com', 'x',
+               'writer', 'Writer ' || g
+        FROM generate_series(1, :n) g
+    """), {"n": recipients})
+    db.session.commit()
+    db.session.execute(text("ANALYZE users"))
+
+
+def orm_fan_out(group):
+    """The previous implementation, addressed by email."""
+    users = User.query.filter_by(role=group).all()
+    for u in users:
+        db.session.add(Notification(
+            user_email=u.email,
+            target_type="individual",
+            target_group=group,
+            title=TITLE,
+            message=MESSAGE,
+            created_at=datetime.utcnow(),
+        ))
+    db.session.commit()
+    return len(users)
+
+
+def measure(label, fn):
+    db.session.execute(text("TRUNCATE notifications"))
+    db.session.commit()
+    db.session.expunge_all()
+
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        sent = fn()
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    stored = db.session.query(Notification).count()
+    assert stored == sent, (stored, sent)
+    print(f"{label:<18} sent={sent:7d}  {elapsed:7.2f} s  {sent / elapsed:9.0f} rows/s  "
+          f"statements={statements:6d}  peak_alloc={peak / 2**20:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=100_000)
+    parser.add_argument("--chunks", default="1000,5000,20000")
+    parser.add_argument("--skip-orm", action="store_true")
+    args = parser.parse_args()
+
+    app = bench_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print("Seeding...")
+        seed(args.recipients)
+
+        print(f"{args.recipients} recipients")
+        if not args.skip_orm:
+            measure("orm", lambda: orm_fan_out("writer"))
+        for chunk in (int(c) for c in args.chunks.split(",")):
+            measure(f"bulk chunk={chunk}", lambda: send_notification_to_group(
+                "writer", TITLE, MESSAGE, chunk_size=chunk,
+            ))
+
+
+if __name__ == "__main__":
+    main()
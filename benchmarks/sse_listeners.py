@@ -0,0 +1,171 @@
+"""
+Load test for GET /chats/<id>/stream: how many concurrent listeners one node
+holds, and how quickly a posted message reaches all of them.
+
+Runs against a live server (not the test client). Opens --listeners SSE
+connections in steps of --step, then posts --messages chat messages and
+times each delivery from the POST until the event arrives on every stream.
+With --pid, the server's memory (the gunicorn master and its workers) is
+read from /proc after each step. Linux only.
+
+    gunicorn wsgi:app   # GUNICORN_WORKER_CLASS=gevent, see gunicorn.conf.py
+    python -m benchmarks.sse_listeners --url http://127.0.0.1:8000 \\
+        --chat chat-1234 --token <participant JWT> --sender-token <other participant JWT> \\
+        [--listeners 5000] [--step 500] [--messages 5] [--pid <gunicorn master pid>]
+"""
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from benchmarks.analyzer_startup import rss_mb
+
+
+class Listener:
+    def __init__(self):
+        self.received = {}  # message content -> arrival time
+        self.reader = self.writer = None
+
+
+async def connect(url, path, listener):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    writer.write(
+        # HTTP/1.0: the response is streamed as-is, without chunked framing
+        f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\n"
+        f"Accept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+    status = await reader.readline()
+    if b" 200 " not in status:
+        writer.close()
+        raise ConnectionError(status.decode().strip())
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    listener.reader, listener.writer = reader, writer
+
+
+async def consume(listener):
+    event = None
+    try:
+        while True:
+            line = await listener.reader.readline()
+            if not line:
+                return
+            line = line.strip()
+            if line.startswith(b"event:"):
+                event = line[6:].strip()
+            elif line.startswith(b"data:") and event == b"message":
+                content = json.loads(line[5:])["content"]
+                listener.received[content] = time.perf_counter()
+    except (ConnectionError, ValueError):
+        return
+
+
+def post_message(url, chat, token, content):
+    req = urllib.request.Request(
+        f"{url}/api/v1/chats/{chat}/messages",
+        data=json.dumps({"content": content}).encode(),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())["content"]  # as stored, i.e. sanitized
+
+
+def server_memory(pid):
+    """RSS of the master plus its direct children, in MB."""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except FileNotFoundError:
+        pass
+    return sum(rss_mb(p) for p in pids)
+
+
+async def run(args):
+    path = f"/api/v1/chats/{args.chat}/stream?jwt={args.token}"
+    listeners, consumers, failed = [], [], 0
+
+    while len(listeners) < args.listeners:
+        batch = [Listener() for _ in range(min(args.step, args.listeners - len(listeners)))]
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(connect(args.url, path, listener) for listener in batch), return_exceptions=True
+        )
+        batch_failed = sum(isinstance(r, Exception) for r in results)
+        failed += batch_failed
+        for listener, result in zip(batch, results):
+            if not isinstance(result, Exception):
+                listeners.append(listener)
+                consumers.append(asyncio.create_task(consume(listener)))
+
+        line = (f"listeners={len(listeners):6d}  failed={failed:5d}  "
+                f"step={time.perf_counter() - started:6.2f} s")
+        if args.pid:
+            line += f"  server_rss={server_memory(args.pid):8.1f} MB"
+        print(line, flush=True)
+        if batch_failed == len(batch):  # the server stopped accepting
+            break
+
+    latencies, missing = [], 0
+    loop = asyncio.get_running_loop()
+    for i in range(args.messages):
+        sent = time.perf_counter()
+        content = await loop.run_in_executor(
+            None, post_message, args.url, args.chat, args.sender_token, f"load test {i} {sent}"
+        )
+
+        deadline = sent + args.wait
+        while time.perf_counter() < deadline:
+            if all(content in listener.received for listener in listeners):
+                break
+            await asyncio.sleep(0.01)
+        for listener in listeners:
+            arrived = listener.received.get(content)
+            if arrived is None:
+                missing += 1
+            else:
+                latencies.append((arrived - sent) * 1000)
+
+    if latencies:
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"delivered={len(latencies)}  missing={missing}  "
+              f"p50={statistics.median(latencies):8.1f} ms  p99={p99:8.1f} ms  "
+              f"max={latencies[-1]:8.1f} ms")
+
+    for task in consumers:
+        task.cancel()
+    for listener in listeners:
+        listener.writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--chat", required=True)
+    parser.add_argument("--token", required=True, help="JWT of a chat participant (listens)")
+    parser.add_argument("--sender-token", required=True, help="JWT of the other participant (posts)")
+    parser.add_argument("--listeners", type=int, default=5000)
+    parser.add_argument("--step", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--wait", type=float, default=10.0, help="Seconds to wait for delivery.")
+    parser.add_argument("--pid", type=int, help="gunicorn master pid, to report server memory")
+    args = parser.parse_args()
+
+    # one file descriptor per listener
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
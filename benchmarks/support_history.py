@@ -0,0 +1,104 @@
+"""
+GET /support-chat/<id>/messages on a 5,000-message chat: the full history
+(no parameters) vs after= / before= windows.
+
+Each case builds the response body the route returns and reports its size
+and p50/p99 latency. "caught up" is the poll of a client that already has
+every message; "50 new" is one that is 50 behind.
+
+    python -m benchmarks.support_history [--messages 5000]
+"""
+import argparse
+import json
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models.support_message import SupportMessage
+from app.serializers.support_chat import serialize_support_message, support_message_list_load
+from app.utils.pagination import paginate_window
+from benchmarks.common import bench_app, timed
+
+CHAT_ID = "schat-bench"
+
+
+def seed(messages):
+    db.session.execute(text("""
+        INSERT INTO users (id, email, password_hash, role, full_name)
+        VALUES ('usr-writer', 'writer@example.com', 'x', 'writer', 'Bench Writer'),
+               ('usr-admin', 'admin@example.com', 'x', 'admin', 'Support')
+    """))
+    db.session.execute(text(
+        "INSERT INTO support_chats (id, user_id, created_at, warning_active) "
+        "VALUES (:id, 'usr-writer', now() - interval '30 days', false)"
+    ), {"id": CHAT_ID})
+    db.session.execute(text("""
+        INSERT INTO support_messages (id, support_chat_id, sender_id, content, attachments,
+                                      is_read, created_at)
+        SELECT 'smsg-' || lpad(g::text, 6, '0'), :chat,
+               CASE WHEN g % 2 = 0 THEN 'usr-admin' ELSE 'usr-writer' END,
+               'Message ' || g || ': my payout for last week has not arrived yet, '
+                   || 'could you check the M-Pesa number on my account?',
+               '[]', true, now() - (:n - g) * interval '1 minute'
+        FROM generate_series(1, :n) g
+    """), {"chat": CHAT_ID, "n": messages})
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+
+
+def body(items, pagination):
+    return json.dumps({
+        "success": True,
+        "messages": [serialize_support_message(m) for m in items],
+        "pagination": pagination,
+        "warning": None,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = bench_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print("Seeding...")
+        seed(args.messages)
+
+        def messages():
+            return (
+                SupportMessage.query
+                .filter_by(support_chat_id=CHAT_ID)
+                .options(*support_message_list_load())
+            )
+
+        keyset = (SupportMessage.created_at, SupportMessage.id)
+        ids = [row.id for row in messages().with_entities(SupportMessage.id)
+               .order_by(*keyset)]
+
+        cases = [
+            ("full history", lambda: body(messages().order_by(*keyset).all(), None)),
+            ("after= (50 new)",
+             lambda: body(*paginate_window(messages(), keyset, after=ids[-51]))),
+            ("after= (caught up)",
+             lambda: body(*paginate_window(messages(), keyset, after=ids[-1]))),
+            ("before= (scroll back)",
+             lambda: body(*paginate_window(messages(), keyset, before=ids[-50]))),
+        ]
+
+        print(f"{args.messages} messages in one support chat")
+        for label, build in cases:
+            def request():
+                db.session.expunge_all()
+                return build()
+
+            size = len(request().encode())
+            p50, p99 = timed(request)
+            print(f"{label:<22} payload={size / 1024:9.1f} KB  "
+                  f"p50={p50:8.2f} ms  p99={p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
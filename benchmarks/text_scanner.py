@@ -0,0 +1,107 @@
+"""
+normalize_text + regex_mask: the original one-re.sub-per-pattern version vs
+the precompiled combined scanner now in chat_service.
+
+The legacy functions below are the reference implementation;
+tests/test_text_scanner.py checks the new code against them. No database
+needed.
+
+    python -m benchmarks.text_scanner
+"""
+import random
+import re
+
+from app.services.chat_service import normalize_text, regex_mask
+from benchmarks.common import timed
+
+
+def legacy_normalize_text(t: str):
+    if not t:
+        return t
+
+    t = re.sub(r"(?<=\w)[\[\]\(\)\{\}](?=\w)", "", t)
+
+    replacements = {
+        r"\s+at\s+": "@",
+        r"\s+dot\s+": ".",
+        r"\(at\)": "@",
+        r"\(dot\)": ".",
+    }
+    for pat, repl in replacements.items():
+        t = re.sub(pat, repl, t, flags=re.IGNORECASE)
+
+    words_to_nums = {
+        "zero": "0", "one": "1", "two": "2", "three": "3",
+        "four": "4", "five": "5", "six": "6",
+        "seven": "7", "eight": "8", "nine": "9"
+    }
+    for word, digit in words_to_nums.items():
+        t = re.sub(rf"\b{word}\b", digit, t, flags=re.IGNORECASE)
+
+    t = re.sub(r"(?<=\d)[ ,.-]+(?=\d)", "", t)
+
+    return t
+
+
+LEGACY_PII_REGEX_PATTERNS = [
+    r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    r"\+?\d{9,15}",
+    r"[A-Za-z0-9._%+-]+@[A-Za-z]+",
+    r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+",
+    r"\b\d{3}[-\s.]?\d{3}[-\s.]?\d{3,4}\b",
+]
+
+
+def legacy_regex_mask(t: str):
+    for pat in LEGACY_PII_REGEX_PATTERNS:
+        t = re.sub(pat, "[REDACTED]", t, flags=re.IGNORECASE)
+    return t
+
+
+# Shaped like real order chat: mostly plain sentences, some with numbers,
+# a few obfuscated contact attempts
+CORPUS = [
+    "Please see attached",
+    "When will it be done?",
+    "Hello, I have uploaded the revised draft with the changes you asked for.",
+    "Kindly use at least 8 scholarly sources published after 2018.",
+    "The paper should be 1500 words, APA 7, double spaced.",
+    "Can you add a counter-argument paragraph before the conclusion?",
+    "Thanks! Approving now. Great work on the discussion section.",
+    "I need it by 5pm tomorrow if possible",
+    "Section 2.3 needs more detail on the methodology",
+    "call me on zero seven one two three four five six seven eight",
+    "my email is jane dot doe at gmail dot com",
+    "reach me: jane(at)gmail(dot)com or 0712-345-678",
+    "Let me know if you have any questions about the rubric.",
+    "Page 4 has a formatting issue with the table of contents.",
+    "Sure, give me two hours and I will send the update.",
+]
+
+
+def make_messages(n, seed=7):
+    rnd = random.Random(seed)
+    return [rnd.choice(CORPUS) for _ in range(n)]
+
+
+def main():
+    messages = make_messages(5_000)
+
+    assert [legacy_normalize_text(m) for m in messages] == [normalize_text(m) for m in messages]
+
+    cases = [
+        ("legacy", lambda: [legacy_regex_mask(legacy_normalize_text(m)) for m in messages]),
+        ("compiled", lambda: [regex_mask(normalize_text(m)) for m in messages]),
+    ]
+    results = {}
+    for label, fn in cases:
+        results[label] = fn()
+        p50, p99 = timed(fn, repeat=10)
+        print(f"{label:<9} messages={len(messages)}  p50={p50:8.2f} ms  p99={p99:8.2f} ms  "
+              f"per message={p50 * 1000 / len(messages):6.2f} us")
+
+    assert results["legacy"] == results["compiled"], "scanners disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+gunicorn settings (picked up automatically from the working directory):
+
+    gunicorn wsgi:app
+
+The app, including the Presidio/spaCy model, is loaded once in the master
+before forking. Workers then share those pages copy-on-write instead of each
+loading its own copy of the model.
+"""
+import gc
+import os
+
+# create_app() warms the shared analyzer when this is set
+os.environ.setdefault("PII_ANALYZER_PRELOAD", "1")
+# Presidio runs on a per-worker process pool instead of in the request
+os.environ.setdefault("MODERATION_WORKERS", "2")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 4))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+preload_app = True
+
+# Chat streams (GET /chats/<id>/stream) stay open while the client is
+# connected. A gevent worker holds each one as a greenlet, up to
+# worker_connections per worker; sync/gthread workers would spend a whole
+# thread on every idle stream.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's view, so later
+    # collections in the workers don't write to (and un-share) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Fork the moderation pool now, while the worker is single-threaded;
+    # its processes inherit the preloaded analyzer
+    pool_size = int(os.environ["MODERATION_WORKERS"])
+    if pool_size:
+        from app.services import moderation
+        moderation.start_pool(pool_size)
+
+
+def post_worker_init(worker):
+    # gevent has patched sockets and threads by now, but psycopg2 talks to
+    # the server through libpq; make its waits yield to other greenlets
+    if worker_class == "gevent":
+        import gevent
+        from psycopg2 import extensions
+        from app.services import moderation
+
+        extensions.set_wait_callback(_gevent_wait)
+        # The pool (started in post_fork) completes futures on a native
+        # thread; write results back from a greenlet on this worker's hub
+        moderation.apply_results_on_hub(gevent.get_hub())
+
+
+def _gevent_wait(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
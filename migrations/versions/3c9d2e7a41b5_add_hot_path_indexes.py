@@ -0,0 +1,81 @@
+"""Add indexes for the order, bid and notification list queries
+
+Revision ID: 3c9d2e7a41b5
+Revises: fa23b53873b1
+Create Date: 2026-10-18 10:12:41.204113
+
+Indexes are built CONCURRENTLY (outside the migration transaction) so the
+tables stay writable while they build. ix_bids_order_id / ix_bids_user_id are
+dropped because the new composite indexes lead with the same columns.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d2e7a41b5'
+down_revision = 'fa23b53873b1'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # client order list: WHERE client_id [AND status IN ...] ORDER BY created_at
+    ('idx_orders_client_status_created', 'orders', ['client_id', 'status', 'created_at'], None),
+    # writer "assigned to me" list; unassigned orders are left out
+    ('idx_orders_writer_status', 'orders', ['writer_id', 'status'], 'writer_id IS NOT NULL'),
+    # deadline >= now expiry filters
+    ('idx_orders_deadline', 'orders', ['deadline'], None),
+    # bids on an order by status
+    ('idx_bids_order_status', 'bids', ['order_id', 'status'], None),
+    # writer's bid list, keyset on (submitted_at, id)
+    ('idx_bids_user_submitted', 'bids', ['user_id', 'submitted_at', 'id'], None),
+    # notification feed ordered by (created_at, id)
+    ('idx_notifications_created', 'notifications', ['created_at', 'id'], None),
+    # direct notifications for one recipient
+    ('idx_notifications_recipient', 'notifications', ['user_email', 'created_at'],
+     "target_type = 'individual'"),
+]
+
+REDUNDANT = [
+    ('ix_bids_order_id', 'bids', ['order_id']),
+    ('ix_bids_user_id', 'bids', ['user_id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+        for name, table, _ in REDUNDANT:
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
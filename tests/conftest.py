@@ -0,0 +1,211 @@
+"""
+Shared fixtures.
+
+The suite runs against a scratch PostgreSQL database (the models use ARRAY
+and partial indexes, so SQLite is not an option):
+
+    TEST_DATABASE_URL=postgresql://localhost/writing_test python -m pytest
+
+Tests that need the database are skipped when TEST_DATABASE_URL is unset.
+Every table is dropped and recreated at the start of the session.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, text
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_DATABASE_URL or not TEST_DATABASE_URL.startswith("postgresql"):
+        pytest.skip("TEST_DATABASE_URL must point at a scratch PostgreSQL database")
+
+    from app.main import create_app
+    from app.extensions import db
+
+    app = create_app("testing")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope="session")
+def seeded(app):
+    """
+    Users by role (plus the seeded "chat"), with enough orders, bids,
+    notifications, messages and withdrawals for real plans and query counts.
+    """
+    from app.extensions import db
+    from app.models.user import User
+    from app.models.order import Order
+    from app.models.bid import Bid
+    from app.models.notification import Notification
+    from app.models.chat import Chat
+    from app.models.message import Message
+    from app.models.withdrawal_request import WithdrawalRequest
+    from app.models.support_chat import SupportChat
+    from app.models.support_message import SupportMessage
+    from app.services.chat_service import rebuild_chat_summaries
+    from app.services.support_chat_service import rebuild_support_chat_summaries
+
+    joined = datetime.utcnow() - timedelta(days=30)
+    users = {
+        "client": User(id="usr-client", email="client@example.com", password_hash="x",
+                       role="client", joined_at=joined),
+        "other_client": User(id="usr-client2", email="client2@example.com", password_hash="x",
+                             role="client", joined_at=joined),
+        "writer": User(id="usr-writer", email="writer@example.com", password_hash="x",
+                       role="writer", joined_at=joined),
+        "other_writer": User(id="usr-writer2", email="writer2@example.com", password_hash="x",
+                             role="writer", joined_at=joined),
+        "admin": User(id="usr-admin", email="admin@example.com", password_hash="x",
+                      role="admin", joined_at=joined),
+    }
+    db.session.add_all(users.values())
+
+    # Many distinct owners so per-row lazy loads show up as extra queries
+    clients = [
+        User(id=f"usr-c{i}", email=f"c{i}@example.com", password_hash="x",
+             role="client", joined_at=joined)
+        for i in range(30)
+    ]
+    writers = [
+        User(id=f"usr-w{i}", email=f"w{i}@example.com", password_hash="x",
+             role="writer", joined_at=joined)
+        for i in range(30)
+    ]
+    db.session.add_all(clients + writers)
+
+    now = datetime.now(timezone.utc)
+    statuses = ["in_progress", "submitted_for_review", "completed", "cancelled"]
+    for i in range(400):
+        assigned = i % 3 == 0
+        db.session.add(Order(
+            id=f"ORD-{i:05d}",
+            title=f"Order {i}",
+            subject="history",
+            client_budget=100,
+            writer_budget=30,
+            minimum_allowed_budget=10,
+            status=statuses[i % len(statuses)],
+            client_id=users["client"].id if i % 2 else clients[i % len(clients)].id,
+            writer_id=users["writer" if i % 4 == 0 else "other_writer"].id if assigned else None,
+            marketplace_open=not assigned,
+            deadline=now + timedelta(hours=(i % 200) - 50),
+            created_at=now - timedelta(minutes=i),
+        ))
+    db.session.flush()
+
+    for i in range(1200):
+        db.session.add(Bid(
+            id=f"BID-{i:05d}",
+            order_id=f"ORD-{i % 400:05d}",
+            user_id=users["writer"].id if i % 2 else writers[i % len(writers)].id,
+            writer_amount=30,
+            client_amount=100,
+            status="accepted" if i % 50 == 0 else "open",
+            submitted_at=datetime.utcnow() - timedelta(minutes=i),
+        ))
+
+    for i in range(300):
+        individual = i % 3 == 0
+        db.session.add(Notification(
+            title=f"Notice {i}",
+            message="Seeded notification",
+            target_type="individual" if individual else ("group" if i % 3 == 1 else "all"),
+            target_group=None if individual else "writer",
+            user_email=users["writer"].email if individual else None,
+            created_at=datetime.utcnow() - timedelta(minutes=i),
+        ))
+
+    chat = Chat(id="chat-seeded", order_id="ORD-00001",
+                client_id=users["client"].id, writer_id=users["writer"].id)
+    db.session.add(chat)
+    db.session.flush()
+    for i in range(60):
+        db.session.add(Message(
+            chat_id=chat.id,
+            sender_id=(users["client"] if i % 2 else users["writer"]).id,
+            content=f"Message {i}",
+            created_at=datetime.utcnow() - timedelta(minutes=60 - i),
+        ))
+
+    for i in range(60):
+        db.session.add(WithdrawalRequest(
+            id=f"WD-{i:05d}",
+            user_id=writers[i % len(writers)].id,
+            amount=10,
+            status="pending",
+            method="mpesa",
+            destination="0700000000",
+        ))
+
+    # Support chats with their users' questions, every third one answered
+    for i, writer in enumerate(writers):
+        support = SupportChat(id=f"schat-{i:03d}", user_id=writer.id,
+                              status="resolved" if i % 5 == 0 else "open")
+        db.session.add(support)
+        db.session.flush()
+        for j in range(3):
+            answered = i % 3 == 0
+            db.session.add(SupportMessage(
+                support_chat_id=support.id,
+                sender_id=users["admin"].id if answered and j == 2 else writer.id,
+                content=f"Support question {j}",
+                is_read=answered,
+                created_at=datetime.utcnow() - timedelta(minutes=100 - i * 3 - j),
+            ))
+
+    db.session.commit()
+    rebuild_chat_summaries()
+    rebuild_support_chat_summaries()
+    users["chat"] = chat
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return users
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    def make(user):
+        return {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+    return make
+
+
+@pytest.fixture
+def query_budget():
+    """query_budget(response, n): fail if the request ran more than n statements."""
+    from app.utils.query_counter import QUERY_COUNT_HEADER
+
+    def check(response, budget):
+        used = int(response.headers[QUERY_COUNT_HEADER])
+        assert used <= budget, f"{used} queries, budget is {budget}"
+    return check
+
+
+@pytest.fixture
+def sql_log(app):
+    """(statement, parameters) for every statement executed during the test."""
+    from app.extensions import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
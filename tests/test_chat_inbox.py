@@ -0,0 +1,127 @@
+"""
+Chat.last_message_* and the chat_reads watermarks follow posts, reads and
+deletes, and the summary agrees with a rebuild from the messages table.
+Listing the inbox never writes, even when a warning has expired.
+"""
+from app.extensions import db
+
+
+def _inbox_entry(client, headers, chat_id):
+    resp = client.get("/api/v1/chats?limit=50", headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+    return next(c for c in resp.get_json()["chats"] if c["id"] == chat_id)
+
+
+def test_counters_follow_post_read_delete(seeded, client, auth_headers):
+    from app.models.chat import Chat
+    from app.services.chat_service import rebuild_chat_summaries
+
+    as_client = auth_headers(seeded["client"])
+    as_writer = auth_headers(seeded["other_writer"])
+
+    resp = client.post("/api/v1/chats", headers=as_client,
+                       json={"order_id": "ORD-00003", "writer_id": seeded["other_writer"].id})
+    chat_id = resp.get_json()["chat"]["id"]
+
+    for i in range(3):
+        client.post(f"/api/v1/chats/{chat_id}/messages", headers=as_writer,
+                    json={"content": f"Draft {i} is ready"})
+    last = client.post(f"/api/v1/chats/{chat_id}/messages", headers=as_client,
+                       json={"content": "Thanks, reviewing now"}).get_json()
+
+    entry = _inbox_entry(client, as_client, chat_id)
+    assert entry["unread_count"] == 3
+    assert entry["last_message"]["content"] == "Thanks, reviewing now"
+    assert _inbox_entry(client, as_writer, chat_id)["unread_count"] == 1
+
+    # newest activity sorts first
+    first = client.get("/api/v1/chats", headers=as_client).get_json()["chats"][0]
+    assert first["id"] == chat_id
+
+    client.delete(f"/api/v1/chats/{chat_id}/messages/{last['id']}", headers=as_client)
+    entry = _inbox_entry(client, as_writer, chat_id)
+    assert entry["unread_count"] == 0
+    assert entry["last_message"]["content"] == "Draft 2 is ready"
+
+    client.post(f"/api/v1/chats/{chat_id}/mark-read", headers=as_client)
+    assert _inbox_entry(client, as_client, chat_id)["unread_count"] == 0
+
+    chat = db.session.get(Chat, chat_id)
+    before = (chat.last_message_id, chat.last_message_at)
+    rebuild_chat_summaries()
+    db.session.refresh(chat)
+    assert (chat.last_message_id, chat.last_message_at) == before
+
+
+def test_mark_read_is_one_upsert(seeded, client, auth_headers, sql_log):
+    headers = auth_headers(seeded["client"])
+    chat_id = seeded["chat"].id
+
+    resp = client.post(f"/api/v1/chats/{chat_id}/mark-read", headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+
+    writes = [s for s, _ in sql_log if not s.lstrip().upper().startswith("SELECT")]
+    writes = [s for s in writes if s.strip().upper() not in ("BEGIN", "COMMIT")]
+    assert len(writes) == 1
+    assert "chat_reads" in writes[0] and "ON CONFLICT" in writes[0]
+
+    resp = client.get(f"/api/v1/chats/{chat_id}/messages", headers=headers)
+    received = [m for m in resp.get_json()["messages"] if m["sender"]["id"] != seeded["client"].id]
+    assert all(m["is_read"] for m in received)
+
+
+def test_mark_read_stops_at_rendered_messages(seeded, client, auth_headers):
+    from datetime import timedelta
+
+    from app.models.message import Message
+
+    as_client = auth_headers(seeded["client"])
+    as_writer = auth_headers(seeded["other_writer"])
+
+    resp = client.post("/api/v1/chats", headers=as_client,
+                       json={"order_id": "ORD-00004", "writer_id": seeded["other_writer"].id})
+    chat_id = resp.get_json()["chat"]["id"]
+    sent = [client.post(f"/api/v1/chats/{chat_id}/messages", headers=as_writer,
+                        json={"content": f"Section {i} uploaded"}).get_json()["message"]
+            for i in range(3)]
+
+    # only the first one was on screen
+    resp = client.post(f"/api/v1/chats/{chat_id}/mark-read", headers=as_client,
+                       json={"message_id": sent[0]["id"]})
+    assert _inbox_entry(client, as_client, chat_id)["unread_count"] == 2
+
+    resp = client.post(f"/api/v1/chats/{chat_id}/mark-read", headers=as_client)
+    newest = db.session.get(Message, sent[-1]["id"]).created_at
+    assert resp.get_json()["last_read_at"] == newest.isoformat() + "Z"
+
+    # committed late with an earlier timestamp: still unread
+    db.session.add(Message(chat_id=chat_id, sender_id=seeded["other_writer"].id,
+                           content="Late section", created_at=newest + timedelta(microseconds=1)))
+    db.session.commit()
+    assert _inbox_entry(client, as_client, chat_id)["unread_count"] == 1
+
+
+def test_expired_warning_hidden_without_writes(seeded, client, auth_headers, sql_log):
+    from datetime import datetime, timedelta
+
+    from app.models.chat import Chat
+    from app.services.chat_behavior_analyzer import clear_expired_warnings
+
+    chat = seeded["chat"]
+    chat.warning_active = True
+    chat.warning_risk = "high"
+    chat.warning_message = "Keep contact details off the platform"
+    chat.warning_for_user_id = seeded["client"].id
+    chat.warning_expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+    sql_log.clear()
+
+    entry = _inbox_entry(client, auth_headers(seeded["client"]), chat.id)
+    assert entry["warning"] is None
+    writes = [s for s, _ in sql_log if s.lstrip().upper().startswith(("UPDATE", "INSERT"))]
+    assert writes == []
+
+    assert clear_expired_warnings()["chats"] == 1
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(Chat, chat.id).warning_active is False
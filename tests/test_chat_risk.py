@@ -0,0 +1,45 @@
+"""Window risk comes from the analysis stored on each message, not a re-scan."""
+from types import SimpleNamespace
+
+from app.services.chat_behavior_analyzer import analyze_chat_behavior
+from app.services.chat_service import moderate
+
+
+def _msg(content):
+    return moderate(SimpleNamespace(), content)
+
+
+def test_moderate_records_redactions():
+    msg = _msg("call me on 0712 345 678 or jane dot doe at gmail dot com")
+
+    assert msg.content.count("[REDACTED]") == 2
+    assert msg.pii_hits == 2
+    assert {"EMAIL_ADDRESS", "PHONE_NUMBER"} <= set(msg.pii_entities)
+
+
+def test_clean_window_is_low_risk():
+    history = [_msg("Hi, the draft is ready"), _msg("Thanks, reviewing now")]
+    assert analyze_chat_behavior(history)["risk"] == "low"
+
+
+def test_stored_hits_are_summed():
+    history = [_msg("my number is 0712345678"), _msg("ok")]
+    analysis = analyze_chat_behavior(history)
+
+    assert analysis["redacted_count"] == 1
+    assert analysis["risk"] == "medium"
+    assert "PHONE_NUMBER" in analysis["entities"]
+
+
+def test_number_split_across_messages_is_caught():
+    history = [_msg("my digits: 0712"), _msg("345"), _msg("678")]
+    assert all(m.pii_hits == 0 for m in history)
+
+    analysis = analyze_chat_behavior(history)
+    assert analysis["regex_hits"]
+    assert analysis["risk"] in ("medium", "high")
+
+
+def test_rows_without_stored_analysis_fall_back_to_content():
+    legacy = SimpleNamespace(content="reach me at [REDACTED]", pii_hits=None, pii_entities=None)
+    assert analyze_chat_behavior([legacy])["redacted_count"] == 1
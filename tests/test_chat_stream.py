@@ -0,0 +1,182 @@
+"""
+GET /chats/<id>/stream delivers committed chat events to participants,
+through Postgres LISTEN/NOTIFY like in production.
+"""
+from app.extensions import db
+
+
+def _events(resp, max_keepalives=2):
+    """
+    Yield (event, data) from an SSE response body, skipping keep-alives;
+    fails after max_keepalives in a row instead of waiting forever.
+    """
+    import json
+
+    idle = 0
+    for chunk in resp.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(": keep-alive"):
+            idle += 1
+            assert idle <= max_keepalives, "no event before the keep-alive limit"
+            continue
+        idle = 0
+        lines = dict(
+            line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(":")
+        )
+        if "event" in lines:
+            yield lines["event"], json.loads(lines["data"])
+
+
+def test_stream_pushes_new_and_deleted_messages(seeded, client, auth_headers, monkeypatch):
+    from app.services import chat_events
+
+    monkeypatch.setattr(chat_events, "HEARTBEAT_SECONDS", 1)
+    chat_id = seeded["chat"].id
+    listener = auth_headers(seeded["client"])
+    sender = auth_headers(seeded["writer"])
+
+    resp = client.get(f"/api/v1/chats/{chat_id}/stream", headers=listener, buffered=False)
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    events = _events(resp)
+
+    posted = client.post(f"/api/v1/chats/{chat_id}/messages", headers=sender,
+                         json={"content": "Outline attached"}).get_json()
+    kind, data = next(events)
+    assert (kind, data["id"], data["content"]) == ("message", posted["id"], "Outline attached")
+
+    client.delete(f"/api/v1/chats/{chat_id}/messages/{posted['id']}", headers=sender)
+    assert next(events) == ("message_deleted", {"id": posted["id"]})
+    resp.close()
+
+
+def test_rolled_back_events_are_not_sent(seeded, app, monkeypatch):
+    from app.services import chat_events
+
+    monkeypatch.setitem(app.config, "CHAT_EVENTS_BACKEND", "local")
+    sub = chat_events.subscribe("chat-seeded")
+    try:
+        chat_events.publish("chat-seeded", "read", {"user_id": "x"})
+        db.session.rollback()
+        chat_events.publish("chat-seeded", "read", {"user_id": "y"})
+        db.session.commit()
+
+        assert sub.queue.get_nowait()["data"] == {"user_id": "y"}
+        assert sub.queue.empty()
+    finally:
+        chat_events.unsubscribe(sub)
+
+
+def test_warning_reaches_only_its_user(seeded, app, monkeypatch):
+    from app.services import chat_events
+
+    monkeypatch.setitem(app.config, "CHAT_EVENTS_BACKEND", "local")
+    client_id, writer_id = seeded["client"].id, seeded["writer"].id
+    for_writer = {"for_user_id": writer_id, "active": True, "risk": "high"}
+
+    subs = {uid: chat_events.subscribe("chat-seeded") for uid in (client_id, writer_id)}
+    chat_events.publish("chat-seeded", "warning", for_writer)
+    chat_events.publish("chat-seeded", "read", {"user_id": client_id})
+    db.session.commit()
+
+    seen = {}
+    for uid, sub in subs.items():
+        body = chat_events.stream(sub, uid, heartbeat=0.01)
+        next(body)  # retry hint
+        seen[uid] = next(body)
+        body.close()
+
+    assert seen[writer_id].startswith("event: warning\n")
+    assert "for_user_id" not in seen[writer_id]
+    assert seen[client_id].startswith("event: read\n")
+
+
+def test_reconnect_replays_missed_messages(seeded, client, auth_headers, monkeypatch):
+    from app.services import chat_events
+
+    monkeypatch.setattr(chat_events, "HEARTBEAT_SECONDS", 1)
+    chat_id = seeded["chat"].id
+    sender = auth_headers(seeded["writer"])
+    posted = [
+        client.post(f"/api/v1/chats/{chat_id}/messages", headers=sender,
+                    json={"content": f"Revision {i}"}).get_json()
+        for i in range(3)
+    ]
+
+    last_seen = chat_events.event_id(posted[0])
+    resp = client.get(f"/api/v1/chats/{chat_id}/stream", buffered=False,
+                      headers={**auth_headers(seeded["client"]), "Last-Event-ID": last_seen})
+    events = _events(resp)
+    assert [next(events)[1]["id"] for _ in range(2)] == [posted[1]["id"], posted[2]["id"]]
+    resp.close()
+
+
+def test_dropped_stream_is_told_to_resync(seeded, app, monkeypatch):
+    import json
+
+    from app.services import chat_events
+
+    monkeypatch.setitem(app.config, "CHAT_EVENTS_BACKEND", "local")
+    sub = chat_events.subscribe("chat-seeded")
+    for i in range(chat_events.QUEUE_SIZE + 1):
+        chat_events._dispatch(json.dumps({"chat_id": "chat-seeded", "event": "read", "data": {}}))
+
+    body = chat_events.stream(sub, seeded["client"].id, heartbeat=0.01)
+    assert next(body).startswith("retry:")
+    assert next(body).startswith("event: resync\n")
+    assert list(body) == []
+
+
+def test_postgres_listener_dispatches_notifies(monkeypatch):
+    """The LISTEN loop itself, over a stand-in DBAPI connection (no server needed)."""
+    import contextlib
+    import json
+    import socket
+    from types import SimpleNamespace
+
+    from app.services import chat_events
+
+    ours, theirs = socket.socketpair()
+
+    class Conn:
+        autocommit = False
+        notifies = []
+        polls = 0
+
+        def fileno(self):
+            return ours.fileno()
+
+        def cursor(self):
+            return contextlib.nullcontext(SimpleNamespace(execute=lambda sql: None))
+
+        def poll(self):
+            self.polls += 1
+            if self.polls > 1:
+                raise ConnectionError("stop")
+            ours.recv(1)
+            self.notifies.append(SimpleNamespace(payload=json.dumps(
+                {"chat_id": "chat-x", "event": "read", "data": {"user_id": "u"}}
+            )))
+
+        def close(self):
+            ours.close()
+
+    raw = SimpleNamespace(detach=lambda: None, dbapi_connection=Conn())
+    monkeypatch.setattr(chat_events, "db", SimpleNamespace(
+        engine=SimpleNamespace(raw_connection=lambda: raw)
+    ))
+    fake_app = SimpleNamespace(app_context=contextlib.nullcontext)
+    received = []
+    monkeypatch.setattr(chat_events, "_dispatch", received.append)
+    monkeypatch.setattr(chat_events, "_listened", False)
+
+    theirs.send(b"xx")  # one wake-up with a notify, one that ends the loop
+    try:
+        chat_events._listen_postgres(fake_app)
+    except ConnectionError:
+        pass
+    finally:
+        theirs.close()
+
+    assert [json.loads(p)["event"] for p in received] == ["read"]
+    assert chat_events._listening.is_set()
@@ -0,0 +1,45 @@
+"""
+Polled endpoints answer a repeated GET with 304 while nothing has changed,
+and with a fresh 200 once something has.
+"""
+import pytest
+
+from app.extensions import db
+
+
+def _poll(client, path, headers):
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200, first.get_json()
+    assert first.headers["ETag"].startswith('W/"')
+
+    again = client.get(path, headers={**headers, "If-None-Match": first.headers["ETag"]})
+    return first, again
+
+
+@pytest.mark.parametrize("role,path", [
+    ("client", "/api/v1/orders/ORD-00001"),
+    ("writer", "/api/v1/notifications"),
+    ("writer", "/api/v1/profile"),
+    ("client", "/api/v1/chats/chat-seeded/messages"),
+])
+def test_unchanged_resource_is_not_modified(seeded, client, auth_headers, role, path):
+    first, again = _poll(client, path, auth_headers(seeded[role]))
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+def test_new_message_changes_etag(seeded, client, auth_headers):
+    from app.models.message import Message
+
+    headers = auth_headers(seeded["client"])
+    path = "/api/v1/chats/chat-seeded/messages"
+    first, _ = _poll(client, path, headers)
+
+    db.session.add(Message(chat_id="chat-seeded", sender_id=seeded["writer"].id,
+                           content="Another one"))
+    db.session.commit()
+
+    resp = client.get(path, headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != first.headers["ETag"]
@@ -0,0 +1,44 @@
+"""
+API responses encode datetimes, Decimals and UUIDs the same way with or
+without orjson, and Decimals the way Flask's default provider did.
+"""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.json_provider import ORJSONProvider, StdlibJSONProvider, orjson
+
+VALUES = {
+    "totalSpent": Decimal("1234.50"),
+    "created_at": datetime(2024, 3, 1, 12, 30),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+}
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def test_decimal_matches_flask_default(app):
+    provider = StdlibJSONProvider(app)
+
+    assert provider.loads(provider.dumps(VALUES)) == {
+        "totalSpent": "1234.50",
+        "created_at": "2024-03-01T12:30:00Z",
+        "id": "12345678-1234-5678-1234-567812345678",
+    }
+    flask_default = DefaultJSONProvider(app).dumps({"totalSpent": Decimal("1234.50")})
+    assert provider.loads(flask_default) == {"totalSpent": "1234.50"}
+
+
+def test_orjson_matches_stdlib(app):
+    if orjson is None:
+        pytest.skip("orjson not installed")
+
+    stdlib, fast = StdlibJSONProvider(app), ORJSONProvider(app)
+    assert fast.loads(fast.dumps(VALUES)) == stdlib.loads(stdlib.dumps(VALUES))
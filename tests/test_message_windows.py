@@ -0,0 +1,66 @@
+"""
+after= / before= windows on the chat and support chat message lists.
+"""
+from datetime import datetime, timedelta
+
+from app.extensions import db
+
+
+def _messages(client, headers, url):
+    resp = client.get(url, headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+    body = resp.get_json()
+    return [m["content"] for m in body["messages"]], body["pagination"]
+
+
+def test_chat_after_and_before(seeded, client, auth_headers):
+    from app.models.message import Message
+
+    headers = auth_headers(seeded["client"])
+    chat_id = seeded["chat"].id
+    url = f"/api/v1/chats/{chat_id}/messages"
+    ids = [m.id for m in Message.query.filter_by(chat_id=chat_id)
+           .order_by(Message.created_at, Message.id)]
+
+    # caught up to message 55: only the four newer ones come back
+    contents, page = _messages(client, headers, f"{url}?after={ids[55]}")
+    assert contents == [f"Message {i}" for i in range(56, 60)]
+    assert page["has_more"] is False
+    assert page["newest_id"] == ids[59]
+
+    # scrolling back: the newest 5 before message 20, oldest first
+    contents, page = _messages(client, headers, f"{url}?before={ids[20]}&limit=5")
+    assert contents == [f"Message {i}" for i in range(15, 20)]
+    assert page["has_more"] is True
+    assert page["oldest_id"] == ids[15]
+
+    contents, _ = _messages(client, headers, f"{url}?after={ids[10]}&before={ids[14]}")
+    assert contents == [f"Message {i}" for i in range(11, 14)]
+
+    assert client.get(f"{url}?after=msg-missing", headers=headers).status_code == 400
+
+
+def test_support_chat_after_timestamp(seeded, client, auth_headers):
+    from app.models.support_message import SupportMessage
+    from app.services.support_chat_service import get_or_create_support_chat
+
+    user = seeded["writer"]
+    headers = auth_headers(user)
+    chat = get_or_create_support_chat(user.id)
+    start = datetime.utcnow() - timedelta(hours=1)
+    for i in range(10):
+        db.session.add(SupportMessage(support_chat_id=chat.id, sender_id=user.id,
+                                      content=f"Support {i}",
+                                      created_at=start + timedelta(minutes=i)))
+    db.session.commit()
+    url = f"/api/v1/support-chat/{chat.id}/messages"
+
+    # no position: the whole history, as before
+    contents, page = _messages(client, headers, url)
+    assert contents == [f"Support {i}" for i in range(10)]
+    assert page is None
+
+    since = (start + timedelta(minutes=6, seconds=30)).isoformat() + "Z"
+    contents, page = _messages(client, headers, f"{url}?after={since}")
+    assert contents == [f"Support {i}" for i in range(7, 10)]
+    assert page["has_more"] is False
@@ -0,0 +1,83 @@
+"""The Presidio pass can run outside the request and be applied afterwards."""
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import moderation
+from app.services.chat_service import apply_ner, moderate, ner_spans, scan_message
+
+
+def test_inline_stage_redacts_regex_matches_without_ner():
+    msg = moderate(SimpleNamespace(), "text me on 0712 345 678", ner=False)
+
+    assert msg.content == "text me on [REDACTED]"
+    assert msg.pii_entities == ["PHONE_NUMBER"]
+
+
+def test_ner_spans_are_applied_to_stored_content():
+    msg = moderate(SimpleNamespace(), "ask Jane Wanjiku, 0712345678", ner=False)
+    start = msg.content.index("Jane")
+
+    apply_ner(msg, [(start, start + len("Jane Wanjiku"), "PERSON")])
+
+    assert msg.content == "ask [REDACTED], [REDACTED]"
+    assert msg.pii_hits == 2
+    assert msg.pii_entities == ["PERSON", "PHONE_NUMBER"]
+
+
+def test_pool_matches_inline_ner():
+    text = scan_message("call me at jane dot doe at gmail dot com or John", ner=False)[0]
+    try:
+        pooled = moderation.start_pool(1).submit(ner_spans, text).result(timeout=120)
+    finally:
+        moderation.shutdown()
+
+    assert pooled == ner_spans(text)
+
+
+def test_runs_inline_outside_an_app():
+    assert moderation.runs_inline()
+    assert moderation.enqueue(SimpleNamespace(id="msg-1", content="x")) is None
+
+
+GEVENT_WORKER = '''
+from _thread import get_ident
+
+from app.services import moderation
+
+main_thread = get_ident()
+
+# post_fork: the pool starts before gevent patches the worker
+pool = moderation.start_pool(1)
+
+from gevent import monkey
+monkey.patch_all()
+import gevent
+
+# post_worker_init
+moderation.apply_results_on_hub(gevent.get_hub())
+
+ran = []
+moderation._finish = lambda app, job, f: ran.append(
+    (f.result(), get_ident(), gevent.getcurrent() is gevent.get_hub()))
+
+future = pool.submit(sum, [1, 2, 3])
+future.add_done_callback(lambda f: moderation._hand_off(None, None, None, f))
+with gevent.Timeout(60):
+    while not ran:
+        gevent.sleep(0.01)
+moderation.shutdown()
+
+assert ran == [(6, main_thread, False)], ran
+'''
+
+
+def test_results_are_applied_on_the_gevent_hub():
+    pytest.importorskip("gevent")
+
+    proc = subprocess.run([sys.executable, "-c", GEVENT_WORKER], capture_output=True,
+                          text=True, timeout=120)
+
+    assert proc.returncode == 0, proc.stderr
@@ -0,0 +1,61 @@
+"""Repeated text goes through Presidio once; the cache stays bounded."""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import chat_service, ner_cache
+from app.services.ner_cache import NERCache
+
+
+@pytest.fixture
+def fresh_cache():
+    ner_cache.reset()
+    yield
+    ner_cache.reset()
+
+
+def test_repeated_text_is_analyzed_once(fresh_cache, monkeypatch):
+    calls = []
+
+    def fake_analyze(text):
+        calls.append(text)
+        start = text.index("Jane")
+        return [SimpleNamespace(start=start, end=start + 4, entity_type="PERSON")]
+
+    monkeypatch.setattr(chat_service, "analyze", fake_analyze)
+    boilerplate = "Hello, I am interested in your order, ask Jane about my samples"
+
+    first = chat_service.scan_message(boilerplate)
+    for _ in range(9):
+        assert chat_service.scan_message(boilerplate) == first
+
+    assert len(calls) == 1
+    stats = ner_cache.get_cache().stats()
+    assert stats["hits"] == 9
+    assert stats["hit_rate"] == pytest.approx(0.9)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = NERCache(maxsize=2)
+    cache.put("a", [])
+    cache.put("b", [(0, 1, "PERSON")])
+    assert cache.get("a") == []
+    cache.put("c", [])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = NERCache(ttl=-1)
+    cache.put("a", [])
+    assert cache.get("a") is None
+
+
+def test_model_version_is_part_of_the_key(monkeypatch):
+    cache = NERCache()
+    cache.put("a", [(0, 1, "PERSON")])
+
+    monkeypatch.setattr(ner_cache, "model_version", lambda: "presidio_analyzer-99")
+    assert cache.get("a") is None
@@ -0,0 +1,34 @@
+"""Group notifications are fanned out with INSERT ... SELECT, in chunks."""
+from app.extensions import db
+
+
+def test_group_fan_out_in_chunks(seeded, client, auth_headers, sql_log):
+    from app.models.notification import Notification
+    from app.models.user import User
+    from app.services.notification_service import send_notification_to_group
+
+    writers = User.query.filter_by(role="writer").count()
+    calls = []
+    sql_log.clear()
+
+    sent = send_notification_to_group("writer", "Fan-out", "Hello writers", chunk_size=7,
+                                      progress=lambda done, total: calls.append((done, total)))
+
+    assert sent == writers
+    assert calls[-1] == (writers, writers)
+    assert len(calls) == -(-writers // 7)
+    inserts = [s for s, _ in sql_log if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == len(calls)
+    assert all("SELECT" in s for s in inserts)
+
+    rows = Notification.query.filter_by(title="Fan-out")
+    assert rows.count() == writers
+    assert db.session.query(Notification.user_email).filter_by(title="Fan-out").distinct().count() == writers
+
+    # each writer sees exactly one copy
+    resp = client.get("/api/v1/notifications?limit=100", headers=auth_headers(seeded["writer"]))
+    titles = [n["title"] for n in resp.get_json()["notifications"]]
+    assert titles.count("Fan-out") == 1
+
+    rows.delete()
+    db.session.commit()
@@ -0,0 +1,168 @@
+"""
+Marketplace backfill leaves the orders' own edit history alone; cursor
+pages of the order list match offset pages; batch pricing quotes what
+calculate_minimum_price does.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from itertools import product
+
+import pytest
+from sqlalchemy import update
+
+from app.extensions import db
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_rebuild_marketplace_keeps_updated_at(seeded):
+    from app.models.bid import Bid
+    from app.models.order import Order
+    from app.services.marketplace_service import rebuild_marketplace
+
+    rebuild_marketplace()
+    # one stale flag, so the rebuild has a row to fix
+    stale = Order.query.filter(Order.marketplace_open == True).order_by(Order.id).first()
+    db.session.execute(
+        update(Order.__table__).where(Order.__table__.c.id == stale.id).values(marketplace_open=False)
+    )
+    db.session.commit()
+
+    edited = dict(db.session.query(Order.id, Order.updated_at).all())
+    statuses = {b.id: b.get_derived_status() for b in Bid.query.all()}
+
+    result = rebuild_marketplace()
+    db.session.expire_all()
+
+    assert result["open"] == 1
+    assert result["closed"] == 0
+    assert dict(db.session.query(Order.id, Order.updated_at).all()) == edited
+    assert {b.id: b.get_derived_status() for b in Bid.query.all()} == statuses
+    assert db.session.get(Order, stale.id).marketplace_open is True
+
+
+def _orders(client, headers, query):
+    resp = client.get(f"/api/v1/orders?{query}", headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+    body = resp.get_json()
+    return [o["id"] for o in body["orders"]], body["pagination"]
+
+
+def _walk(client, headers, limit):
+    ids, cursor = [], ""
+    while cursor is not None:
+        page, meta = _orders(client, headers, f"limit={limit}&cursor={cursor}")
+        ids += page
+        cursor = meta["next_cursor"]
+    return ids
+
+
+def test_cursor_pages_match_offset_pages(seeded, client, auth_headers):
+    headers = auth_headers(seeded["client"])
+
+    offset_ids, meta = _orders(client, headers, "limit=1000")
+    assert not meta["has_more"]
+
+    assert _walk(client, headers, limit=7) == offset_ids
+
+
+def test_cursor_count_modes(seeded, client, auth_headers):
+    headers = auth_headers(seeded["client"])
+
+    _, meta = _orders(client, headers, "limit=5&cursor=")
+    assert "total" not in meta
+    _, meta = _orders(client, headers, "limit=5&cursor=&count=false")
+    assert "total" not in meta
+
+    _, exact = _orders(client, headers, "limit=5&cursor=&count=true")
+    assert exact["total"] == len(_orders(client, headers, "limit=1000")[0])
+    assert "total_estimated" not in exact
+
+    _, estimate = _orders(client, headers, "limit=5&cursor=&count=estimate")
+    assert estimate["total_estimated"] is True
+    assert estimate["total"] >= 0
+    assert estimate["total_pages"] == (estimate["total"] + 4) // 5
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+    base64.urlsafe_b64encode(json.dumps([None, "ORD-00001"]).encode()).decode(),
+])
+def test_bad_cursor_is_rejected(seeded, client, auth_headers, cursor):
+    resp = client.get(f"/api/v1/orders?cursor={cursor}", headers=auth_headers(seeded["client"]))
+
+    assert resp.status_code == 400
+
+
+def test_cursor_pages_skip_null_created_at(seeded, client, auth_headers):
+    from app.models.order import Order
+
+    headers = auth_headers(seeded["client"])
+    every = _walk(client, headers, limit=7)
+    undated = every[len(every) // 2]
+    created_at = db.session.get(Order, undated).created_at
+    db.session.execute(update(Order).where(Order.id == undated).values(created_at=None))
+    db.session.commit()
+    try:
+        assert _walk(client, headers, limit=7) == [i for i in every if i != undated]
+    finally:
+        db.session.execute(update(Order).where(Order.id == undated).values(created_at=created_at))
+        db.session.commit()
+
+
+def test_cursor_round_trip_refuses_null():
+    at = datetime(2024, 3, 1, 12, 30, 5, 120)
+    assert decode_cursor(encode_cursor(at, "ORD-00001")) == (at, "ORD-00001")
+    with pytest.raises(ValueError):
+        encode_cursor(None, "ORD-00001")
+
+
+# every deadline band, both sides of each threshold, overdue and past 9999 h
+PRICING_HOURS = [-5, 0, 1, 3, 3.25, 5.5, 6, 6.5, 12, 12.01, 23.9, 24, 30, 48, 49,
+                 72, 72.5, 168, 9999, 10000]
+PRICING_CATEGORIES = ["literature", "mathematics", "business", "medicine", "other",
+                      "astrology", None]
+PRICING_ORDER_TYPES = ["essay", "research-paper", "thesis", "presentation", "editing",
+                       "coding-project", "data-analysis", "software-development",
+                       "podcast", None]
+PRICING_PAGES = [None, 0, 1, 2, 7, 15, 120]
+
+
+def test_batch_prices_match_scalar_prices():
+    from app.services.order_service import calculate_minimum_price, calculate_minimum_prices
+
+    now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    quotes = list(product(PRICING_CATEGORIES, PRICING_ORDER_TYPES, PRICING_PAGES,
+                          PRICING_HOURS))
+
+    batch = calculate_minimum_prices(*zip(*quotes))
+
+    assert batch == [
+        calculate_minimum_price(c, t, p, now + timedelta(hours=h), now)
+        for c, t, p, h in quotes
+    ]
+
+
+def test_pricing_table_reproduces_scalar_prices():
+    from app.services.order_service import calculate_minimum_price, pricing_table
+
+    table = pricing_table()
+
+    def local_quote(category, order_type, pages, hours):
+        # what a client does with GET /orders/pricing/table
+        base = table["non_page_base_prices"].get(
+            order_type, table["base_prices"].get(category, table["default_base_price"])
+        )
+        units = 1 if order_type in table["non_page_order_types"] else (pages or 1)
+        mult = table["order_type_multipliers"].get(order_type, table["default_type_multiplier"])
+        urgency = next((d["multiplier"] for d in table["deadline_multipliers"]
+                        if hours <= d["max_hours"]), 1.0)
+        return round(base * units * mult * urgency, table["rounding"])
+
+    now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    for c, t, p, h in product(PRICING_CATEGORIES, PRICING_ORDER_TYPES, PRICING_PAGES,
+                              PRICING_HOURS):
+        assert local_quote(c, t, p, h) == calculate_minimum_price(
+            c, t, p, now + timedelta(hours=h), now
+        ), (c, t, p, h)
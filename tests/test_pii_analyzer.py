@@ -0,0 +1,80 @@
+"""The PII analyzer is built once per process, however many callers race for it."""
+import threading
+
+import pytest
+
+from app.services import pii_analyzer
+
+
+@pytest.fixture
+def fresh_registry():
+    pii_analyzer.reset()
+    yield
+    pii_analyzer.reset()
+
+
+def test_concurrent_callers_share_one_build(fresh_registry, monkeypatch):
+    builds = []
+    sentinel = object()
+
+    def build():
+        builds.append(1)
+        return sentinel
+
+    monkeypatch.setattr(pii_analyzer, "_build_analyzer", build)
+
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(pii_analyzer.get_analyzer()))
+        for _ in range(16)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(builds) == 1
+    assert all(a is sentinel for a in seen)
+
+
+def test_call_sites_use_the_registry(fresh_registry):
+    from app.services import chat_behavior_analyzer, chat_service
+
+    assert chat_service.analyze is pii_analyzer.analyze
+    assert not hasattr(chat_service, "analyzer")
+    assert not hasattr(chat_behavior_analyzer, "analyzer")
+
+
+def test_configure_switches_tier_and_cache_key(fresh_registry):
+    default = pii_analyzer.model_version()
+    try:
+        pii_analyzer.configure("regex", ["EMAIL_ADDRESS"])
+        assert pii_analyzer.model_version() != default
+        assert "regex" in pii_analyzer.model_version()
+    finally:
+        pii_analyzer.configure()
+    assert pii_analyzer.model_version() == default
+
+
+def test_regex_tier_redacts_contacts_without_spacy(fresh_registry):
+    pytest.importorskip("presidio_analyzer")
+    from app.services.chat_service import scan_message
+
+    try:
+        pii_analyzer.configure("regex")
+        clean, found = scan_message("ask Jane, jane dot doe at gmail dot com or 0712 345 678")
+    finally:
+        pii_analyzer.configure()
+
+    # the URL inside the email overlaps it; both go in one redaction
+    assert clean == "ask Jane, [REDACTED] or [REDACTED]"
+    assert "EMAIL_ADDRESS" in found and "PHONE_NUMBER" in found
+
+
+def test_overlapping_spans_are_merged():
+    from app.services.chat_service import redact_spans
+
+    found = []
+    text = redact_spans("mail jane.doe@gmail.com now", [(5, 23, "EMAIL_ADDRESS"), (14, 23, "URL")], found)
+    assert text == "mail [REDACTED] now"
+    assert sorted(found) == ["EMAIL_ADDRESS", "URL"]
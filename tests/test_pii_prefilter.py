@@ -0,0 +1,86 @@
+"""
+Recall corpus for the PII prefilter (chat_service.PREFILTER_RULES).
+
+Every MUST_SCAN message has to reach Presidio; add the message here before
+loosening a rule. ROUTINE holds typical chat traffic, most of which should
+skip NER entirely.
+"""
+import pytest
+
+from app.services.chat_service import (
+    DEFAULT_PREFILTER_RULES,
+    compile_prefilter,
+    needs_ner,
+    normalize_text,
+)
+
+MUST_SCAN = [
+    # phones, plain and obfuscated
+    "call me 0712345678",
+    "my number is +254 712 345 678",
+    "whatsapp zero seven one two three four five six seven eight",
+    "0 7 1 2 - 3 4 5 - 6 7 8",
+    "its seven one two, three four five",
+    # emails, plain and obfuscated
+    "jane.doe@gmail.com",
+    "jane dot doe at gmail dot com",
+    "jane (at) gmail (dot) com",
+    "jane [at] gmail [dot] com",
+    "email me on janedoe AT yahoo DOT com",
+    # links and handles
+    "find me on www.linkedin.com/in/janedoe",
+    "https://t.me/janedoe",
+    "my ig is janedoe.me",
+    "telegram @janedoe",
+    # names and places mid-sentence
+    "you can ask Jane for the file",
+    "I'm based in Nairobi, near the CBD",
+    "my name is Peter Otieno",
+    "send it to Mary, she will pay",
+]
+
+ROUTINE = [
+    "Please see attached",
+    "When will it be done?",
+    "Thanks, I have received the draft",
+    "Kindly revise the conclusion section",
+    "Okay noted",
+    "Can you add more sources to the literature review?",
+    "The formatting looks good now",
+    "Please use a more formal tone in the introduction",
+    "I will submit the final version tonight",
+    "Great work, approving the order now",
+    "Is the reference list complete?",
+    "Sure, give me a few hours",
+    "Hello, are you there?",
+    "Please confirm you have started working on it",
+    "Noted with thanks",
+    "The instructions are in the uploaded file",
+    "Could you paraphrase the second paragraph?",
+    "I need it a bit earlier if possible",
+    "Yes that works for me",
+    "Let me know if anything is unclear",
+]
+
+
+@pytest.mark.parametrize("message", MUST_SCAN)
+def test_pii_candidates_reach_ner(message):
+    assert needs_ner(normalize_text(message), DEFAULT_PREFILTER_RULES)
+
+
+def test_most_routine_messages_skip_ner():
+    scanned = [m for m in ROUTINE if needs_ner(normalize_text(m), DEFAULT_PREFILTER_RULES)]
+    assert len(scanned) <= len(ROUTINE) * 0.2, scanned
+
+
+def test_rules_are_tunable():
+    assert needs_ner("ask Jane for it", "proper_noun")
+    assert not needs_ner("ask Jane for it", "digits,at_sign")
+    # no rules: the prefilter is off and everything goes to Presidio
+    assert compile_prefilter("") is None
+    assert needs_ner("Okay noted", "")
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError):
+        compile_prefilter("digits,phonenumbers")
@@ -0,0 +1,34 @@
+"""
+Per-endpoint SQL statement budgets.
+
+Each list endpoint is called with a full page over rows owned by many
+different users. The budget is what the page should cost with its
+relationships eager-loaded, so a per-row lazy load (N+1) fails the test.
+"""
+import pytest
+
+
+@pytest.mark.parametrize("role,path,budget", [
+    pytest.param("writer", "/api/v1/orders?limit=25", 5),
+    pytest.param("client", "/api/v1/orders?limit=25", 5),
+    pytest.param("writer", "/api/v1/bids?limit=25", 5),
+    pytest.param("client", "/api/v1/client/bids?limit=25", 6),
+    pytest.param("admin", "/api/v1/admin/withdrawals?limit=25", 5),
+    pytest.param("client", "/api/v1/chats?limit=25", 1),
+    pytest.param("admin", "/api/v1/support-chat?limit=25", 3),
+    pytest.param("admin", "/api/v1/support-chat?limit=25&unresolved=1&unread=1&count=false", 2),
+])
+def test_list_endpoint_query_budget(seeded, client, auth_headers, query_budget, role, path, budget):
+    resp = client.get(path, headers=auth_headers(seeded[role]))
+    assert resp.status_code == 200, resp.get_json()
+    query_budget(resp, budget)
+
+
+def test_list_messages_query_budget(seeded, client, auth_headers, query_budget):
+    chat = seeded["chat"]
+    resp = client.get(
+        f"/api/v1/chats/{chat.id}/messages?limit=50",
+        headers=auth_headers(seeded["writer"]),
+    )
+    assert resp.status_code == 200, resp.get_json()
+    query_budget(resp, 5)
@@ -0,0 +1,63 @@
+"""
+Index coverage for the hot list endpoints.
+
+Each endpoint is called for real; every SELECT it issues is re-run under
+EXPLAIN with sequential scans disabled. If the planner still picks a Seq Scan
+on one of the large tables, no index can serve that query and the test fails.
+"""
+import json
+
+import pytest
+
+from app.extensions import db
+
+HOT_TABLES = {"orders", "bids", "notifications"}
+
+ENDPOINTS = [
+    ("client", "/api/v1/orders"),
+    ("client", "/api/v1/orders?status=in_progress"),
+    ("writer", "/api/v1/orders"),
+    ("writer", "/api/v1/orders?assigned_to=me&status=in-progress"),
+    ("writer", "/api/v1/bids"),
+    ("writer", "/api/v1/bids?status=open"),
+    ("client", "/api/v1/client/bids"),
+    ("writer", "/api/v1/notifications"),
+]
+
+
+def _explain(statement, parameters):
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        ).scalar()
+        conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def _seq_scans(node):
+    found = set()
+    if node.get("Node Type") == "Seq Scan":
+        found.add(node.get("Relation Name"))
+    for child in node.get("Plans", []):
+        found |= _seq_scans(child)
+    return found
+
+
+@pytest.mark.parametrize("role,path", ENDPOINTS)
+def test_list_queries_use_indexes(seeded, client, auth_headers, sql_log, role, path):
+    resp = client.get(path, headers=auth_headers(seeded[role]))
+    assert resp.status_code == 200, resp.get_json()
+
+    selects = [
+        (statement, parameters)
+        for statement, parameters in sql_log
+        if statement.lstrip().upper().startswith("SELECT")
+    ]
+    assert selects
+
+    for statement, parameters in selects:
+        scans = _seq_scans(_explain(statement, parameters)) & HOT_TABLES
+        assert not scans, f"Seq Scan on {sorted(scans)} for {path}:\n{statement}"
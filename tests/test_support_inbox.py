@@ -0,0 +1,79 @@
+"""
+SupportChat status / unread_count / last_message_* follow new messages and
+reads, and agree with a rebuild from support_messages.
+"""
+from app.extensions import db
+
+
+def _inbox(client, headers, query=""):
+    resp = client.get(f"/api/v1/support-chat?limit=100{query}", headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+    return {c["id"]: c for c in resp.get_json()["chats"]}
+
+
+def test_summary_follows_messages_and_reads(seeded, client, auth_headers):
+    from app.models.support_chat import SupportChat
+    from app.services.support_chat_service import (
+        get_or_create_support_chat, rebuild_support_chat_summaries,
+    )
+
+    user = seeded["other_writer"]
+    as_user = auth_headers(user)
+    as_admin = auth_headers(seeded["admin"])
+    chat = get_or_create_support_chat(user.id)
+    url = f"/api/v1/support-chat/{chat.id}/messages"
+
+    client.post(url, headers=as_user, json={"content": "My payout is late"})
+    client.post(url, headers=as_user, json={"content": "Any update?"})
+    entry = _inbox(client, as_admin)[chat.id]
+    assert entry["unread_count"] == 2
+    assert entry["last_message"] == "Any update?"
+    assert chat.id in _inbox(client, as_admin, "&unread=1")
+
+    # support's own reply is not unread for support
+    client.post(url, headers=as_admin, json={"content": "Looking into it"})
+    client.post(f"/api/v1/support-chat/{chat.id}/mark-read", headers=as_admin)
+    entry = _inbox(client, as_admin)[chat.id]
+    assert entry["unread_count"] == 0
+    assert entry["last_message"] == "Looking into it"
+    assert chat.id not in _inbox(client, as_admin, "&unread=1")
+
+    client.post(f"/api/v1/support-chat/{chat.id}/resolve", headers=as_admin)
+    assert chat.id not in _inbox(client, as_admin, "&unresolved=1")
+
+    # the user writing again reopens it
+    client.post(url, headers=as_user, json={"content": "Still nothing"})
+    entry = _inbox(client, as_admin, "&unresolved=1&unread=1")[chat.id]
+    assert entry["status"] == "open" and entry["unread_count"] == 1
+
+    db.session.expire_all()
+    before = db.session.get(SupportChat, chat.id)
+    before = (before.last_message_id, before.last_message_at, before.unread_count)
+    rebuild_support_chat_summaries()
+    after = db.session.get(SupportChat, chat.id)
+    assert (after.last_message_id, after.last_message_at, after.unread_count) == before
+
+
+def test_support_read_leaves_other_agents_replies(seeded, client, auth_headers):
+    from app.models.support_chat import SupportChat
+    from app.models.support_message import SupportMessage
+    from app.models.user import User
+    from app.services.support_chat_service import get_or_create_support_chat
+
+    colleague = User(id="usr-admin2", email="admin2@example.com", password_hash="x",
+                     role="admin")
+    db.session.add(colleague)
+    db.session.commit()
+
+    user = seeded["writer"]
+    chat = get_or_create_support_chat(user.id)
+    url = f"/api/v1/support-chat/{chat.id}/messages"
+    client.post(url, headers=auth_headers(user), json={"content": "Was my refund sent?"})
+    reply = client.post(url, headers=auth_headers(colleague),
+                        json={"content": "Yes, this morning"}).get_json()
+
+    client.post(f"/api/v1/support-chat/{chat.id}/mark-read", headers=auth_headers(seeded["admin"]))
+
+    db.session.expire_all()
+    assert db.session.get(SupportChat, chat.id).unread_count == 0
+    assert db.session.get(SupportMessage, reply["id"]).is_read is False
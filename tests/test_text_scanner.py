@@ -0,0 +1,75 @@
+"""
+normalize_text / regex_mask must produce exactly what the original
+one-re.sub-per-pattern code did (kept in benchmarks/text_scanner.py).
+"""
+import random
+
+import pytest
+
+from app.services.chat_service import normalize_text, regex_mask
+from benchmarks.text_scanner import CORPUS, legacy_normalize_text, legacy_regex_mask
+
+GOLDEN = [
+    ("", ""),
+    ("Please see attached", "Please see attached"),
+    ("jane dot doe at gmail dot com", "jane.doe@gmail.com"),
+    ("jane(at)gmail(dot)com", "janeatgmaildotcom"),
+    ("jane (AT) gmail (Dot) com", "jane @ gmail . com"),
+    ("zero seven one two, three four five", "0712345"),
+    ("Seven-Eight Nine", "789"),
+    ("someone onetwo one", "someone onetwo 1"),
+    ("0712 345 678", "0712345678"),
+    ("a dot at b", "a dot@b"),
+    ("a dot  at  b dot c", "a dot@b.c"),
+    ("a at dot b", "a@dot b"),
+    ("meet at 5. 30", "meet@530"),
+    ("x[y]z {ab}", "xyz {ab}"),
+]
+
+
+@pytest.mark.parametrize("text,expected", GOLDEN)
+def test_golden_normalization(text, expected):
+    assert normalize_text(text) == expected
+    assert legacy_normalize_text(text) == expected
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_corpus_matches_legacy(text):
+    assert normalize_text(text) == legacy_normalize_text(text)
+    norm = normalize_text(text)
+    assert regex_mask(norm) == legacy_regex_mask(norm)
+
+
+# Tokens chosen to make the patterns interact: spaced and bracketed at/dot,
+# number words (also inside longer words), digits, separators, emails
+TOKENS = [
+    "at", "AT", "dot", "Dot", "(at)", "(dot)", "[at]", "(", ")", "[", "]", "{", "}",
+    "one", "Two", "three", "seven", "nine", "zero", "someone", "atone", "dotted",
+    "0", "7", "12", "345", "0712", "+254", "-", ",", ".", "@", "gmail", "com",
+    "jane", "x", "co.ke", "ſix", "İ",
+]
+SEPARATORS = [" ", "  ", "", "\t", "\n", " - ", ", ", "."]
+
+
+def _random_message(rnd):
+    parts = []
+    for _ in range(rnd.randint(1, 14)):
+        parts.append(rnd.choice(TOKENS))
+        parts.append(rnd.choice(SEPARATORS))
+    return "".join(parts)
+
+
+def test_randomized_differential():
+    rnd = random.Random(20240611)
+    for _ in range(20_000):
+        text = _random_message(rnd)
+        norm = legacy_normalize_text(text)
+        assert normalize_text(text) == norm, repr(text)
+        assert regex_mask(norm) == legacy_regex_mask(norm), repr(norm)
+
+
+def test_batched_scan_matches_one_at_a_time():
+    from app.services.chat_service import scan_message, scan_messages
+
+    texts = CORPUS * 7 + ["", None, "ask Jane for it"]
+    assert list(scan_messages(texts, batch_size=4)) == [scan_message(t) for t in texts]